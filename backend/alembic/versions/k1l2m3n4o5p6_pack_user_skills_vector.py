@@ -0,0 +1,36 @@
+"""pack_user_skills_vector
+
+Revision ID: k1l2m3n4o5p6
+Revises: j0k1l2m3n4o5
+Create Date: 2026-10-17 00:00:00.000000
+
+Turn user.skills_vector from an unused VARCHAR into a BLOB holding a
+packed float32 vector for team matching. Existing values were never
+written by the application, so the column is recreated rather than
+converted; vectors are rebuilt lazily from each user's profile.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "k1l2m3n4o5p6"
+down_revision: Union[str, None] = "j0k1l2m3n4o5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("user") as batch_op:
+        batch_op.drop_column("skills_vector")
+    with op.batch_alter_table("user") as batch_op:
+        batch_op.add_column(sa.Column("skills_vector", sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("user") as batch_op:
+        batch_op.drop_column("skills_vector")
+    with op.batch_alter_table("user") as batch_op:
+        batch_op.add_column(sa.Column("skills_vector", sa.String(), nullable=True))
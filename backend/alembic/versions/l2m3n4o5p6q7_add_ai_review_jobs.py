@@ -0,0 +1,63 @@
+"""add_ai_review_jobs
+
+Revision ID: l2m3n4o5p6q7
+Revises: k1l2m3n4o5p6
+Create Date: 2026-10-17 00:00:01.000000
+
+Tables for background batch AI review: ai_review_job tracks one
+organizer-triggered run (progress counters + heartbeat for resuming),
+submission_ai_review keeps the latest review of each submission together
+with the content hash it was computed from.
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "l2m3n4o5p6q7"
+down_revision: Union[str, None] = "k1l2m3n4o5p6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ai_review_job",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("hackathon_id", sa.Integer(), sa.ForeignKey("hackathon.id"), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("reviewed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("skipped", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("failed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("created_by", sa.Integer(), sa.ForeignKey("user.id"), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_ai_review_job_hackathon_id", "ai_review_job", ["hackathon_id"])
+    op.create_index("ix_ai_review_job_status", "ai_review_job", ["status"])
+
+    op.create_table(
+        "submission_ai_review",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("submission_id", sa.Integer(), sa.ForeignKey("submission.id"), nullable=False, unique=True),
+        sa.Column("hackathon_id", sa.Integer(), sa.ForeignKey("hackathon.id"), nullable=False),
+        sa.Column("job_id", sa.Integer(), sa.ForeignKey("ai_review_job.id"), nullable=True),
+        sa.Column("content_hash", sa.String(), nullable=False),
+        sa.Column("scores", sa.String(), nullable=False),
+        sa.Column("comment", sa.String(), nullable=False),
+        sa.Column("model", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_submission_ai_review_hackathon_id", "submission_ai_review", ["hackathon_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_submission_ai_review_hackathon_id", table_name="submission_ai_review")
+    op.drop_table("submission_ai_review")
+    op.drop_index("ix_ai_review_job_status", table_name="ai_review_job")
+    op.drop_index("ix_ai_review_job_hackathon_id", table_name="ai_review_job")
+    op.drop_table("ai_review_job")
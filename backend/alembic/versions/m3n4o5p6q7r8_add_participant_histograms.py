@@ -0,0 +1,49 @@
+"""add_participant_histograms
+
+Revision ID: m3n4o5p6q7r8
+Revises: l2m3n4o5p6q7
+Create Date: 2026-10-17 00:00:02.000000
+
+Per-hackathon skill / MBTI participant counts for community insights:
+participant_histogram holds one row per (hackathon, kind, value),
+participant_stats the head count plus the cached AI summary and the
+histogram snapshot it was generated from. Both are filled lazily on the
+first insights request, so no backfill is needed.
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "m3n4o5p6q7r8"
+down_revision: Union[str, None] = "l2m3n4o5p6q7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "participant_histogram",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("hackathon_id", sa.Integer(), sa.ForeignKey("hackathon.id"), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("value", sa.String(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        sa.UniqueConstraint("hackathon_id", "kind", "value", name="uq_participant_histogram"),
+    )
+    op.create_index("ix_participant_histogram_hackathon_id", "participant_histogram", ["hackathon_id"])
+
+    op.create_table(
+        "participant_stats",
+        sa.Column("hackathon_id", sa.Integer(), sa.ForeignKey("hackathon.id"), primary_key=True),
+        sa.Column("participants", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("summary", sa.String(), nullable=True),
+        sa.Column("summary_basis", sa.String(), nullable=True),
+        sa.Column("summary_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("participant_stats")
+    op.drop_index("ix_participant_histogram_hackathon_id", table_name="participant_histogram")
+    op.drop_table("participant_histogram")
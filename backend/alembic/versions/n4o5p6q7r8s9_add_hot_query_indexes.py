@@ -0,0 +1,55 @@
+"""add_hot_query_indexes
+
+Revision ID: n4o5p6q7r8s9
+Revises: m3n4o5p6q7r8
+Create Date: 2026-10-17 00:00:03.000000
+
+Composite indexes for the query shapes the endpoints run on every
+request (enrollment checks, score recomputation, leaderboards, unread
+counts, feeds, verification codes). Enrollment (hackathon_id, user_id)
+becomes unique; duplicate rows left by racing enroll / self-repair
+requests are removed first, keeping the oldest.
+
+Score lookups by (judge_id, submission_id) are already served by the
+prefix of uq_score_judge_sub_criteria, so no separate index is added.
+
+IF NOT EXISTS because init_db()'s create_all() builds these indexes for
+fresh databases before migrations run.
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "n4o5p6q7r8s9"
+down_revision: Union[str, None] = "m3n4o5p6q7r8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ("ix_score_submission_criteria", "score", "submission_id, criteria_id"),
+    ("ix_teammember_user_id", "teammember", "user_id"),
+    ("ix_submission_hackathon_score", "submission", "hackathon_id, total_score"),
+    ("ix_notification_user_read_created", "notification", "user_id, is_read, created_at"),
+    ("ix_communitypost_hackathon_created", "communitypost", "hackathon_id, created_at"),
+    ("ix_discussion_pinned_created", "discussion", "is_pinned, created_at"),
+    ("ix_verificationcode_email_code", "verificationcode", "email, code"),
+]
+
+
+def upgrade() -> None:
+    op.execute(
+        "DELETE FROM enrollment WHERE id NOT IN "
+        "(SELECT MIN(id) FROM enrollment GROUP BY hackathon_id, user_id)"
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_enrollment_hackathon_user "
+        "ON enrollment (hackathon_id, user_id)"
+    )
+    for name, table, columns in INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+
+
+def downgrade() -> None:
+    for name, _, _ in reversed(INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.execute("DROP INDEX IF EXISTS uq_enrollment_hackathon_user")
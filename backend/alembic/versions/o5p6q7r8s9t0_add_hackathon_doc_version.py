@@ -0,0 +1,30 @@
+"""add_hackathon_doc_version
+
+Revision ID: o5p6q7r8s9t0
+Revises: n4o5p6q7r8s9
+Create Date: 2026-10-17 00:00:04.000000
+
+hackathon.doc_version: bumped by every endpoint that changes a
+hackathon's detail document, so cached documents are reused exactly
+while the version they were built at is current.
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "o5p6q7r8s9t0"
+down_revision: Union[str, None] = "n4o5p6q7r8s9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "hackathon",
+        sa.Column("doc_version", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("hackathon") as batch_op:
+        batch_op.drop_column("doc_version")
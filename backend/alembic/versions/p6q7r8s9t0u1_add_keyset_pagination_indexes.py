@@ -0,0 +1,38 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: p6q7r8s9t0u1
+Revises: o5p6q7r8s9t0
+Create Date: 2026-10-17 00:00:05.000000
+
+Indexes matching the keyset (cursor) sort orders of the list endpoints,
+so `WHERE (k, id) < (?, ?) ORDER BY k DESC, id DESC LIMIT n` walks an
+index instead of sorting: the hackathon list by (created_at, id), and
+the teams and submissions of a hackathon by id.
+
+IF NOT EXISTS because init_db()'s create_all() builds these indexes for
+fresh databases before migrations run.
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "p6q7r8s9t0u1"
+down_revision: Union[str, None] = "o5p6q7r8s9t0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ("ix_hackathon_created_id", "hackathon", "created_at, id"),
+    ("ix_team_hackathon_id", "team", "hackathon_id"),
+    ("ix_submission_hackathon_id", "submission", "hackathon_id, id"),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+
+
+def downgrade() -> None:
+    for name, _, _ in reversed(INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
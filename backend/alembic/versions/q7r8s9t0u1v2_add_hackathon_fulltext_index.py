@@ -0,0 +1,103 @@
+"""add_hackathon_fulltext_index
+
+Revision ID: q7r8s9t0u1v2
+Revises: p6q7r8s9t0u1
+Create Date: 2026-10-17 00:00:06.000000
+
+Full-text index over hackathon title, description and tags for the list
+endpoint's `search` filter: an FTS5 table on SQLite, a tsvector table
+with a GIN index on PostgreSQL (see app.core.fulltext). Existing
+hackathons are indexed here; the endpoints keep it in sync afterwards.
+
+The backfill reads hackathons through a table stub, and tokenizes and
+writes them with a copy of app.core.fulltext / search_index.tokenize()
+as they stood at this revision, so replaying it does not change when the
+live code does.
+"""
+import json
+import re
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "q7r8s9t0u1v2"
+down_revision: Union[str, None] = "p6q7r8s9t0u1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+hackathon = sa.table(
+    "hackathon",
+    sa.column("id", sa.Integer),
+    sa.column("title", sa.String),
+    sa.column("description", sa.String),
+    sa.column("tags", sa.String),
+)
+
+CREATE = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS hackathon_fts "
+        "USING fts5(title, description, tags, tokenize = 'unicode61')",
+    ],
+    "postgresql": [
+        "CREATE TABLE IF NOT EXISTS hackathon_fts ("
+        "hackathon_id INTEGER PRIMARY KEY REFERENCES hackathon (id) ON DELETE CASCADE, "
+        "document TSVECTOR NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS ix_hackathon_fts_document ON hackathon_fts USING GIN (document)",
+    ],
+}
+
+_TOKEN = re.compile(r"[a-z0-9]+|[\u4e00-\u9fff]+")
+
+
+def _tokens(text):
+    """Lower-cased Latin words and CJK bigrams, joined by spaces."""
+    tokens = []
+    for run in _TOKEN.findall((text or "").lower()):
+        if "\u4e00" <= run[0] <= "\u9fff" and len(run) > 1:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return " ".join(tokens)
+
+
+def _tag_text(tags):
+    try:
+        tag_list = json.loads(tags) if tags else []
+    except (ValueError, TypeError):
+        tag_list = []
+    if not isinstance(tag_list, list):
+        tag_list = [tag_list]
+    return " ".join(str(t) for t in tag_list)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+    for statement in CREATE.get(dialect, []):
+        bind.exec_driver_sql(statement)
+    rows = bind.execute(
+        sa.select(hackathon.c.id, hackathon.c.title, hackathon.c.description, hackathon.c.tags)
+    ).all()
+    for hackathon_id, title, description, tags in rows:
+        params = {"id": hackathon_id, "title": _tokens(title),
+                  "description": _tokens(description), "tags": _tokens(_tag_text(tags))}
+        if dialect == "sqlite":
+            # init_db() may have built the index already
+            bind.execute(sa.text("DELETE FROM hackathon_fts WHERE rowid = :id"), {"id": hackathon_id})
+            bind.execute(
+                sa.text("INSERT INTO hackathon_fts (rowid, title, description, tags) "
+                        "VALUES (:id, :title, :description, :tags)"),
+                params,
+            )
+        elif dialect == "postgresql":
+            bind.execute(
+                sa.text("INSERT INTO hackathon_fts (hackathon_id, document) VALUES (:id, "
+                        "setweight(to_tsvector('simple', :title), 'A') || to_tsvector('simple', :body)) "
+                        "ON CONFLICT (hackathon_id) DO UPDATE SET document = EXCLUDED.document"),
+                {"id": hackathon_id, "title": params["title"],
+                 "body": f"{params['description']} {params['tags']}"},
+            )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS hackathon_fts")
@@ -0,0 +1,89 @@
+"""add_hackathon_prize_summary
+
+Revision ID: r8s9t0u1v2w3
+Revises: q7r8s9t0u1v2
+Create Date: 2026-10-17 00:00:07.000000
+
+hackathon.total_cash_prize / has_non_cash_prizes: the list's prize
+summary, kept on the row by the prize endpoints instead of being summed
+and parsed from every prize on each list request (see
+app.core.prize_summary). Existing hackathons are backfilled from their
+prizes; ix_hackathon_prize_id backs sorting the list by prize pool.
+
+The backfill goes through table stubs frozen at this revision, not the
+ORM models, which may list columns later migrations add, and applies a
+copy of the non-cash rule as it stood here rather than the live one.
+"""
+import json
+from collections import defaultdict
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "r8s9t0u1v2w3"
+down_revision: Union[str, None] = "q7r8s9t0u1v2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+hackathon = sa.table(
+    "hackathon",
+    sa.column("id", sa.Integer),
+    sa.column("total_cash_prize", sa.Float),
+    sa.column("has_non_cash_prizes", sa.Boolean),
+)
+section = sa.table("section", sa.column("id", sa.Integer))
+prize = sa.table(
+    "prize",
+    sa.column("hackathon_id", sa.Integer),
+    sa.column("section_id", sa.Integer),
+    sa.column("total_cash_amount", sa.Numeric),
+    sa.column("awards_sublist", sa.String),
+)
+
+
+def _has_non_cash_awards(awards_sublist):
+    """Whether a prize's awards_sublist JSON lists anything but cash."""
+    try:
+        sublist = json.loads(awards_sublist) if awards_sublist else []
+    except (ValueError, TypeError):
+        return False
+    if not isinstance(sublist, list):
+        return False
+    return any(item.get("type") != "cash" for item in sublist if isinstance(item, dict))
+
+
+def upgrade() -> None:
+    op.add_column(
+        "hackathon",
+        sa.Column("total_cash_prize", sa.Float(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "hackathon",
+        sa.Column("has_non_cash_prizes", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_hackathon_prize_id ON hackathon (total_cash_prize, id)"
+    )
+
+    bind = op.get_bind()
+    totals, non_cash = defaultdict(float), defaultdict(bool)
+    rows = bind.execute(
+        sa.select(prize.c.hackathon_id, prize.c.total_cash_amount, prize.c.awards_sublist)
+        .select_from(prize.join(section, section.c.id == prize.c.section_id))
+    )
+    for hackathon_id, amount, sublist in rows:
+        totals[hackathon_id] += float(amount or 0)
+        non_cash[hackathon_id] |= _has_non_cash_awards(sublist)
+    for hackathon_id, total in totals.items():
+        bind.execute(
+            hackathon.update()
+            .where(hackathon.c.id == hackathon_id)
+            .values(total_cash_prize=total, has_non_cash_prizes=non_cash[hackathon_id])
+        )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_hackathon_prize_id")
+    with op.batch_alter_table("hackathon") as batch_op:
+        batch_op.drop_column("has_non_cash_prizes")
+        batch_op.drop_column("total_cash_prize")
@@ -0,0 +1,31 @@
+"""submission_total_score_not_null
+
+Revision ID: s9t0u1v2w3x4
+Revises: r8s9t0u1v2w3
+Create Date: 2026-10-17 00:00:08.000000
+
+The submission list's score keyset pages with
+`WHERE (total_score, id) < (?, ?)`. A NULL score compares as unknown, so
+the walk stopped at the first unscored submission, and NULLs sort last
+on PostgreSQL but first on SQLite. Unscored submissions already default
+to 0, so the stray NULLs are set to 0 and the column made NOT NULL.
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "s9t0u1v2w3x4"
+down_revision: Union[str, None] = "r8s9t0u1v2w3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("UPDATE submission SET total_score = 0 WHERE total_score IS NULL")
+    with op.batch_alter_table("submission") as batch_op:
+        batch_op.alter_column("total_score", existing_type=sa.Float(), nullable=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("submission") as batch_op:
+        batch_op.alter_column("total_score", existing_type=sa.Float(), nullable=True)
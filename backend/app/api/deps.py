@@ -4,12 +4,13 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 import logging
 import sys
 
 from app.core import security
 from app.core.config import settings
-from app.db.session import get_session
+from app.db.session import get_async_session, get_session
 from app.models.user import User
 from app.models.judge import Judge
 
@@ -21,11 +22,8 @@ reusable_oauth2 = OAuth2PasswordBearer(
     auto_error=False
 )
 
-def get_current_user(
-    request: Request,
-    session: Session = Depends(get_session),
-    token: Optional[str] = Depends(reusable_oauth2)
-) -> User:
+def _token_user_id(request: Request, token: Optional[str]) -> int:
+    """User id from the bearer token (or the access_token cookie); raises 401."""
     # DEBUG: Check why token might be missing
     # OAuth2PasswordBearer returns None if header missing, but might return "null" string if header is "Bearer null"
     if not token or token == "null" or token == "undefined":
@@ -66,14 +64,54 @@ def get_current_user(
     except (ValueError, TypeError):
         print(f"ERROR: Token sub is not an int: {token_data}")
         raise HTTPException(status_code=401, detail="Invalid token subject")
-        
-    user = session.get(User, user_id)
+    return user_id
+
+def _check_active(user: Optional[User]) -> User:
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return user
 
+def get_current_user(
+    request: Request,
+    session: Session = Depends(get_session),
+    token: Optional[str] = Depends(reusable_oauth2)
+) -> User:
+    return _check_active(session.get(User, _token_user_id(request, token)))
+
+async def get_current_user_async(
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
+    token: Optional[str] = Depends(reusable_oauth2)
+) -> User:
+    """get_current_user for async endpoints; loads the user through the AsyncSession."""
+    return _check_active(await session.get(User, _token_user_id(request, token)))
+
+def get_current_user_detached(
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+) -> User:
+    """
+    Same as get_current_user, but detaches the user and ends the read
+    transaction so the pooled DB connection goes back to the pool.
+    Use it on async endpoints that await slow upstream calls (AI) and
+    would otherwise pin a connection for the whole request.
+    """
+    release_connection(session, current_user)
+    return current_user
+
+def release_connection(session: Session, *instances) -> None:
+    """
+    End the session's read transaction so its pooled connection is
+    returned. `instances` are detached first so their loaded attributes
+    stay readable without triggering a reload.
+    """
+    for obj in instances:
+        if obj in session:
+            session.expunge(obj)
+    session.rollback()
+
 def get_current_active_superuser(
     current_user: User = Depends(get_current_user),
 ) -> User:
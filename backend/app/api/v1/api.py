@@ -16,6 +16,7 @@ from app.api.v1.endpoints import (
     community,
     notifications,
     discussions,
+    admin,
 )
 
 api_router = APIRouter()
@@ -42,3 +43,4 @@ api_router.include_router(community.router, prefix="/community", tags=["communit
 api_router.include_router(discussions.router, prefix="/discussions", tags=["discussions"])
 api_router.include_router(notifications.router, prefix="/notifications", tags=["notifications"])
 api_router.include_router(upload.router, prefix="/upload", tags=["upload"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.api import deps
+from app.core.config import settings
+from app.core.slow_queries import get_slow_query_log
+from app.models.user import User
+
+router = APIRouter()
+
+
+@router.get("/slow-queries")
+def slow_queries(
+    limit: int = Query(20, ge=1, le=200),
+    current_user: User = Depends(deps.get_current_active_superuser),
+):
+    """
+    Statement shapes that crossed SLOW_QUERY_MS since process start, by
+    cumulative time: count, total / avg / max ms, routes, last (redacted)
+    parameters and the captured plan (admin only).
+    """
+    return {
+        "threshold_ms": settings.SLOW_QUERY_MS,
+        "log_path": settings.SLOW_QUERY_LOG_PATH,
+        "queries": get_slow_query_log().top(limit),
+    }
@@ -1,17 +1,36 @@
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
-from typing import List, Optional
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, TypeAdapter
+from typing import Any, AsyncIterator, Callable, Iterator, List, Literal, Optional
 import time
 import random
+import hashlib
 import json
+import logging
 import os
-from openai import OpenAI
 from sqlmodel import Session, select
 from app.api import deps
 from app.models.user import User
 from app.core.config import settings
+from app.core.llm import extract_json, get_chat_provider, get_image_provider
+from app.core.json_stream import JSONItemStream
+from app.core.ai_cache import CompletionCache, get_completion_cache
+from app.core.ai_metrics import get_ai_metrics
+from app.core.single_flight import get_single_flight
+from app.core.skill_vectors import SkillIndex, get_skill_index
+from app.core.search_index import SEARCHABLE_STATUSES, get_hackathon_search_index
+from app.core import participant_stats
+from app.core.ai_review_jobs import get_review_job_runner, job_progress
+from app.core.image_jobs import ImageJobStatus, ImageQueueFull, get_image_job_queue
+from app.core.prompt_packer import estimate_tokens, pack_records, prompt_budget
+from app.models.ai_review import (
+    AIReviewJob, AIReviewJobRead, AIReviewJobStatus, SubmissionAIReview, SubmissionAIReviewRead,
+)
+from app.models.hackathon_organizer import HackathonOrganizer, OrganizerRole, OrganizerStatus
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 class AIRequest(BaseModel):
     prompt: str
@@ -38,21 +57,178 @@ def get_system_prompt(key: str, default: str = "") -> str:
     # 3. Fallback (should be provided in the call if not using hardcoded strings)
     return default
 
-# Initialize AI client (DeepSeek or ModelScope)
-if settings.USE_DEEPSEEK:
-    print(f"Using DeepSeek AI: {settings.DEEPSEEK_MODEL_NAME}")
-    client = OpenAI(
-        api_key=settings.DEEPSEEK_API_KEY,
-        base_url=settings.DEEPSEEK_BASE_URL,
-    )
-    MODEL_NAME = settings.DEEPSEEK_MODEL_NAME
-else:
-    print(f"Using ModelScope AI: {settings.MODELSCOPE_MODEL_NAME}")
-    client = OpenAI(
-        api_key=settings.MODELSCOPE_API_KEY,
-        base_url=settings.MODELSCOPE_BASE_URL,
+# Completion cache TTL (seconds) per endpoint. Only endpoints listed here
+# are cached; their output depends on nothing but the prompt text.
+CACHE_TTL_SECONDS = {
+    "brainstorm": 6 * 3600,
+    "pitch_deck": 24 * 3600,
+    "resume": 6 * 3600,
+    "refine_project": 24 * 3600,
+    "project_idea": 6 * 3600,
+    "recruitment": 24 * 3600,
+}
+
+# How user / hackathon records degrade when a prompt runs over budget:
+# long text is cut in steps, then the listed fields are dropped.
+USER_PACKING = {"abbreviate": {"bio": (400, 160, 60), "skills": (200, 100)}, "drop": ("bio", "mbti_type")}
+HACKATHON_PACKING = {"abbreviate": {"title": (120, 60)}, "drop": ("start_date", "format")}
+
+def _pack(records: List[dict], reserved: str = "", ranked: bool = True, **options) -> List[dict]:
+    """
+    The records (in order) that fit the chat model's prompt budget once
+    `reserved` — the rest of the prompt — is accounted for.
+    """
+    budget = prompt_budget(get_chat_provider().model) - estimate_tokens(reserved)
+    return pack_records(records, budget, ranked=ranked, **options).records
+
+def _validate_reply(response_model: Any, content, wrap: Optional[Callable[[Any], Any]] = None) -> None:
+    """Raise if `content` (wrapped like the endpoint returns it) does not fit `response_model`."""
+    TypeAdapter(response_model).validate_python(wrap(content) if wrap else content)
+
+async def _chat_json(
+    endpoint: str,
+    system_prompt: str,
+    user_prompt: str,
+    response_model: Any = None,
+    wrap: Optional[Callable[[Any], Any]] = None,
+):
+    """
+    Ask the chat provider for a JSON completion, serving repeats of the
+    same (model, system prompt, user prompt) from the completion cache
+    when the endpoint has a TTL. Identical calls already in flight are
+    coalesced onto one upstream request. A reply is checked against
+    `response_model` (after `wrap`) before it is returned or cached, so
+    failed calls and off-schema replies raise and are never cached.
+    """
+    provider = get_chat_provider()
+    ttl = CACHE_TTL_SECONDS.get(endpoint)
+    cache = get_completion_cache() if ttl is not None else None
+
+    key = CompletionCache.make_key(provider.model, system_prompt, user_prompt)
+    if cache is not None:
+        cached = await cache.aget(key, namespace=endpoint)
+        get_ai_metrics().record_cache(endpoint, cached is not None)
+        if cached is not None:
+            return cached
+
+    async def call():
+        content = await provider.chat_json(system_prompt, user_prompt, endpoint=endpoint)
+        if response_model is not None:
+            _validate_reply(response_model, content, wrap)
+        if cache is not None:
+            await cache.aset(key, content, ttl, namespace=endpoint)
+        return content
+
+    return await get_single_flight().do(key, call, namespace=endpoint)
+
+@router.get("/metrics")
+def ai_metrics(
+    current_user: User = Depends(deps.get_current_active_superuser),
+):
+    """
+    Upstream call telemetry (latency histograms, tokens, errors per
+    provider/endpoint), fallbacks, completion cache and request
+    coalescing counters since process start (admin only).
+    """
+    cache = get_completion_cache()
+    return {
+        "cache": cache.stats() if cache is not None else None,
+        "single_flight": get_single_flight().stats(),
+        **get_ai_metrics().snapshot(),
+    }
+
+@router.get("/metrics/summary")
+def ai_metrics_summary(
+    window: Optional[int] = None,
+    current_user: User = Depends(deps.get_current_active_superuser),
+):
+    """
+    Rolling rollup over the last `window` seconds (default
+    AI_METRICS_SUMMARY_WINDOW): latency percentiles, token spend, error,
+    fallback and cache hit ratios per endpoint and per provider.
+    """
+    return get_ai_metrics().summary(window or settings.AI_METRICS_SUMMARY_WINDOW)
+
+# ---------------------------------------------------------------------------
+# Server-sent event streaming
+# ---------------------------------------------------------------------------
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def _sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    # X-Accel-Buffering stops nginx from holding events back until the end
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    MODEL_NAME = settings.MODELSCOPE_MODEL_NAME
+
+async def _sse_payload(payload: dict) -> AsyncIterator[str]:
+    yield _sse("done", payload)
+
+def _array_items(content) -> Iterator[tuple[Optional[str], int, dict]]:
+    """The (key, index, item) triples JSONItemStream would emit for `content`."""
+    if isinstance(content, list):
+        arrays = [(None, content)]
+    elif isinstance(content, dict):
+        arrays = [(k, v) for k, v in content.items() if isinstance(v, list)]
+    else:
+        arrays = []
+    for key, values in arrays:
+        for index, item in enumerate(v for v in values if isinstance(v, dict)):
+            yield key, index, item
+
+async def _stream_chat_json(
+    endpoint: str,
+    system_prompt: str,
+    user_prompt: str,
+    response_model: type[BaseModel],
+    fallback: dict,
+    wrap: Optional[Callable[[Any], Any]] = None,
+) -> AsyncIterator[str]:
+    """
+    Stream one completion as server-sent events:
+      token  {"text"}                  reply text as it arrives
+      item   {"key", "index", "item"}  each array element as soon as its object closes
+      error  {"detail"}                upstream or parse failure
+      done   payload                   final body, validated against response_model
+                                       (the fallback after an error)
+    Cache hits replay their items immediately; completed replies are
+    cached like _chat_json.
+    """
+    # Flush headers right away so time-to-first-byte doesn't wait on the model
+    yield ": stream open\n\n"
+
+    provider = get_chat_provider()
+    ttl = CACHE_TTL_SECONDS.get(endpoint)
+    cache = get_completion_cache() if ttl is not None else None
+    key = CompletionCache.make_key(provider.model, system_prompt, user_prompt)
+    try:
+        content = await cache.aget(key, namespace=endpoint) if cache is not None else None
+        from_cache = content is not None
+        if cache is not None:
+            get_ai_metrics().record_cache(endpoint, from_cache)
+        if from_cache:
+            for name, index, item in _array_items(content):
+                yield _sse("item", {"key": name, "index": index, "item": item})
+        else:
+            parser = JSONItemStream()
+            async for chunk in provider.stream_chat(system_prompt, user_prompt, endpoint=endpoint):
+                yield _sse("token", {"text": chunk})
+                for name, index, item in parser.feed(chunk):
+                    yield _sse("item", {"key": name, "index": index, "item": item})
+            content = extract_json(parser.text)
+
+        payload = response_model.model_validate(wrap(content) if wrap else content).model_dump()
+        if cache is not None and not from_cache:
+            await cache.aset(key, content, ttl, namespace=endpoint)
+    except Exception as e:
+        logger.exception(f"AI stream failed ({endpoint})")
+        get_ai_metrics().record_fallback(endpoint)
+        yield _sse("error", {"detail": str(e)})
+        payload = fallback
+    yield _sse("done", payload)
 
 class TeamMatchRequest(BaseModel):
     hackathon_id: int
@@ -67,26 +243,26 @@ from app.models.enrollment import Enrollment
 async def team_match(
     req: TeamMatchRequest,
     session: Session = Depends(deps.get_session),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: User = Depends(deps.get_current_user_detached)
 ):
     try:
-        # 1. Fetch potential candidates (enrolled in the same hackathon, excluding self)
-        query = select(User).join(Enrollment).where(
-            Enrollment.hackathon_id == req.hackathon_id,
-            User.id != current_user.id,
-            # Allow both approved and pending users to be matched
-            # Enrollment.status.in_(["approved", "pending"]) 
-            # For now, let's just allow anyone enrolled to maximize matches for demo
-        )
-        candidates = session.exec(query).all()
-        
-        # If no candidates found in the hackathon, fallback to global search (optional, but good for demo if empty)
-        if not candidates:
-             candidates = session.exec(select(User).where(User.id != current_user.id)).all()
+        # 1. Pre-rank candidates locally (vector scores over the hackathon's
+        #    participants) and only send the top K to the model
+        index = get_skill_index()
+        ranked = index.top_k(session, req.hackathon_id, current_user, req.requirements, settings.TEAM_MATCH_TOP_K)
+
+        # If nobody else is in the hackathon, fall back to the global pool
+        if not ranked:
+            ranked = index.top_k(session, SkillIndex.GLOBAL, current_user, req.requirements, settings.TEAM_MATCH_TOP_K)
+        if not ranked:
+            return {"matches": []}
+
+        ranked_ids = [user_id for user_id, _ in ranked]
+        by_id = {u.id: u for u in session.exec(select(User).where(User.id.in_(ranked_ids))).all()}
+        candidates = [by_id[user_id] for user_id in ranked_ids if user_id in by_id]
 
-        # Limit to 20 candidates for prompt size limits
         candidates_data = []
-        for c in candidates[:20]:
+        for c in candidates:
             candidates_data.append({
                 "id": c.id,
                 "name": c.nickname or c.full_name,
@@ -112,21 +288,12 @@ Current User Profile:
 {json.dumps(user_profile, ensure_ascii=False)}
 
 Candidate Users:
-{json.dumps(candidates_data, ensure_ascii=False)}
+{json.dumps(_pack(candidates_data, json.dumps(user_profile, ensure_ascii=False), **USER_PACKING), ensure_ascii=False)}
 """
 
-        # 3. Call AI Model
-        completion = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {'role': 'system', 'content': system_prompt},
-                {'role': 'user', 'content': user_prompt}
-            ],
-            response_format={"type": "json_object"}
-        )
-        
-        content_str = completion.choices[0].message.content
-        content = json.loads(content_str)
+        # 3. Call AI Model (connection released while awaiting it)
+        deps.release_connection(session, *candidates)
+        content = await _chat_json("team_match", system_prompt, user_prompt, TeamMatchResponse)
         
         # 4. Enrich response with full user details
         final_matches = []
@@ -151,7 +318,8 @@ Candidate Users:
         return {"matches": final_matches}
 
     except Exception as e:
-        print(f"AI Team Match Error: {e}")
+        logger.exception("AI Team Match failed")
+        get_ai_metrics().record_fallback("team_match")
         # Fallback mock response if AI fails
         return {"matches": []}
 
@@ -166,6 +334,7 @@ class AIReviewResponse(BaseModel):
 
 class SearchHackathonRequest(BaseModel):
     query: str
+    mode: Literal["ai", "local"] = "ai" # 'ai' (BM25 prefilter + LLM) or 'local' (BM25 ranking only, no LLM call)
 
 class SearchHackathonResponse(BaseModel):
     matches: List[dict] # {id, reason}
@@ -186,63 +355,71 @@ class BrainstormRequest(BaseModel):
 class BrainstormResponse(BaseModel):
     ideas: List[dict] # {title, description, tech_stack, complexity}
 
-@router.post("/brainstorm-ideas", response_model=BrainstormResponse)
-async def brainstorm_ideas(
-    req: BrainstormRequest,
-    current_user: User = Depends(deps.get_current_user)
-):
-    try:
-        system_prompt = get_system_prompt("brainstorm_system")
-        user_prompt = f"""
+def _brainstorm_prompts(req: BrainstormRequest) -> tuple[str, str]:
+    system_prompt = get_system_prompt("brainstorm_system")
+    user_prompt = f"""
 Theme: {req.theme}
 User Skills: {req.skills}
 User Interests: {req.interests}
 """
+    return system_prompt, user_prompt
 
-        completion = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {'role': 'system', 'content': system_prompt},
-                {'role': 'user', 'content': user_prompt}
-            ],
-            response_format={"type": "json_object"}
-        )
-        
-        content = json.loads(completion.choices[0].message.content)
+@router.post("/brainstorm-ideas", response_model=BrainstormResponse)
+async def brainstorm_ideas(
+    req: BrainstormRequest,
+    current_user: User = Depends(deps.get_current_user_detached)
+):
+    try:
+        content = await _chat_json("brainstorm", *_brainstorm_prompts(req), BrainstormResponse)
         return content
 
     except Exception as e:
-        print(f"AI Brainstorm Error: {e}")
+        logger.exception("AI Brainstorm failed")
+        get_ai_metrics().record_fallback("brainstorm")
         return {"ideas": []}
 
-@router.post("/generate-pitch-deck", response_model=GeneratePitchDeckResponse)
-async def generate_pitch_deck(
-    req: GeneratePitchDeckRequest,
-    current_user: User = Depends(deps.get_current_user)
+@router.post("/brainstorm-ideas/stream")
+async def brainstorm_ideas_stream(
+    req: BrainstormRequest,
+    current_user: User = Depends(deps.get_current_user_detached)
 ):
-    try:
-        system_prompt = get_system_prompt("pitch_deck_system")
-        user_prompt = f"""
+    """SSE variant of /brainstorm-ideas; one `item` event per idea."""
+    return _sse_response(_stream_chat_json(
+        "brainstorm", *_brainstorm_prompts(req), BrainstormResponse, {"ideas": []},
+    ))
+
+def _pitch_deck_prompts(req: GeneratePitchDeckRequest) -> tuple[str, str]:
+    system_prompt = get_system_prompt("pitch_deck_system")
+    user_prompt = f"""
 Project Name: {req.project_name}
 Description: {req.project_description}
 """
+    return system_prompt, user_prompt
 
-        completion = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {'role': 'system', 'content': system_prompt},
-                {'role': 'user', 'content': user_prompt}
-            ],
-            response_format={"type": "json_object"}
-        )
-        
-        content = json.loads(completion.choices[0].message.content)
+@router.post("/generate-pitch-deck", response_model=GeneratePitchDeckResponse)
+async def generate_pitch_deck(
+    req: GeneratePitchDeckRequest,
+    current_user: User = Depends(deps.get_current_user_detached)
+):
+    try:
+        content = await _chat_json("pitch_deck", *_pitch_deck_prompts(req), GeneratePitchDeckResponse)
         return content
 
     except Exception as e:
-        print(f"AI Pitch Deck Error: {e}")
+        logger.exception("AI Pitch Deck failed")
+        get_ai_metrics().record_fallback("pitch_deck")
         return {"slides": []}
 
+@router.post("/generate-pitch-deck/stream")
+async def generate_pitch_deck_stream(
+    req: GeneratePitchDeckRequest,
+    current_user: User = Depends(deps.get_current_user_detached)
+):
+    """SSE variant of /generate-pitch-deck; one `item` event per slide."""
+    return _sse_response(_stream_chat_json(
+        "pitch_deck", *_pitch_deck_prompts(req), GeneratePitchDeckResponse, {"slides": []},
+    ))
+
 class GenerateResumeRequest(BaseModel):
     keywords: str
     role: str
@@ -255,7 +432,7 @@ class GenerateResumeResponse(BaseModel):
 @router.post("/generate-resume", response_model=GenerateResumeResponse)
 async def generate_resume(
     req: GenerateResumeRequest,
-    current_user: User = Depends(deps.get_current_user)
+    current_user: User = Depends(deps.get_current_user_detached)
 ):
     try:
         system_prompt = get_system_prompt("resume_system")
@@ -265,20 +442,12 @@ Keywords: {req.keywords}
 Language: {req.lang}
 """
 
-        completion = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {'role': 'system', 'content': system_prompt},
-                {'role': 'user', 'content': user_prompt}
-            ],
-            response_format={"type": "json_object"}
-        )
-        
-        content = json.loads(completion.choices[0].message.content)
+        content = await _chat_json("resume", system_prompt, user_prompt, GenerateResumeResponse)
         return content
 
     except Exception as e:
-        print(f"AI Resume Error: {e}")
+        logger.exception("AI Resume failed")
+        get_ai_metrics().record_fallback("resume")
         return {"bio": "Failed to generate bio.", "skills": []}
 
 from app.models.hackathon import Hackathon
@@ -289,9 +458,34 @@ async def search_hackathons(
     session: Session = Depends(deps.get_session)
 ):
     try:
-        # 1. Fetch active hackathons
-        hackathons = session.exec(select(Hackathon).where(Hackathon.status.in_(['published', 'ongoing']))).all()
-        
+        # 1. Prefilter active hackathons with the local BM25 index
+        index = get_hackathon_search_index()
+        index.ensure_built(session)
+        ranked = index.search(req.query, limit=settings.AI_SEARCH_TOP_N)
+
+        if req.mode == "local":
+            return {
+                "matches": [
+                    {"id": h_id, "score": round(score, 4), "reason": f"关键词匹配: {'、'.join(terms)}"}
+                    for h_id, score, terms in ranked
+                ],
+                "summary": f"找到 {len(ranked)} 个相关黑客松" if ranked else "没有找到匹配的黑客松",
+            }
+
+        if ranked:
+            ids = [h_id for h_id, _, _ in ranked]
+            by_id = {h.id: h for h in session.exec(select(Hackathon).where(Hackathon.id.in_(ids))).all()}
+            hackathons = [by_id[h_id] for h_id in ids if h_id in by_id]
+        else:
+            # No keyword overlap (e.g. "anything fun this weekend?"): let the
+            # model pick among the most recent active hackathons instead
+            hackathons = session.exec(
+                select(Hackathon)
+                .where(Hackathon.status.in_(SEARCHABLE_STATUSES))
+                .order_by(Hackathon.created_at.desc())
+                .limit(settings.AI_SEARCH_TOP_N)
+            ).all()
+
         hackathons_data = []
         for h in hackathons:
             # Build a location string from structured geo fields
@@ -311,186 +505,255 @@ async def search_hackathons(
 User Query: {req.query}
 
 Active Hackathons:
-{json.dumps(hackathons_data, ensure_ascii=False)}
+{json.dumps(_pack(hackathons_data, req.query, **HACKATHON_PACKING), ensure_ascii=False)}
 """
 
-        # 3. Call AI
-        completion = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {'role': 'system', 'content': system_prompt},
-                {'role': 'user', 'content': user_prompt}
-            ],
-            response_format={"type": "json_object"}
-        )
-        
-        content = json.loads(completion.choices[0].message.content)
+        # 3. Call AI (connection released while awaiting it)
+        deps.release_connection(session)
+        content = await _chat_json("search_hackathons", system_prompt, user_prompt, SearchHackathonResponse)
         return content
 
     except Exception as e:
-        print(f"AI Search Error: {e}")
+        logger.exception("AI Search failed")
+        get_ai_metrics().record_fallback("search_hackathons")
         return {"matches": [], "summary": "Sorry, I encountered an error while searching. Please try again."}
 
+def _review_prompts(project_name: str, project_description: str, scoring_dimensions: List[dict]) -> tuple[str, str]:
+    system_prompt = get_system_prompt("review_system")
+    user_prompt = f"""
+Project Name: {project_name}
+Project Description: {project_description}
+
+Scoring Dimensions:
+{json.dumps(scoring_dimensions, ensure_ascii=False)}
+"""
+    return system_prompt, user_prompt
+
 @router.post("/review", response_model=AIReviewResponse)
 async def review_project(
     req: AIReviewRequest,
-    current_user: User = Depends(deps.get_current_user)
+    current_user: User = Depends(deps.get_current_user_detached)
 ):
     try:
-        system_prompt = get_system_prompt("review_system")
-        user_prompt = f"""
-Project Name: {req.project_name}
-Project Description: {req.project_description}
-
-Scoring Dimensions:
-{json.dumps(req.scoring_dimensions, ensure_ascii=False)}
-"""
-
-        completion = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {'role': 'system', 'content': system_prompt},
-                {'role': 'user', 'content': user_prompt}
-            ],
-             response_format={"type": "json_object"}
+        system_prompt, user_prompt = _review_prompts(
+            req.project_name, req.project_description, req.scoring_dimensions
         )
-        
-        content_str = completion.choices[0].message.content
-        content = json.loads(content_str)
+        content = await _chat_json("review", system_prompt, user_prompt, AIReviewResponse)
         return content
         
     except Exception as e:
-        print(f"AI Error: {e}")
+        logger.exception("AI review failed")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/generate", response_model=AIResponse)
-async def generate_content(
-    req: AIRequest,
-    current_user: User = Depends(deps.get_current_user)
-):
-    try:
-        if req.type == 'hackathon':
-            if req.context_data:
-                # Refinement Mode
-                system_prompt = get_system_prompt("hackathon_refinement_system")
-                user_prompt = f"Current Data: {json.dumps(req.context_data, ensure_ascii=False)}\nUser Instruction: {req.prompt}"
-            else:
-                # Creation Mode
-                system_prompt = get_system_prompt("hackathon_creation_system")
-                user_prompt = f"Topic: {req.prompt}"
-            
-            completion = client.chat.completions.create(
-                model=MODEL_NAME,
-                messages=[
-                    {'role': 'system', 'content': system_prompt},
-                    {'role': 'user', 'content': user_prompt}
-                ],
-                response_format={"type": "json_object"}
-            )
-            
-            content_str = completion.choices[0].message.content
-            content = json.loads(content_str)
-            return {"content": content}
+# ---------------------------------------------------------------------------
+# Batch review — every submitted project of a hackathon, in the background
+# ---------------------------------------------------------------------------
 
-        elif req.type == 'project':
-            system_prompt = get_system_prompt("project_refinement_system")
-            user_prompt = f"Project Idea: {req.prompt}"
-            
-            completion = client.chat.completions.create(
-                model=MODEL_NAME,
-                messages=[
-                    {'role': 'system', 'content': system_prompt},
-                    {'role': 'user', 'content': user_prompt}
-                ],
-                response_format={"type": "json_object"}
-            )
-            
-            content_str = completion.choices[0].message.content
-            content = json.loads(content_str)
-            return {"content": content}
+class AIReviewBatchRequest(BaseModel):
+    hackathon_id: int
 
-        elif req.type == 'participant_analysis':
-            system_prompt = get_system_prompt("participant_analysis_system")
-            
-            participants_data = req.context_data.get('participants', []) if req.context_data else []
-            # Limit to top 50 to avoid token limits if too many
-            participants_summary = json.dumps(participants_data[:50], ensure_ascii=False)
-            
-            user_prompt = f"Analyze these participants: {participants_summary}"
-            
-            completion = client.chat.completions.create(
-                model=MODEL_NAME,
-                messages=[
-                    {'role': 'system', 'content': system_prompt},
-                    {'role': 'user', 'content': user_prompt}
-                ],
-                response_format={"type": "json_object"}
-            )
-            
-            content_str = completion.choices[0].message.content
-            content = json.loads(content_str)
-            return {"content": content}
-            
-        elif req.type == 'matching':
-            # Use current user's profile to find matches
-            user_skills = current_user.skills or "General"
-            
-            system_prompt = get_system_prompt("matching_system")
-            if req.prompt and len(req.prompt) > 10 and req.prompt != 'match':
-                context_prompt = f"Project Context: {req.prompt}. "
-            else:
-                context_prompt = "Context: General Hackathon Team. "
-                
-            user_prompt = f"{context_prompt}User Skills: {user_skills}. Suggest complementary teammates."
-            
-            completion = client.chat.completions.create(
-                model=MODEL_NAME,
-                messages=[
-                    {'role': 'system', 'content': system_prompt},
-                    {'role': 'user', 'content': user_prompt}
-                ],
-                response_format={"type": "json_object"}
+async def _review_submission(project_name: str, project_description: str, scoring_dimensions: List[dict]) -> dict:
+    """Review callback for the batch runner; raises on an unusable reply."""
+    system_prompt, user_prompt = _review_prompts(project_name, project_description, scoring_dimensions)
+    content = await _chat_json("review", system_prompt, user_prompt, AIReviewResponse)
+    review = AIReviewResponse.model_validate(content)
+    return {"scores": review.scores, "comment": review.comment, "model": get_chat_provider().model}
+
+async def resume_review_jobs() -> list[int]:
+    """Pick up batch review jobs left queued or orphaned by a restart, now and as they go stale (startup hook)."""
+    runner = get_review_job_runner()
+    started = await runner.resume(_review_submission)
+    runner.start_sweeper(_review_submission)
+    return started
+
+def _check_organizer_permission(session: Session, hackathon_id: int, user_id: int) -> None:
+    org = session.exec(
+        select(HackathonOrganizer).where(
+            HackathonOrganizer.hackathon_id == hackathon_id,
+            HackathonOrganizer.user_id == user_id,
+            HackathonOrganizer.status == OrganizerStatus.ACCEPTED,
+            HackathonOrganizer.role.in_([OrganizerRole.OWNER, OrganizerRole.ADMIN]),
+        )
+    ).first()
+    if not org:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+def _job_read(job: AIReviewJob) -> AIReviewJobRead:
+    return AIReviewJobRead.model_validate(job, update={"progress": job_progress(job)})
+
+@router.post("/review-batch", response_model=AIReviewJobRead)
+async def start_review_batch(
+    req: AIReviewBatchRequest,
+    session: Session = Depends(deps.get_session),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Start reviewing every submitted project of a hackathon. Returns the
+    job immediately; poll GET /ai/review-batch/{id} for progress. If a job
+    for the hackathon is already queued or running it is returned instead.
+    Database work runs in the threadpool; only the runner task is
+    scheduled on the event loop.
+    """
+    def find_or_create_job() -> int:
+        _check_organizer_permission(session, req.hackathon_id, current_user.id)
+        job = session.exec(
+            select(AIReviewJob).where(
+                AIReviewJob.hackathon_id == req.hackathon_id,
+                AIReviewJob.status.in_([AIReviewJobStatus.QUEUED, AIReviewJobStatus.RUNNING]),
             )
+        ).first()
+        if job is None:
+            job = AIReviewJob(hackathon_id=req.hackathon_id, created_by=current_user.id)
+            session.add(job)
+            session.commit()
+            session.refresh(job)
+        return job.id
+
+    def read_job(job_id: int) -> AIReviewJobRead:
+        return _job_read(session.get(AIReviewJob, job_id, populate_existing=True))
+
+    job_id = await run_in_threadpool(find_or_create_job)
+    await get_review_job_runner().start(job_id, _review_submission)
+    return await run_in_threadpool(read_job, job_id)
+
+@router.get("/review-batch/{job_id}", response_model=AIReviewJobRead)
+def read_review_batch(
+    job_id: int,
+    session: Session = Depends(deps.get_session),
+    current_user: User = Depends(deps.get_current_user),
+):
+    job = session.get(AIReviewJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Review job not found")
+    _check_organizer_permission(session, job.hackathon_id, current_user.id)
+    session.refresh(job)
+    return _job_read(job)
+
+@router.get("/reviews", response_model=List[SubmissionAIReviewRead])
+def read_submission_reviews(
+    hackathon_id: int,
+    session: Session = Depends(deps.get_session),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """Stored AI reviews of a hackathon's submissions (organizers only)."""
+    _check_organizer_permission(session, hackathon_id, current_user.id)
+    reviews = session.exec(
+        select(SubmissionAIReview)
+        .where(SubmissionAIReview.hackathon_id == hackathon_id)
+        .order_by(SubmissionAIReview.submission_id)
+    ).all()
+    return [
+        SubmissionAIReviewRead.model_validate(r, update={"scores": json.loads(r.scores)})
+        for r in reviews
+    ]
+
+def _generate_prompts(req: AIRequest, current_user: User) -> Optional[tuple[str, str, str]]:
+    """(endpoint name, system prompt, user prompt) for an /ai/generate request, or None for an unknown type."""
+    if req.type == 'hackathon':
+        if req.context_data:
+            # Refinement Mode
+            system_prompt = get_system_prompt("hackathon_refinement_system")
+            user_prompt = f"Current Data: {json.dumps(req.context_data, ensure_ascii=False)}\nUser Instruction: {req.prompt}"
+        else:
+            # Creation Mode
+            system_prompt = get_system_prompt("hackathon_creation_system")
+            user_prompt = f"Topic: {req.prompt}"
+        return "generate_hackathon", system_prompt, user_prompt
+
+    elif req.type == 'project':
+        system_prompt = get_system_prompt("project_refinement_system")
+        user_prompt = f"Project Idea: {req.prompt}"
+        return "generate_project", system_prompt, user_prompt
+
+    elif req.type == 'participant_analysis':
+        system_prompt = get_system_prompt("participant_analysis_system")
+        
+        participants_data = req.context_data.get('participants', []) if req.context_data else []
+        # Fit as many participants as the model's prompt budget allows
+        participants_data = [p for p in participants_data if isinstance(p, dict)]
+        participants_summary = json.dumps(_pack(participants_data, ranked=False, **USER_PACKING), ensure_ascii=False)
+        
+        user_prompt = f"Analyze these participants: {participants_summary}"
+        return "participant_analysis", system_prompt, user_prompt
+        
+    elif req.type == 'matching':
+        # Use current user's profile to find matches
+        user_skills = current_user.skills or "General"
+        
+        system_prompt = get_system_prompt("matching_system")
+        if req.prompt and len(req.prompt) > 10 and req.prompt != 'match':
+            context_prompt = f"Project Context: {req.prompt}. "
+        else:
+            context_prompt = "Context: General Hackathon Team. "
             
-            content_str = completion.choices[0].message.content
-            content = json.loads(content_str)
-            return {"content": content}
+        user_prompt = f"{context_prompt}User Skills: {user_skills}. Suggest complementary teammates."
+        return "matching", system_prompt, user_prompt
 
-    except Exception as e:
-        print(f"AI Generation Error: {e}")
-        # Fallback to mock if AI fails
-        if req.type == 'hackathon':
-            return {
-                "content": {
-                    "title": f"Aura {req.prompt} Hackathon (Offline Mode)",
-                    "description": f"AI Service unavailable. Generating offline template for {req.prompt}.",
-                    "theme_tags": f"{req.prompt}, Fallback",
-                    "professionalism_tags": "General",
-                    "rules_detail": "Standard rules apply.",
-                    "resource_detail": "Standard resources provided.",
-                    "awards_detail": "Standard awards.",
-                    "scoring_dimensions": [{"name": "General", "description": "Overall score", "weight": 100}]
-                }
+    return None
+
+def _generate_fallback(req: AIRequest) -> dict:
+    """Offline response for /ai/generate when the AI call fails."""
+    if req.type == 'hackathon':
+        return {
+            "content": {
+                "title": f"Aura {req.prompt} Hackathon (Offline Mode)",
+                "description": f"AI Service unavailable. Generating offline template for {req.prompt}.",
+                "theme_tags": f"{req.prompt}, Fallback",
+                "professionalism_tags": "General",
+                "rules_detail": "Standard rules apply.",
+                "resource_detail": "Standard resources provided.",
+                "awards_detail": "Standard awards.",
+                "scoring_dimensions": [{"name": "General", "description": "Overall score", "weight": 100}]
             }
-        elif req.type == 'project':
-             return {
-                "content": {
-                    "description": f"AI Service unavailable. Please refine '{req.prompt}' manually.",
-                    "business_plan": "N/A"
-                }
+        }
+    elif req.type == 'project':
+         return {
+            "content": {
+                "description": f"AI Service unavailable. Please refine '{req.prompt}' manually.",
+                "business_plan": "N/A"
             }
-        elif req.type == 'matching':
-             return {
-                "content": {
-                    "matches": [
-                        {"user_id": 1, "name": "Offline Match 1", "skills": "Java", "match_score": 80},
-                        {"user_id": 2, "name": "Offline Match 2", "skills": "Python", "match_score": 75}
-                    ]
-                }
+        }
+    elif req.type == 'matching':
+         return {
+            "content": {
+                "matches": [
+                    {"user_id": 1, "name": "Offline Match 1", "skills": "Java", "match_score": 80},
+                    {"user_id": 2, "name": "Offline Match 2", "skills": "Python", "match_score": 75}
+                ]
             }
-            
+        }
     return {"content": {}}
 
+@router.post("/generate", response_model=AIResponse)
+async def generate_content(
+    req: AIRequest,
+    current_user: User = Depends(deps.get_current_user_detached)
+):
+    try:
+        prompts = _generate_prompts(req, current_user)
+        if prompts is None:
+            return {"content": {}}
+        content = await _chat_json(*prompts, AIResponse, wrap=lambda content: {"content": content})
+        return {"content": content}
+    except Exception as e:
+        logger.exception("AI Generation failed")
+        get_ai_metrics().record_fallback("generate")
+        # Fallback to mock if AI fails
+        return _generate_fallback(req)
+
+@router.post("/generate/stream")
+async def generate_content_stream(
+    req: AIRequest,
+    current_user: User = Depends(deps.get_current_user_detached)
+):
+    """SSE variant of /generate; the `done` event carries the AIResponse payload."""
+    prompts = _generate_prompts(req, current_user)
+    if prompts is None:
+        return _sse_response(_sse_payload({"content": {}}))
+    return _sse_response(_stream_chat_json(
+        *prompts, AIResponse, _generate_fallback(req), wrap=lambda content: {"content": content},
+    ))
+
 # --- New AI Project Assistant Endpoints ---
 
 class ProjectIdeaRequest(BaseModel):
@@ -521,22 +784,10 @@ async def generate_project_idea(req: ProjectIdeaRequest):
         
         user_prompt = f"Keywords: {req.keywords}\nContext: {req.hackathon_context or 'General Hackathon'}"
         
-        response = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            response_format={"type": "json_object"}
-        )
-        
-        content = response.choices[0].message.content
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0].strip()
-        
-        return json.loads(content)
+        return await _chat_json("project_idea", system_prompt, user_prompt, ProjectIdeaResponse)
     except Exception as e:
-        print(f"Generate Idea Error: {e}")
+        logger.exception("Generate Idea failed")
+        get_ai_metrics().record_fallback("project_idea")
         # Mock fallback
         return {
             "title": "AI Project Assistant (Fallback)",
@@ -562,20 +813,16 @@ class CommunityInsightsResponse(BaseModel):
 async def get_community_insights(
     req: CommunityInsightsRequest,
     session: Session = Depends(deps.get_session),
-    current_user: User = Depends(deps.get_current_user)
+    current_user: User = Depends(deps.get_current_user_detached)
 ):
     """
     Analyze the participant pool of a hackathon to provide AI-driven insights.
     """
     try:
-        # 1. Fetch all participants for the hackathon
-        from app.models.enrollment import Enrollment
-        query = select(User).join(Enrollment).where(
-            Enrollment.hackathon_id == req.hackathon_id
-        )
-        participants = session.exec(query).all()
-        
-        if not participants:
+        # 1. Head count and skill / MBTI histograms, maintained incrementally
+        #    by the enrollment and profile endpoints
+        stats = participant_stats.read(session, req.hackathon_id)
+        if not stats["participants"]:
             return {
                 "summary": "暂无参赛者数据",
                 "skill_distribution": {},
@@ -584,68 +831,59 @@ async def get_community_insights(
                 "mbti_distribution": {},
                 "hot_topics": []
             }
-        
-        # 2. Prepare participant data
-        participants_data = []
-        all_skills = []
-        mbti_types = {}
-        
-        for p in participants:
-            if p.skills:
-                all_skills.extend([s.strip() for s in p.skills.split(',')])
-            if p.personality and len(p.personality) == 4:
-                mbti_types[p.personality] = mbti_types.get(p.personality, 0) + 1
-            
-            participants_data.append({
-                "id": p.id,
-                "skills": p.skills,
-                "personality": p.personality,
-                "bio": p.bio
-            })
-        
-        # 3. Calculate skill distribution
-        from collections import Counter
-        skill_counts = Counter(all_skills)
-        skill_distribution = dict(skill_counts.most_common(15))
-        
-        # 4. Call AI for deep analysis
-        system_prompt = get_system_prompt("participant_analysis_system")
-        user_prompt = f"""
-Analyze these hackathon participants:
-Total Participants: {len(participants)}
-
-Participants Data:
-{json.dumps(participants_data[:30], ensure_ascii=False)}
 
+        # 2. Reuse the last AI summary until the pool has changed materially
+        analysis = participant_stats.cached_summary(session, req.hackathon_id, stats)
+        if analysis is None:
+            from app.models.enrollment import Enrollment
+            rows = session.exec(
+                select(User.id, User.skills, User.personality, User.bio)
+                .join(Enrollment, Enrollment.user_id == User.id)
+                .where(Enrollment.hackathon_id == req.hackathon_id)
+            ).all()
+            participants_data = [
+                {"id": user_id, "skills": skills, "personality": personality, "bio": bio}
+                for user_id, skills, personality, bio in rows
+            ]
+
+            # 3. Call AI for deep analysis, with a representative sample of
+            #    participants sized to the model's prompt budget
+            system_prompt = get_system_prompt("participant_analysis_system")
+            distributions = f"""
 Skill Distribution:
-{json.dumps(skill_distribution, ensure_ascii=False)}
+{json.dumps(stats["skill_distribution"], ensure_ascii=False)}
 
 MBTI Distribution:
-{json.dumps(mbti_types, ensure_ascii=False)}
+{json.dumps(stats["mbti_distribution"], ensure_ascii=False)}
 """
-        
-        completion = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {'role': 'system', 'content': system_prompt},
-                {'role': 'user', 'content': user_prompt}
-            ],
-            response_format={"type": "json_object"}
-        )
-        
-        ai_analysis = json.loads(completion.choices[0].message.content)
-        
+            sample = _pack(participants_data, distributions, ranked=False, **USER_PACKING)
+            user_prompt = f"""
+Analyze these hackathon participants:
+Total Participants: {stats["participants"]}
+
+Participants Data:
+{json.dumps(sample, ensure_ascii=False)}
+{distributions}"""
+
+            deps.release_connection(session)
+            ai_analysis = await _chat_json("community_insights", system_prompt, user_prompt)
+            analysis = {
+                "summary": ai_analysis.get("summary", ""),
+                "interest_clusters": ai_analysis.get("interest_clusters", []),
+                "recommendations": ai_analysis.get("recommendations", []),
+            }
+            participant_stats.store_summary(session, req.hackathon_id, analysis, stats)
+
         return {
-            "summary": ai_analysis.get("summary", ""),
-            "skill_distribution": skill_distribution,
-            "interest_clusters": ai_analysis.get("interest_clusters", []),
-            "recommendations": ai_analysis.get("recommendations", []),
-            "mbti_distribution": mbti_types,
+            **analysis,
+            "skill_distribution": stats["skill_distribution"],
+            "mbti_distribution": stats["mbti_distribution"],
             "hot_topics": []
         }
-        
+
     except Exception as e:
-        print(f"Community Insights Error: {e}")
+        logger.exception("Community Insights failed")
+        get_ai_metrics().record_fallback("community_insights")
         # Fallback response
         return {
             "summary": "AI 分析服务暂时不可用",
@@ -687,22 +925,10 @@ async def generate_recruitment(req: RecruitmentGenRequest):
         
         user_prompt = f"Project: {req.project_name}\nDescription: {req.project_description}"
         
-        response = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            response_format={"type": "json_object"}
-        )
-        
-        content = response.choices[0].message.content
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0].strip()
-            
-        return json.loads(content)
+        return await _chat_json("recruitment", system_prompt, user_prompt, List[RecruitmentGenResponse])
     except Exception as e:
-        print(f"Generate Recruitment Error: {e}")
+        logger.exception("Generate Recruitment failed")
+        get_ai_metrics().record_fallback("recruitment")
         return []
 
 class RefineProjectRequest(BaseModel):
@@ -727,22 +953,10 @@ async def refine_project(req: RefineProjectRequest):
         
         user_prompt = f"Original Description: {req.description}"
         
-        response = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            response_format={"type": "json_object"}
-        )
-        
-        content = response.choices[0].message.content
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0].strip()
-            
-        return json.loads(content)
+        return await _chat_json("refine_project", system_prompt, user_prompt, RefineProjectResponse)
     except Exception as e:
-        print(f"Refine Project Error: {e}")
+        logger.exception("Refine Project failed")
+        get_ai_metrics().record_fallback("refine_project")
         return {"refined_description": req.description}
 
 
@@ -757,88 +971,118 @@ class ImageGenerationResponse(BaseModel):
     url: str
     revised_prompt: Optional[str] = None
 
-@router.post("/generate-image", response_model=ImageGenerationResponse)
-async def generate_image(
-    req: ImageGenerationRequest,
-    current_user: User = Depends(deps.get_current_user)
-):
+class ImageJobResponse(BaseModel):
+    id: str
+    status: str  # queued | running | completed | failed
+    url: Optional[str] = None
+    revised_prompt: Optional[str] = None
+    source: Optional[str] = None
+    error: Optional[str] = None
+
+IMAGE_SIZES = {"1024x1024", "1024x1792", "1792x1024"}
+
+def _enhance_image_prompt(prompt: str) -> str:
+    # 使用中文提示词优化
+    return f"""{prompt}
+
+高质量，专业设计，精美细节，高清渲染，最佳画质，专业摄影风格，完美的光影效果，8K超清。"""
+
+async def _render_image(prompt: str, size: str) -> tuple[str, Optional[str], str]:
     """
-    Generate an image using SiliconFlow (硅基流动) free image generation API.
-    Falls back to Pollinations.ai if SiliconFlow fails.
+    Image worker callback: SiliconFlow (硅基流动) first, Pollinations.ai if
+    that fails. Returns (URL to download, revised prompt, source); the
+    queue downloads the URL, so a dead Pollinations link fails the job.
     """
+    enhanced_prompt = _enhance_image_prompt(prompt)
     try:
-        # Try SiliconFlow (硅基流动) first - using user's API key
-        # SiliconFlow offers free image generation models
-        print(f"Trying SiliconFlow image generation with prompt: {req.prompt[:50]}...")
-        
-        # Initialize SiliconFlow client
-        siliconflow_client = OpenAI(
-            api_key=settings.SILICONFLOW_API_KEY,
-            base_url=settings.SILICONFLOW_BASE_URL,
+        image = await get_image_provider().generate_image(enhanced_prompt, size=size)
+        if image is not None and (image.url or image.b64_json):
+            url = image.url or f"data:image/png;base64,{image.b64_json}"
+            return url, image.revised_prompt or enhanced_prompt, "siliconflow"
+    except Exception as siliconflow_error:
+        logger.exception("SiliconFlow image generation failed, falling back to Pollinations")
+        get_ai_metrics().record_fallback("generate_image")
+
+    import urllib.parse
+    encoded_prompt = urllib.parse.quote(enhanced_prompt)
+    width, _, height = size.partition("x")
+    seed = int(hashlib.sha256(enhanced_prompt.encode("utf-8")).hexdigest()[:8], 16) % 100000
+    pollinations_url = f"https://image.pollinations.ai/prompt/{encoded_prompt}?width={width}&height={height}&nologo=true&seed={seed}&model=flux&enhance=true"
+    return pollinations_url, enhanced_prompt, "pollinations"
+
+async def _submit_image_job(req: ImageGenerationRequest, user: User):
+    size = req.size if req.size in IMAGE_SIZES else "1024x1024"
+    try:
+        return await get_image_job_queue().submit(user.id, get_image_provider().model, req.prompt, size, _render_image)
+    except ImageQueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Image generation is busy, please try again shortly",
+            headers={"Retry-After": "10"},
         )
-        
-        # Enhance prompt for better results - 使用中文提示词优化
-        enhanced_prompt = f"""{req.prompt}
 
-高质量，专业设计，精美细节，高清渲染，最佳画质，专业摄影风格，完美的光影效果，8K超清。"""
-        
-        try:
-            # Try to generate with SiliconFlow
-            # Map size to appropriate format
-            size_map = {
-                "1024x1024": "1024x1024",
-                "1024x1792": "1024x1792",
-                "1792x1024": "1792x1024",
-            }
-            image_size = size_map.get(req.size, "1024x1024")
-            
-            response = siliconflow_client.images.generate(
-                model=settings.SILICONFLOW_IMAGE_MODEL,
-                prompt=enhanced_prompt,
-                size=image_size,
-                n=1,
-            )
+@router.post("/image-jobs", response_model=ImageJobResponse)
+async def submit_image_job(
+    req: ImageGenerationRequest,
+    current_user: User = Depends(deps.get_current_user_detached)
+):
+    """
+    Queue an image generation and return its job right away. The job id is
+    derived from the prompt, so repeating a prompt returns the finished
+    job (served from local storage) without another upstream call. Only
+    users who submitted a job can read it.
+    """
+    return (await _submit_image_job(req, current_user)).to_dict()
 
-            if response.data and len(response.data) > 0:
-                print(f"Successfully generated image with SiliconFlow")
-                return {
-                    "url": response.data[0].url,
-                    "revised_prompt": response.data[0].revised_prompt or enhanced_prompt
-                }
-        except Exception as siliconflow_error:
-            print(f"SiliconFlow image generation failed: {siliconflow_error}")
-            # Fall through to Pollinations.ai
-        
-        # Fallback: Use Pollinations.ai (free image generation API)
-        print("Falling back to Pollinations.ai")
-        import urllib.parse
-        
-        encoded_prompt = urllib.parse.quote(enhanced_prompt)
-        
-        # Pollinations.ai supports various models via the model parameter
-        pollinations_url = f"https://image.pollinations.ai/prompt/{encoded_prompt}?width=1024&height=1024&nologo=true&seed={random.randint(1, 100000)}&model=flux&enhance=true"
-
-        # Verify the URL is accessible
-        import httpx
-        async with httpx.AsyncClient() as client:
-            response = await client.head(pollinations_url, timeout=30.0)
-            if response.status_code == 200:
-                print(f"Successfully generated image with Pollinations.ai")
-                return {
-                    "url": pollinations_url,
-                    "revised_prompt": enhanced_prompt
-                }
-
-        # Final fallback
-        return {
-            "url": f"https://picsum.photos/seed/{random.randint(1, 10000)}/1024/1024",
-            "revised_prompt": req.prompt
-        }
+@router.get("/image-jobs/{job_id}", response_model=ImageJobResponse)
+async def read_image_job(
+    job_id: str,
+    current_user: User = Depends(deps.get_current_user_detached)
+):
+    job = await get_image_job_queue().get(job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Image job not found")
+    return job.to_dict()
+
+@router.get("/image-jobs/{job_id}/events")
+async def image_job_events(
+    job_id: str,
+    current_user: User = Depends(deps.get_current_user_detached)
+):
+    """SSE: one `status` event now, then `done` with the final job when it finishes."""
+    queue = get_image_job_queue()
+    job = await queue.get(job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Image job not found")
+
+    async def events() -> AsyncIterator[str]:
+        yield _sse("status", job.to_dict())
+        while not job.done.is_set():
+            await queue.wait(job, timeout=15)
+            if not job.done.is_set():
+                yield ": keep-alive\n\n"
+        yield _sse("done", job.to_dict())
+
+    return _sse_response(events())
 
-    except Exception as e:
-        print(f"Image Generation Error: {e}")
-        # Final fallback - return a placeholder
-        return {
-            "url": f"https://picsum.photos/seed/{random.randint(1, 10000)}/1024/1024",
-            "revised_prompt": req.prompt
-        }
+@router.post("/generate-image", response_model=ImageGenerationResponse)
+async def generate_image(
+    req: ImageGenerationRequest,
+    current_user: User = Depends(deps.get_current_user_detached)
+):
+    """
+    Blocking wrapper around the image job queue for existing clients: waits
+    up to AI_IMAGE_WAIT_SECONDS for the job and returns its local URL.
+    A placeholder is returned if the job fails or is still running.
+    """
+    job = await get_image_job_queue().wait(await _submit_image_job(req, current_user), timeout=settings.AI_IMAGE_WAIT_SECONDS)
+    if job.status == ImageJobStatus.COMPLETED:
+        return {"url": job.url, "revised_prompt": job.revised_prompt}
+
+    logger.warning(f"Image generation failed: {job.error or 'timed out waiting for job ' + job.id[:12]}")
+    get_ai_metrics().record_fallback("generate_image")
+    # Final fallback - return a placeholder
+    return {
+        "url": f"https://picsum.photos/seed/{random.randint(1, 10000)}/1024/1024",
+        "revised_prompt": req.prompt
+    }
@@ -11,7 +11,7 @@ import logging
 from app.api import deps
 from app.core import security
 from app.core.config import settings
-from app.db.session import get_session
+from app.db.session import get_primary_session, get_session
 from app.models.user import User, UserCreate, UserRead, VerificationCode, InvitationCode
 from app.core.security import get_password_hash, verify_password
 from app.core.services import WeChatService, EmailService
@@ -479,7 +479,7 @@ async def get_wechat_qr():
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/wechat/poll")
-def poll_wechat(scene_id: str, session: Session = Depends(get_session)):
+def poll_wechat(scene_id: str, session: Session = Depends(get_primary_session)):
     status_info = WeChatService.check_status(scene_id)
     if status_info and status_info["status"] == "scanned":
         openid = status_info["openid"]
@@ -1,81 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlmodel import Session, select
-from typing import List
-from app.db.session import get_session
+from typing import List, Optional
+from app.db.session import get_primary_session, get_session
 from app.api.deps import get_current_user
+from app.core.community_stats import compute_insights, get_insights_cache
+from app.core.pagination import Keyset, paginate, set_next_cursor
 from app.models.user import User
 from app.models.community import CommunityPost, CommunityComment, CommunityPostBase, CommunityCommentBase
 from app.models.enrollment import Enrollment
 import requests
-import random
-from datetime import datetime, timedelta
 
 router = APIRouter()
 
+POST_ORDER = Keyset("created", (CommunityPost.created_at, CommunityPost.id))
+
 @router.get("/insights")
 def get_community_insights(
     hackathon_id: int,
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_primary_session)
 ):
-    # 1. Hot Topics (Mocked based on post titles or real aggregation)
-    # In a real scenario, we would use NLP to extract keywords from post content
-    hot_topics = [
-        {"text": "AI Models", "value": 45},
-        {"text": "Team Formation", "value": 30},
-        {"text": "Dataset", "value": 25},
-        {"text": "Deployment", "value": 20},
-        {"text": "GPU", "value": 15},
-        {"text": "Frontend", "value": 10},
-    ]
-
-    # 2. Skill Distribution (Aggregated from enrolled users)
-    # Joining Enrollment and User tables would be ideal here
-    # For now, we mock it to guarantee data for visualization
-    skill_distribution = [
-        {"name": "Python", "count": 35},
-        {"name": "React", "count": 20},
-        {"name": "Design", "count": 15},
-        {"name": "Product", "count": 10},
-        {"name": "Marketing", "count": 5},
-    ]
-
-    # 3. Activity Trend (Posts per day for the last 7 days)
-    activity_trend = []
-    today = datetime.now().date()
-    for i in range(6, -1, -1):
-        date = today - timedelta(days=i)
-        # Randomize for demo effect
-        count = random.randint(2, 15)
-        activity_trend.append({"date": date.strftime("%m-%d"), "count": count})
-
-    # 4. Participant Portraits (AI Summary)
-    participant_portraits = [
-        "Most participants are full-stack developers interested in GenAI.",
-        "High interest in healthcare and finance domains.",
-        "30% of teams are looking for a designer."
-    ]
-
-    return {
-        "hot_topics": hot_topics,
-        "skill_distribution": skill_distribution,
-        "activity_trend": activity_trend,
-        "participant_portraits": participant_portraits
-    }
+    """
+    Dashboard aggregates for a hackathon: hot topics, skill distribution,
+    posts per day over the last week and participant portraits. Cached
+    per hackathon for COMMUNITY_INSIGHTS_TTL seconds.
+    """
+    return get_insights_cache().get_or_compute(
+        hackathon_id, lambda: compute_insights(session, hackathon_id)
+    )
 
 @router.get("/posts", response_model=List[CommunityPost])
 def read_posts(
     hackathon_id: int,
+    response: Response,
     session: Session = Depends(get_session),
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[str] = None,
 ):
-    posts = session.exec(
-        select(CommunityPost)
-        .where(CommunityPost.hackathon_id == hackathon_id)
-        .offset(skip)
-        .limit(limit)
-        .order_by(CommunityPost.created_at.desc())
-    ).all()
+    query = select(CommunityPost).where(CommunityPost.hackathon_id == hackathon_id)
+    posts = session.exec(paginate(query, POST_ORDER, cursor, skip, limit)).all()
+    set_next_cursor(response, POST_ORDER, posts, limit)
     return posts
 
 @router.post("/posts", response_model=CommunityPost)
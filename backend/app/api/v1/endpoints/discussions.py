@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlmodel import Session, select, func
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 from app.api import deps
-from app.db.session import get_session
+from app.core.pagination import Keyset, paginate, set_next_cursor
+from app.db.session import get_primary_session, get_session
 from app.models.discussion import (
     Discussion, DiscussionCreate, DiscussionUpdate, DiscussionRead,
     DiscussionReply, DiscussionReplyCreate, DiscussionReplyRead
@@ -13,21 +14,26 @@ from app.models.user import User
 
 router = APIRouter()
 
+DISCUSSION_ORDER = Keyset("pinned", (Discussion.is_pinned, Discussion.created_at, Discussion.id))
+
 @router.get("", response_model=List[DiscussionRead])
 def list_discussions(
     *,
     session: Session = Depends(get_session),
+    response: Response,
     skip: int = 0,
     limit: int = 20,
     tag: str = None,
+    cursor: Optional[str] = None,
 ):
     """获取讨论列表"""
-    query = select(Discussion).order_by(Discussion.is_pinned.desc(), Discussion.created_at.desc())
+    query = select(Discussion)
     
     if tag:
         query = query.where(Discussion.tags.contains(tag))
     
-    discussions = session.exec(query.offset(skip).limit(limit)).all()
+    discussions = session.exec(paginate(query, DISCUSSION_ORDER, cursor, skip, limit)).all()
+    set_next_cursor(response, DISCUSSION_ORDER, discussions, limit)
     
     result = []
     for d in discussions:
@@ -79,7 +85,7 @@ def create_discussion(
 @router.get("/{discussion_id}", response_model=DiscussionRead)
 def get_discussion(
     *,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_primary_session),
     discussion_id: int,
 ):
     """获取单个讨论详情"""
@@ -2,8 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session, select
 from typing import List
 
-from app.db.session import get_session
+from app.db.session import get_primary_session, get_session
 from app.api.deps import get_current_user
+from app.core import participant_stats
+from app.core.skill_vectors import get_skill_index
 from app.models.user import User
 from app.models.hackathon import Hackathon
 from app.models.enrollment import Enrollment, EnrollmentCreate, EnrollmentRead, EnrollmentStatus, EnrollmentWithHackathon
@@ -38,8 +40,10 @@ def create_enrollment(*, session: Session = Depends(get_session), enrollment_in:
         status=EnrollmentStatus.PENDING # Default pending, can be auto-approved based on hackathon settings
     )
     session.add(enrollment)
+    participant_stats.record_join(session, enrollment.hackathon_id, current_user)
     session.commit()
     session.refresh(enrollment)
+    get_skill_index().add_member(enrollment.hackathon_id, current_user)
     return enrollment
 
 @router.delete("/{hackathon_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -56,11 +60,13 @@ def cancel_enrollment(*, session: Session = Depends(get_session), hackathon_id:
         raise HTTPException(status_code=404, detail="Enrollment not found")
         
     session.delete(enrollment)
+    participant_stats.record_leave(session, hackathon_id, current_user)
     session.commit()
+    get_skill_index().remove_member(hackathon_id, current_user.id)
     return None
 
 @router.get("/me", response_model=List[EnrollmentWithHackathon])
-def read_my_enrollments(*, session: Session = Depends(get_session), current_user: User = Depends(get_current_user)):
+def read_my_enrollments(*, session: Session = Depends(get_primary_session), current_user: User = Depends(get_current_user)):
     """
     Get current user's enrollments with hackathon details.
     """
@@ -87,7 +93,9 @@ def read_my_enrollments(*, session: Session = Depends(get_session), current_user
                 status=EnrollmentStatus.APPROVED # Team members are approved
             )
             session.add(new_enrollment)
+            participant_stats.record_join(session, team.hackathon_id, current_user)
             session.commit()
+            get_skill_index().add_member(team.hackathon_id, current_user)
     
     results = session.exec(
         select(Enrollment, Hackathon)
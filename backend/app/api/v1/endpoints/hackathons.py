@@ -6,8 +6,9 @@ data, hosts, and partners without N+1 queries.
 """
 import json
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List, Optional
 from datetime import datetime
 
@@ -29,12 +30,20 @@ from app.models.partner import Partner, PartnerRead
 from app.models.judge import Judge, JudgeCreate, JudgeRead
 from app.models.score import Score, CriteriaScoreSummary, CriteriaScoreSummaryRead
 from app.models.team_project import Submission
-from app.db.session import get_session
+from app.core import fulltext, http_cache
+from app.core.hackathon_facets import compute_facets, filter_clauses, get_facet_cache
+from app.core.hackathon_docs import bump_doc_version, get_hackathon_doc_cache
+from app.core.pagination import Keyset, paginate, set_next_cursor
+from app.db.session import get_async_session, get_session
+from app.core.search_index import get_hackathon_search_index
 from app.api.deps import get_current_user, get_current_organizer, verify_judge
 from app.models.user import User, UserRead
 
 router = APIRouter()
 
+HACKATHON_ORDER = Keyset("created", (Hackathon.created_at, Hackathon.id))
+HACKATHON_BY_PRIZE = Keyset("prize", (Hackathon.total_cash_prize, Hackathon.id))
+
 
 # ---------------------------------------------------------------------------
 # Helpers: permission checks via hackathon_organizers table
@@ -73,50 +82,36 @@ def _parse_tags(raw: str | None) -> list[str]:
         return []
 
 
-def _build_full_hackathon(session: Session, hackathon: Hackathon) -> dict:
-    """
-    Assemble a complete hackathon response including sections (with child
-    data), hosts, and partners. Uses batch loading to avoid N+1 queries:
-      1. Fetch hackathon core fields
-      2. Fetch all sections in one query
-      3. Batch-fetch child rows (schedules, prizes, judging_criteria)
-         by hackathon_id, then group by section_id
-      4. Fetch hosts and partners in 2 queries
-    """
-    hid = hackathon.id
-    data = HackathonRead.from_orm(hackathon).dict()
-    data["tags"] = _parse_tags(hackathon.tags)
+def _full_hackathon_queries(hid: int) -> dict:
+    """One query per table: sections, their child rows, hosts and partners."""
+    return {
+        "sections": select(Section).where(Section.hackathon_id == hid).order_by(Section.display_order),
+        "schedules": select(Schedule).where(Schedule.hackathon_id == hid).order_by(Schedule.display_order),
+        "prizes": select(Prize).where(Prize.hackathon_id == hid).order_by(Prize.display_order),
+        "criteria": select(JudgingCriteria).where(JudgingCriteria.hackathon_id == hid).order_by(JudgingCriteria.display_order),
+        "hosts": select(HackathonHost).where(HackathonHost.hackathon_id == hid).order_by(HackathonHost.display_order),
+        "partners": select(Partner).where(Partner.hackathon_id == hid).order_by(Partner.display_order),
+    }
 
-    # --- Sections ---
-    sections = session.exec(
-        select(Section).where(Section.hackathon_id == hid).order_by(Section.display_order)
-    ).all()
 
-    # Batch-load all child rows for this hackathon
-    all_schedules = session.exec(
-        select(Schedule).where(Schedule.hackathon_id == hid).order_by(Schedule.display_order)
-    ).all()
-    all_prizes = session.exec(
-        select(Prize).where(Prize.hackathon_id == hid).order_by(Prize.display_order)
-    ).all()
-    all_criteria = session.exec(
-        select(JudgingCriteria).where(JudgingCriteria.hackathon_id == hid).order_by(JudgingCriteria.display_order)
-    ).all()
+def _assemble_full_hackathon(hackathon: Hackathon, rows: dict) -> dict:
+    data = HackathonRead.from_orm(hackathon).dict()
+    data["tags"] = _parse_tags(hackathon.tags)
 
     # Group child rows by section_id
     schedules_map: dict[int, list] = {}
-    for s in all_schedules:
+    for s in rows["schedules"]:
         schedules_map.setdefault(s.section_id, []).append(ScheduleRead.from_orm(s).dict())
     prizes_map: dict[int, list] = {}
-    for p in all_prizes:
+    for p in rows["prizes"]:
         prizes_map.setdefault(p.section_id, []).append(PrizeRead.from_orm(p).dict())
     criteria_map: dict[int, list] = {}
-    for c in all_criteria:
+    for c in rows["criteria"]:
         criteria_map.setdefault(c.section_id, []).append(JudgingCriteriaRead.from_orm(c).dict())
 
     # Assemble sections with their children
     sections_out = []
-    for sec in sections:
+    for sec in rows["sections"]:
         sec_data = SectionRead.from_orm(sec).dict()
         if sec.section_type == SectionType.SCHEDULES:
             sec_data["schedules"] = schedules_map.get(sec.id, [])
@@ -127,77 +122,77 @@ def _build_full_hackathon(session: Session, hackathon: Hackathon) -> dict:
         sections_out.append(sec_data)
 
     data["sections"] = sections_out
-
-    # --- Hosts ---
-    hosts = session.exec(
-        select(HackathonHost)
-        .where(HackathonHost.hackathon_id == hid)
-        .order_by(HackathonHost.display_order)
-    ).all()
-    data["hosts"] = [HackathonHostRead.from_orm(h).dict() for h in hosts]
-
-    # --- Partners ---
-    partners = session.exec(
-        select(Partner)
-        .where(Partner.hackathon_id == hid)
-        .order_by(Partner.display_order)
-    ).all()
-    data["partners"] = [PartnerRead.from_orm(p).dict() for p in partners]
-
+    data["hosts"] = [HackathonHostRead.from_orm(h).dict() for h in rows["hosts"]]
+    data["partners"] = [PartnerRead.from_orm(p).dict() for p in rows["partners"]]
     return data
 
 
-def _build_hackathon_list_item(session: Session, hackathons: list) -> list:
+def _build_full_hackathon(session: Session, hackathon: Hackathon) -> dict:
     """
-    Build lightweight list response: hackathon core fields + hosts + prize
-    summary.  No sections or partners are loaded to keep the query fast.
+    Assemble a complete hackathon response including sections (with child
+    data), hosts, and partners. Uses batch loading to avoid N+1 queries:
+      1. Fetch hackathon core fields
+      2. Fetch all sections in one query
+      3. Batch-fetch child rows (schedules, prizes, judging_criteria)
+         by hackathon_id, then group by section_id
+      4. Fetch hosts and partners in 2 queries
     """
-    if not hackathons:
-        return []
-    ids = [h.id for h in hackathons]
+    queries = _full_hackathon_queries(hackathon.id)
+    return _assemble_full_hackathon(hackathon, {k: session.exec(q).all() for k, q in queries.items()})
 
-    # Batch-load hosts
-    all_hosts = session.exec(
-        select(HackathonHost)
+
+async def _build_full_hackathon_async(session: AsyncSession, hackathon: Hackathon) -> dict:
+    """_build_full_hackathon over an AsyncSession (same queries)."""
+    queries = _full_hackathon_queries(hackathon.id)
+    return _assemble_full_hackathon(hackathon, {k: (await session.exec(q)).all() for k, q in queries.items()})
+
+
+def _list_item_queries(ids: list[int]) -> dict:
+    return {
+        "hosts": select(HackathonHost)
         .where(HackathonHost.hackathon_id.in_(ids))
-        .order_by(HackathonHost.display_order)
-    ).all()
+        .order_by(HackathonHost.display_order),
+    }
+
+
+def _assemble_list_items(hackathons: list, rows: dict) -> list:
     hosts_map: dict[int, list] = {}
-    for host in all_hosts:
+    for host in rows["hosts"]:
         hosts_map.setdefault(host.hackathon_id, []).append(
             HackathonHostRead.from_orm(host).dict()
         )
 
-    # Batch-load prizes for a lightweight cash / non-cash summary
-    all_prizes = session.exec(
-        select(Prize).where(Prize.hackathon_id.in_(ids))
-    ).all()
-    prize_summary: dict[int, dict] = {}
-    for p in all_prizes:
-        entry = prize_summary.setdefault(
-            p.hackathon_id, {"total_cash": 0, "has_non_cash": False}
-        )
-        entry["total_cash"] += float(p.total_cash_amount)
-        if not entry["has_non_cash"]:
-            try:
-                sublist = json.loads(p.awards_sublist) if p.awards_sublist else []
-                if any(item.get("type") != "cash" for item in sublist if isinstance(item, dict)):
-                    entry["has_non_cash"] = True
-            except (json.JSONDecodeError, TypeError):
-                pass
-
     results = []
     for h in hackathons:
         d = HackathonRead.from_orm(h).dict()
         d["tags"] = _parse_tags(h.tags)
         d["hosts"] = hosts_map.get(h.id, [])
-        summary = prize_summary.get(h.id, {"total_cash": 0, "has_non_cash": False})
-        d["total_cash_prize"] = summary["total_cash"]
-        d["has_non_cash_prizes"] = summary["has_non_cash"]
+        # Prize summary is kept on the row (app.core.prize_summary)
+        d["total_cash_prize"] = h.total_cash_prize
+        d["has_non_cash_prizes"] = h.has_non_cash_prizes
         results.append(d)
     return results
 
 
+def _build_hackathon_list_item(session: Session, hackathons: list) -> list:
+    """
+    Build lightweight list response: hackathon core fields + hosts + prize
+    summary.  No sections, prizes or partners are loaded to keep the query fast.
+    """
+    if not hackathons:
+        return []
+    queries = _list_item_queries([h.id for h in hackathons])
+    return _assemble_list_items(hackathons, {k: session.exec(q).all() for k, q in queries.items()})
+
+
+async def _build_hackathon_list_item_async(session: AsyncSession, hackathons: list) -> list:
+    """_build_hackathon_list_item over an AsyncSession (same queries)."""
+    if not hackathons:
+        return []
+    queries = _list_item_queries([h.id for h in hackathons])
+    return _assemble_list_items(hackathons, {k: (await session.exec(q)).all() for k, q in queries.items()})
+
+
 # ---------------------------------------------------------------------------
 # Hackathon CRUD
 # ---------------------------------------------------------------------------
@@ -238,8 +233,14 @@ def create_hackathon(
             updated_by=current_user.id,
         )
         session.add(owner)
+        fulltext.index_hackathon(
+            session.connection(), db_hackathon.id,
+            db_hackathon.title, db_hackathon.description, db_hackathon.tags,
+        )
         session.commit()
         session.refresh(db_hackathon)
+        get_hackathon_search_index().upsert(db_hackathon)
+        get_facet_cache().invalidate()
         return _build_full_hackathon(session, db_hackathon)
     except Exception as e:
         session.rollback()
@@ -248,9 +249,11 @@ def create_hackathon(
 
 
 @router.get("")
-def read_hackathons(
+async def read_hackathons(
     *,
-    session: Session = Depends(get_session),
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_async_session),
     offset: int = 0,
     limit: int = 100,
     status: Optional[HackathonStatus] = None,
@@ -259,26 +262,80 @@ def read_hackathons(
     city: Optional[str] = None,
     district: Optional[str] = None,
     search: Optional[str] = None,
+    sort_by_prize: bool = False,
+    cursor: Optional[str] = None,
 ):
-    """List hackathons with optional filters on status, format, and location."""
+    """
+    List hackathons with optional filters on status, format, and location,
+    newest first, or by cash prize pool (largest first) with sort_by_prize.
+    Pass the X-Next-Cursor header of a full page as `cursor` for the next
+    one (keyset paging); `offset` still works without it.
+    With `search`, only hackathons matching every search term in their
+    title, description or tags are listed, most relevant first unless
+    sorted by prize, and paged by offset (see app.core.fulltext).
+    The ETag covers the filters and each listed row's updated_at and
+    doc_version, so an unchanged page answers If-None-Match with a 304
+    before its hosts and prizes are loaded.
+    """
     query = select(Hackathon).where(Hackathon.status != HackathonStatus.DELETED)
+    filters = dict(status=status, format=format, province=province, city=city, district=district)
+    for clause in filter_clauses(filters).values():
+        query = query.where(clause)
+
+    hits = fulltext.matches(session.bind.dialect.name, search) if search else None
+    order = HACKATHON_BY_PRIZE if sort_by_prize else HACKATHON_ORDER
+    if hits is not None and not sort_by_prize:
+        if cursor:
+            raise HTTPException(status_code=400, detail="Search results are paged by offset, not cursor")
+        query = (
+            query.join(hits, hits.c.hackathon_id == Hackathon.id)
+            .order_by(hits.c.rank, Hackathon.id.desc())
+            .offset(offset).limit(limit)
+        )
+        hackathons = (await session.exec(query)).all()
+    else:
+        if hits is not None:
+            query = query.join(hits, hits.c.hackathon_id == Hackathon.id)
+        elif search:  # nothing indexable in it (punctuation, other scripts)
+            query = query.where(Hackathon.title.contains(search))
+        hackathons = (await session.exec(paginate(query, order, cursor, offset, limit))).all()
+        set_next_cursor(response, order, hackathons, limit)
+    tag = http_cache.etag(
+        sorted(request.query_params.multi_items()),
+        [(h.id, h.doc_version, h.updated_at) for h in hackathons],
+    )
+    not_modified = http_cache.conditional(request, response, "hackathon_list", tag)
+    if not_modified is not None:
+        return not_modified
+    return await _build_hackathon_list_item_async(session, hackathons)
 
-    if status:
-        query = query.where(Hackathon.status == status)
-    if format:
-        query = query.where(Hackathon.format == format)
-    if province:
-        query = query.where(Hackathon.province == province)
-    if city:
-        query = query.where(Hackathon.city == city)
-    if district:
-        query = query.where(Hackathon.district == district)
-    if search:
-        query = query.where(Hackathon.title.contains(search))
-
-    query = query.order_by(Hackathon.created_at.desc())
-    hackathons = session.exec(query.offset(offset).limit(limit)).all()
-    return _build_hackathon_list_item(session, hackathons)
+
+@router.get("/facets")
+async def read_hackathon_facets(
+    *,
+    session: AsyncSession = Depends(get_async_session),
+    status: Optional[HackathonStatus] = None,
+    format: Optional[HackathonFormat] = None,
+    province: Optional[str] = None,
+    city: Optional[str] = None,
+    district: Optional[str] = None,
+    search: Optional[str] = None,
+):
+    """
+    Counts per value of each list filter (status, format, province, city,
+    district), each honouring the other active filters and `search`, so
+    the whole filter sidebar renders from one request. One GROUP BY per
+    dimension; cached until the next hackathon write.
+    """
+    filters = dict(status=status, format=format, province=province, city=city, district=district)
+    key = (*(getattr(v, "value", v) for v in filters.values()), search)
+    cache = get_facet_cache()
+    result = cache.get(key)
+    if result is None:
+        generation = cache.generation
+        result = await compute_facets(session, filters, search)
+        cache.put(key, generation, result)
+    return result
 
 
 @router.get("/my")
@@ -304,12 +361,32 @@ def read_my_hackathons(
 
 
 @router.get("/{hackathon_id}")
-def read_hackathon(*, session: Session = Depends(get_session), hackathon_id: int):
-    """Get a single hackathon with full detail (sections, hosts, partners)."""
-    hackathon = session.get(Hackathon, hackathon_id)
+async def read_hackathon(
+    *,
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_async_session),
+    hackathon_id: int,
+):
+    """
+    Get a single hackathon with full detail (sections, hosts, partners).
+    Answers If-None-Match with a 304 when the ETag (updated_at plus the
+    child-tree doc_version) matches; otherwise served from the document
+    cache while the row's doc_version matches.
+    """
+    hackathon = await session.get(Hackathon, hackathon_id)
     if not hackathon:
         raise HTTPException(status_code=404, detail="Hackathon not found")
-    return _build_full_hackathon(session, hackathon)
+    tag = http_cache.etag(hackathon.id, hackathon.doc_version, hackathon.updated_at)
+    not_modified = http_cache.conditional(request, response, "hackathon_detail", tag)
+    if not_modified is not None:
+        return not_modified
+    cache = get_hackathon_doc_cache()
+    doc = cache.get(hackathon_id, hackathon.doc_version)
+    if doc is None:
+        doc = await _build_full_hackathon_async(session, hackathon)
+        cache.put(hackathon_id, hackathon.doc_version, doc)
+    return doc
 
 
 @router.patch("/{hackathon_id}")
@@ -337,8 +414,16 @@ def update_hackathon(
         db_hackathon.updated_by = current_user.id
 
         session.add(db_hackathon)
+        bump_doc_version(session, hackathon_id)
+        session.flush()
+        fulltext.index_hackathon(
+            session.connection(), db_hackathon.id,
+            db_hackathon.title, db_hackathon.description, db_hackathon.tags,
+        )
         session.commit()
         session.refresh(db_hackathon)
+        get_hackathon_search_index().upsert(db_hackathon)
+        get_facet_cache().invalidate()
         return _build_full_hackathon(session, db_hackathon)
     except Exception as e:
         session.rollback()
@@ -366,7 +451,11 @@ def delete_hackathon(
     db_hackathon.updated_at = datetime.utcnow()
     db_hackathon.updated_by = current_user.id
     session.add(db_hackathon)
+    bump_doc_version(session, hackathon_id)
+    fulltext.unindex_hackathon(session.connection(), hackathon_id)
     session.commit()
+    get_hackathon_search_index().remove(hackathon_id)
+    get_facet_cache().invalidate()
     return None
 
 
@@ -421,6 +510,7 @@ def add_host(
         updated_by=current_user.id,
     )
     session.add(host)
+    bump_doc_version(session, hackathon_id)
     session.commit()
     session.refresh(host)
     return host
@@ -452,6 +542,7 @@ def update_host(
     host.updated_by = current_user.id
 
     session.add(host)
+    bump_doc_version(session, hackathon_id)
     session.commit()
     session.refresh(host)
     return host
@@ -482,6 +573,7 @@ def delete_host(
         raise HTTPException(status_code=400, detail="每个活动至少需要一个主办方")
 
     session.delete(host)
+    bump_doc_version(session, hackathon_id)
     session.commit()
     return None
 
@@ -510,6 +602,7 @@ def reorder_hosts(
         host.display_order = order
         session.add(host)
 
+    bump_doc_version(session, hackathon_id)
     session.commit()
     hosts = session.exec(
         select(HackathonHost)
@@ -634,23 +727,23 @@ def remove_judge(
 
 
 @router.get("/{hackathon_id}/leaderboard")
-def hackathon_leaderboard(
+async def hackathon_leaderboard(
     *,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     hackathon_id: int,
 ):
     """
     Ranked submissions by total_score with per-criteria breakdown.
     """
-    hackathon = session.get(Hackathon, hackathon_id)
+    hackathon = await session.get(Hackathon, hackathon_id)
     if not hackathon:
         raise HTTPException(status_code=404, detail="Hackathon not found")
 
-    submissions = session.exec(
+    submissions = (await session.exec(
         select(Submission)
         .where(Submission.hackathon_id == hackathon_id)
         .order_by(Submission.total_score.desc())
-    ).all()
+    )).all()
 
     if not submissions:
         return []
@@ -658,11 +751,11 @@ def hackathon_leaderboard(
     sub_ids = [s.id for s in submissions]
 
     # Per-criteria summaries
-    summaries = session.exec(
+    summaries = (await session.exec(
         select(CriteriaScoreSummary).where(
             CriteriaScoreSummary.submission_id.in_(sub_ids)
         )
-    ).all()
+    )).all()
     summary_map: dict[int, list] = {}
     for s in summaries:
         summary_map.setdefault(s.submission_id, []).append(
@@ -670,19 +763,19 @@ def hackathon_leaderboard(
         )
 
     # Count distinct judges per submission
-    judge_scores = session.exec(
+    judge_scores = (await session.exec(
         select(Score.submission_id, Score.judge_id).where(
             Score.submission_id.in_(sub_ids)
         )
-    ).all()
+    )).all()
     judge_count_map: dict[int, set] = {}
     for sub_id, judge_id in judge_scores:
         judge_count_map.setdefault(sub_id, set()).add(judge_id)
 
     # Criteria names for context
-    criteria = session.exec(
+    criteria = (await session.exec(
         select(JudgingCriteria).where(JudgingCriteria.hackathon_id == hackathon_id)
-    ).all()
+    )).all()
     criteria_name_map = {c.id: c.name for c in criteria}
 
     result = []
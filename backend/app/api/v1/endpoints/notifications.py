@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List, Optional
 from datetime import datetime
 
 from app.api import deps
-from app.db.session import get_session
+from app.db.session import get_async_session, get_session
 from app.models.notification import Notification, NotificationCreate, NotificationRead, NotificationCount
 from app.models.user import User
 
@@ -33,13 +35,13 @@ def read_notifications(
     return notifications
 
 @router.get("/unread-count", response_model=NotificationCount)
-def get_unread_count(
+async def get_unread_count(
     *,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(deps.get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(deps.get_current_user_async),
     category: Optional[str] = Query(None, description="Filter by category"),
 ):
-    query = select(Notification).where(
+    query = select(func.count(Notification.id)).where(
         Notification.user_id == current_user.id, 
         Notification.is_read == False
     )
@@ -47,7 +49,7 @@ def get_unread_count(
     if category:
         query = query.where(Notification.category == category)
     
-    count = len(session.exec(query).all())
+    count = (await session.exec(query)).one()
     return {"unread_count": count}
 
 @router.post("", response_model=NotificationRead)
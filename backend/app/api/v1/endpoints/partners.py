@@ -9,6 +9,7 @@ from sqlmodel import Session, select
 from typing import List
 from datetime import datetime
 
+from app.core.hackathon_docs import bump_doc_version
 from app.db.session import get_session
 from app.api.deps import get_current_organizer
 from app.models.user import User
@@ -93,6 +94,7 @@ def add_partner(
         updated_by=current_user.id,
     )
     session.add(partner)
+    bump_doc_version(session, hackathon_id)
     session.commit()
     session.refresh(partner)
     return partner
@@ -122,6 +124,7 @@ def update_partner(
     partner.updated_by = current_user.id
 
     session.add(partner)
+    bump_doc_version(session, hackathon_id)
     session.commit()
     session.refresh(partner)
     return partner
@@ -147,6 +150,7 @@ def delete_partner(
         raise HTTPException(status_code=404, detail="Partner not found")
 
     session.delete(partner)
+    bump_doc_version(session, hackathon_id)
     session.commit()
     return None
 
@@ -173,6 +177,7 @@ def reorder_partners(
         partner.display_order = order
         session.add(partner)
 
+    bump_doc_version(session, hackathon_id)
     session.commit()
 
     partners = session.exec(
@@ -9,6 +9,8 @@ from sqlmodel import Session, select
 from typing import List
 from datetime import datetime
 
+from app.core.hackathon_docs import bump_doc_version
+from app.core.prize_summary import refresh_prize_summary
 from app.db.session import get_session
 from app.api.deps import get_current_user, get_current_organizer
 from app.models.user import User
@@ -123,6 +125,7 @@ def create_section(
         updated_by=current_user.id,
     )
     session.add(section)
+    bump_doc_version(session, hackathon_id)
     session.commit()
     session.refresh(section)
     return section
@@ -149,6 +152,7 @@ def update_section(
     section.updated_by = current_user.id
 
     session.add(section)
+    bump_doc_version(session, hackathon_id)
     session.commit()
     session.refresh(section)
     return section
@@ -171,6 +175,8 @@ def delete_section(
     section = _get_section_or_404(session, section_id, hackathon_id)
 
     session.delete(section)
+    bump_doc_version(session, hackathon_id)
+    refresh_prize_summary(session, hackathon_id)
     session.commit()
     return None
 
@@ -195,6 +201,7 @@ def reorder_sections(
         section.display_order = order
         session.add(section)
 
+    bump_doc_version(session, hackathon_id)
     session.commit()
     sections = session.exec(
         select(Section)
@@ -259,6 +266,7 @@ def create_schedule(
         updated_by=current_user.id,
     )
     session.add(schedule)
+    bump_doc_version(session, hackathon_id)
     session.commit()
     session.refresh(schedule)
     return schedule
@@ -293,6 +301,7 @@ def update_schedule(
     schedule.updated_by = current_user.id
 
     session.add(schedule)
+    bump_doc_version(session, hackathon_id)
     session.commit()
     session.refresh(schedule)
     return schedule
@@ -320,6 +329,7 @@ def delete_schedule(
         raise HTTPException(status_code=404, detail="Schedule not found")
 
     session.delete(schedule)
+    bump_doc_version(session, hackathon_id)
     session.commit()
     return None
 
@@ -379,6 +389,8 @@ def create_prize(
         updated_by=current_user.id,
     )
     session.add(prize)
+    bump_doc_version(session, hackathon_id)
+    refresh_prize_summary(session, hackathon_id)
     session.commit()
     session.refresh(prize)
     return prize
@@ -413,6 +425,8 @@ def update_prize(
     prize.updated_by = current_user.id
 
     session.add(prize)
+    bump_doc_version(session, hackathon_id)
+    refresh_prize_summary(session, hackathon_id)
     session.commit()
     session.refresh(prize)
     return prize
@@ -440,6 +454,8 @@ def delete_prize(
         raise HTTPException(status_code=404, detail="Prize not found")
 
     session.delete(prize)
+    bump_doc_version(session, hackathon_id)
+    refresh_prize_summary(session, hackathon_id)
     session.commit()
     return None
 
@@ -499,6 +515,7 @@ def create_judging_criterion(
         updated_by=current_user.id,
     )
     session.add(criterion)
+    bump_doc_version(session, hackathon_id)
     session.commit()
     session.refresh(criterion)
     return criterion
@@ -533,6 +550,7 @@ def update_judging_criterion(
     criterion.updated_by = current_user.id
 
     session.add(criterion)
+    bump_doc_version(session, hackathon_id)
     session.commit()
     session.refresh(criterion)
     return criterion
@@ -560,5 +578,6 @@ def delete_judging_criterion(
         raise HTTPException(status_code=404, detail="Judging criterion not found")
 
     session.delete(criterion)
+    bump_doc_version(session, hackathon_id)
     session.commit()
     return None
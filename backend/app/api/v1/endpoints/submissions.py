@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlmodel import Session, select
 from typing import List, Optional
 from datetime import datetime
 
 from app.db.session import get_session
+from app.core.pagination import Keyset, paginate, set_next_cursor
 from app.api.deps import get_current_user, verify_judge
 from app.models.user import User
 from app.models.hackathon import Hackathon, RegistrationType
@@ -18,6 +19,9 @@ from app.models.judging_criteria import JudgingCriteria
 
 router = APIRouter()
 
+SUBMISSION_BY_ID = Keyset("id", (Submission.id,), descending=False)
+SUBMISSION_BY_SCORE = Keyset("score", (Submission.total_score, Submission.id))
+
 
 @router.post("", response_model=SubmissionRead)
 def create_submission(
@@ -197,19 +201,21 @@ def read_my_submissions(
 def read_submissions(
     *,
     session: Session = Depends(get_session),
+    response: Response,
     hackathon_id: int = None,
     offset: int = 0,
     limit: int = 100,
     sort_by_score: bool = False,
+    cursor: Optional[str] = None,
 ):
+    """Submissions by id, or by score when sort_by_score; keyset paged via `cursor`."""
     query = select(Submission)
     if hackathon_id:
         query = query.where(Submission.hackathon_id == hackathon_id)
 
-    if sort_by_score:
-        query = query.order_by(Submission.total_score.desc())
-
-    submissions = session.exec(query.offset(offset).limit(limit)).all()
+    order = SUBMISSION_BY_SCORE if sort_by_score else SUBMISSION_BY_ID
+    submissions = session.exec(paginate(query, order, cursor, offset, limit)).all()
+    set_next_cursor(response, order, submissions, limit)
     return submissions
 
 
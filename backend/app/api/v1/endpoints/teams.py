@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlmodel import Session, select
-from typing import List
+from typing import List, Optional
 
 from app.db.session import get_session
 from app.api.deps import get_current_user
+from app.core import participant_stats
+from app.core.pagination import Keyset, paginate, set_next_cursor
+from app.core.skill_vectors import get_skill_index
 from app.models.user import User
 from app.models.hackathon import Hackathon
 from app.models.team_project import Team, TeamCreate, TeamRead, TeamMember, TeamMemberRead, TeamReadWithMembers
@@ -11,6 +14,8 @@ from app.models.enrollment import Enrollment, EnrollmentStatus
 
 router = APIRouter()
 
+TEAM_ORDER = Keyset("id", (Team.id,), descending=False)
+
 @router.post("", response_model=TeamRead)
 def create_team(*, session: Session = Depends(get_session), team_in: TeamCreate, hackathon_id: int, current_user: User = Depends(get_current_user)):
     """
@@ -35,8 +40,11 @@ def create_team(*, session: Session = Depends(get_session), team_in: TeamCreate,
     if not existing_enrollment:
         enrollment = Enrollment(user_id=current_user.id, hackathon_id=hackathon_id, status=EnrollmentStatus.APPROVED)
         session.add(enrollment)
+        participant_stats.record_join(session, hackathon_id, current_user)
 
     session.commit()
+    if not existing_enrollment:
+        get_skill_index().add_member(hackathon_id, current_user)
 
     return team
 
@@ -50,11 +58,20 @@ def read_my_teams(*, session: Session = Depends(get_session), current_user: User
     return teams
 
 @router.get("", response_model=List[TeamReadWithMembers])
-def read_teams(*, session: Session = Depends(get_session), hackathon_id: int = None, offset: int = 0, limit: int = 100):
+def read_teams(
+    *,
+    session: Session = Depends(get_session),
+    response: Response,
+    hackathon_id: int = None,
+    offset: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+):
     query = select(Team)
     if hackathon_id:
         query = query.where(Team.hackathon_id == hackathon_id)
-    teams = session.exec(query.offset(offset).limit(limit)).all()
+    teams = session.exec(paginate(query, TEAM_ORDER, cursor, offset, limit)).all()
+    set_next_cursor(response, TEAM_ORDER, teams, limit)
     return teams
 
 @router.get("/{team_id}", response_model=TeamReadWithMembers)
@@ -86,8 +103,11 @@ def join_team(*, session: Session = Depends(get_session), team_id: int, current_
     if not existing_enrollment:
         enrollment = Enrollment(user_id=current_user.id, hackathon_id=team.hackathon_id, status=EnrollmentStatus.APPROVED)
         session.add(enrollment)
+        participant_stats.record_join(session, team.hackathon_id, current_user)
 
     session.commit()
+    if not existing_enrollment:
+        get_skill_index().add_member(team.hackathon_id, current_user)
     session.refresh(member)
     return member
 
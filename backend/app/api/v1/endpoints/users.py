@@ -5,12 +5,17 @@ from typing import List
 from datetime import datetime
 
 from app.api import deps
+from app.core import participant_stats
 from app.core.security import get_password_hash, verify_password
+from app.core.skill_vectors import get_skill_index, refresh_user_vector
 from app.db.session import get_session
 from app.models.user import User, UserCreate, UserRead, UserUpdate, UserUpdateAdmin, InvitationCode
 
 router = APIRouter()
 
+# Profile fields that feed User.skills_vector (AI team matching)
+MATCHING_FIELDS = {"skills", "interests", "personality"}
+
 @router.put("/me", response_model=UserRead)
 def update_user_me(
     *,
@@ -19,12 +24,19 @@ def update_user_me(
     current_user: User = Depends(deps.get_current_user),
 ):
     user_data = user_in.dict(exclude_unset=True)
+    histogram_before = participant_stats.contribution(current_user.skills, current_user.personality)
     for key, value in user_data.items():
         setattr(current_user, key, value)
+    profile_changed = bool(MATCHING_FIELDS & user_data.keys())
+    if profile_changed:
+        refresh_user_vector(current_user)
+        participant_stats.record_profile_change(session, current_user, histogram_before)
     
     session.add(current_user)
     session.commit()
     session.refresh(current_user)
+    if profile_changed:
+        get_skill_index().update_user(current_user)
     return current_user
 
 @router.get("/me", response_model=UserRead)
@@ -78,12 +90,19 @@ def update_user(
         raise HTTPException(status_code=404, detail="User not found")
         
     user_data = user_in.dict(exclude_unset=True)
+    histogram_before = participant_stats.contribution(user.skills, user.personality)
     for key, value in user_data.items():
         setattr(user, key, value)
+    profile_changed = bool(MATCHING_FIELDS & user_data.keys())
+    if profile_changed:
+        refresh_user_vector(user)
+        participant_stats.record_profile_change(session, user, histogram_before)
     
     session.add(user)
     session.commit()
     session.refresh(user)
+    if profile_changed:
+        get_skill_index().update_user(user)
     return user
 
 class ActivateOrganizerRequest(BaseModel):
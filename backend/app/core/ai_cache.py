@@ -0,0 +1,261 @@
+"""
+Content-addressed cache for AI completions.
+
+Entries are keyed by a SHA-256 of (model, system prompt, user prompt) so
+identical prompts are answered locally regardless of which user sent
+them. Two tiers:
+  1. an in-process LRU (OrderedDict) for the hottest entries
+  2. a SQLite file shared by every worker, bounded by entry count with
+     least-recently-accessed eviction
+Every entry carries its own expiry; hit/miss counters are kept per
+namespace (endpoint).
+
+Async callers use aget()/aset(): the memory tier is checked inline and
+the SQLite tier runs in a worker thread, so a slow or locked cache file
+never blocks the event loop. The disk tier keeps a running row count
+(an upper bound, re-counted exactly only when it passes disk_entries),
+so a write does not pay for a COUNT(*).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CompletionCache:
+    """Two-tier (memory LRU over SQLite) TTL cache for JSON completions."""
+
+    def __init__(
+        self,
+        path: str,
+        memory_entries: int = 512,
+        disk_entries: int = 20000,
+    ):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        # key -> (expires_at, serialized JSON value)
+        self._memory: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()  # memory tier and counters
+        self._disk_lock = threading.Lock()  # the SQLite connection
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disk_count = 0  # rows on disk, never less than the real count
+        self._counters: dict[str, dict[str, int]] = defaultdict(
+            lambda: {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0}
+        )
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, user_prompt: str) -> str:
+        payload = json.dumps([model, system_prompt, user_prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS completion_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_completion_cache_accessed_at "
+                "ON completion_cache (accessed_at)"
+            )
+            (self._disk_count,) = conn.execute("SELECT COUNT(*) FROM completion_cache").fetchone()
+            self._conn = conn
+        return self._conn
+
+    # ------------------------------------------------------------------
+    # Memory tier
+    # ------------------------------------------------------------------
+
+    def _remember(self, key: str, expires_at: float, raw: str) -> None:
+        self._memory[key] = (expires_at, raw)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def _memory_get(self, key: str, namespace: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, raw = entry
+            if expires_at <= now:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            self._counters[namespace]["memory_hits"] += 1
+        return json.loads(raw)
+
+    def _disk_get(self, key: str, namespace: str) -> Optional[Any]:
+        now = time.time()
+        row = None
+        with self._disk_lock:
+            try:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT value, expires_at FROM completion_cache WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    conn.execute(
+                        "UPDATE completion_cache SET accessed_at = ? WHERE key = ?",
+                        (now, key),
+                    )
+                elif row is not None:
+                    conn.execute("DELETE FROM completion_cache WHERE key = ?", (key,))
+                    self._disk_count -= 1
+                    row = None
+            except sqlite3.Error as e:
+                logger.warning(f"AI cache read failed: {e}")
+                row = None
+        with self._lock:
+            if row is None:
+                self._counters[namespace]["misses"] += 1
+                return None
+            self._remember(key, row[1], row[0])
+            self._counters[namespace]["disk_hits"] += 1
+        return json.loads(row[0])
+
+    def _disk_set(self, key: str, raw: str, expires_at: float, now: float) -> None:
+        with self._disk_lock:
+            try:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO completion_cache (key, value, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, raw, expires_at, now),
+                )
+                self._disk_count += 1  # a replace overcounts; _evict re-counts
+                if self._disk_count > self.disk_entries:
+                    self._evict(conn, now)
+            except sqlite3.Error as e:
+                logger.warning(f"AI cache write failed: {e}")
+
+    def _prepare_set(self, key: str, value: Any, ttl: float, namespace: str) -> tuple[str, float, float]:
+        now = time.time()
+        expires_at = now + ttl
+        raw = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._remember(key, expires_at, raw)
+            self._counters[namespace]["sets"] += 1
+        return raw, expires_at, now
+
+    def get(self, key: str, namespace: str = "default") -> Optional[Any]:
+        """Return the cached value, or None on a miss / expired entry."""
+        value = self._memory_get(key, namespace)
+        return value if value is not None else self._disk_get(key, namespace)
+
+    def set(self, key: str, value: Any, ttl: float, namespace: str = "default") -> None:
+        """Store a JSON-serializable value in both tiers for `ttl` seconds."""
+        self._disk_set(key, *self._prepare_set(key, value, ttl, namespace))
+
+    async def aget(self, key: str, namespace: str = "default") -> Optional[Any]:
+        """get() for the event loop: disk lookups run in a worker thread."""
+        value = self._memory_get(key, namespace)
+        if value is not None:
+            return value
+        return await asyncio.to_thread(self._disk_get, key, namespace)
+
+    async def aset(self, key: str, value: Any, ttl: float, namespace: str = "default") -> None:
+        """set() for the event loop: the disk write runs in a worker thread."""
+        await asyncio.to_thread(self._disk_set, key, *self._prepare_set(key, value, ttl, namespace))
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Drop expired rows, then the least recently accessed beyond the bound."""
+        (count,) = conn.execute("SELECT COUNT(*) FROM completion_cache").fetchone()
+        self._disk_count = count
+        if count <= self.disk_entries:
+            return
+        removed = conn.execute(
+            "DELETE FROM completion_cache WHERE expires_at <= ?", (now,)
+        ).rowcount
+        overflow = count - removed - self.disk_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM completion_cache WHERE key IN ("
+                "SELECT key FROM completion_cache ORDER BY accessed_at LIMIT ?)",
+                (overflow,),
+            )
+            removed += overflow
+        self._disk_count -= removed
+        self.evictions += removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        with self._disk_lock:
+            try:
+                self._connect().execute("DELETE FROM completion_cache")
+                self._disk_count = 0
+            except sqlite3.Error as e:
+                logger.warning(f"AI cache clear failed: {e}")
+
+    def stats(self) -> dict:
+        """Entry counts per tier plus hit/miss counters per namespace."""
+        with self._disk_lock:
+            try:
+                (disk_count,) = self._connect().execute(
+                    "SELECT COUNT(*) FROM completion_cache"
+                ).fetchone()
+            except sqlite3.Error:
+                disk_count = None
+        with self._lock:
+            namespaces = {}
+            for name, c in self._counters.items():
+                hits = c["memory_hits"] + c["disk_hits"]
+                lookups = hits + c["misses"]
+                namespaces[name] = {
+                    **c,
+                    "hits": hits,
+                    "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                }
+            return {
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_count,
+                "evictions": self.evictions,
+                "namespaces": namespaces,
+            }
+
+    def close(self) -> None:
+        with self._disk_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_cache: Optional[CompletionCache] = None
+
+
+def get_completion_cache() -> Optional[CompletionCache]:
+    """Return the process-wide cache, or None when AI_CACHE_ENABLED is off."""
+    global _cache
+    if not settings.AI_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = CompletionCache(
+            settings.AI_CACHE_PATH,
+            memory_entries=settings.AI_CACHE_MEMORY_ENTRIES,
+            disk_entries=settings.AI_CACHE_DISK_ENTRIES,
+        )
+    return _cache
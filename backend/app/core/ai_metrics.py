@@ -0,0 +1,207 @@
+"""
+Telemetry for upstream AI calls.
+
+Every call made through LLMProvider is recorded here under its
+(provider, endpoint) pair: a fixed-bucket latency histogram, prompt /
+completion token counts and error counts. ai.py adds fallback responses
+(the canned answers served after a failure) and completion cache lookups.
+
+Two views are kept. Lifetime totals back GET /ai/metrics. A bounded ring
+of recent events backs GET /ai/metrics/summary, which reports percentiles,
+error and cache hit ratios and estimated spend over a trailing window.
+Recording takes a lock, a bisect and a deque append, so it is cheap enough
+to stay on in production.
+"""
+import bisect
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from app.core.config import settings
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+@dataclass
+class _Series:
+    """Lifetime totals for one (provider, endpoint) pair."""
+    model: str = ""
+    calls: int = 0
+    errors: int = 0
+    latency_sum: float = 0.0
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    error_types: dict[str, int] = field(default_factory=dict)
+
+
+def _usage_tokens(usage: Any) -> tuple[int, int]:
+    """(prompt, completion) token counts from an OpenAI usage object, if any."""
+    if usage is None:
+        return 0, 0
+    return (getattr(usage, "prompt_tokens", 0) or 0, getattr(usage, "completion_tokens", 0) or 0)
+
+
+def _percentile(sorted_values: list[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(q * len(sorted_values)) - 1))
+    return round(sorted_values[index], 4)
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """Spend for the given tokens using AI_TOKEN_PRICES (per million tokens), or None if unpriced."""
+    price = settings.AI_TOKEN_PRICES.get(model)
+    if not price:
+        return None
+    prompt_price, completion_price = price
+    return round((prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000, 6)
+
+
+class AIMetrics:
+    """Thread-safe recorder for upstream AI call telemetry."""
+
+    def __init__(self, window_events: Optional[int] = None):
+        self._lock = threading.Lock()
+        self._series: dict[tuple[str, str], _Series] = {}
+        self._fallbacks: dict[str, int] = {}
+        self._cache: dict[str, dict[str, int]] = {}
+        # (monotonic time, kind, provider, endpoint, model, latency, ok, prompt, completion)
+        self._events: deque = deque(maxlen=window_events or settings.AI_METRICS_WINDOW_EVENTS)
+
+    # -- recording -----------------------------------------------------------
+
+    def record_call(
+        self,
+        provider: str,
+        model: str,
+        endpoint: str,
+        latency: float,
+        *,
+        usage: Any = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        prompt, completion = _usage_tokens(usage)
+        with self._lock:
+            series = self._series.get((provider, endpoint))
+            if series is None:
+                series = self._series[(provider, endpoint)] = _Series(model=model)
+            series.calls += 1
+            series.latency_sum += latency
+            series.buckets[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+            series.prompt_tokens += prompt
+            series.completion_tokens += completion
+            if error is not None:
+                series.errors += 1
+                name = type(error).__name__
+                series.error_types[name] = series.error_types.get(name, 0) + 1
+            self._events.append(
+                (time.monotonic(), "call", provider, endpoint, model, latency, error is None, prompt, completion)
+            )
+
+    def record_fallback(self, endpoint: str) -> None:
+        with self._lock:
+            self._fallbacks[endpoint] = self._fallbacks.get(endpoint, 0) + 1
+            self._events.append((time.monotonic(), "fallback", None, endpoint, None, 0.0, False, 0, 0))
+
+    def record_cache(self, endpoint: str, hit: bool) -> None:
+        with self._lock:
+            counters = self._cache.setdefault(endpoint, {"hits": 0, "misses": 0})
+            counters["hits" if hit else "misses"] += 1
+            self._events.append((time.monotonic(), "cache", None, endpoint, None, 0.0, hit, 0, 0))
+
+    # -- views ---------------------------------------------------------------
+
+    def snapshot(self) -> dict:
+        """Lifetime histograms and counters per (provider, endpoint)."""
+        with self._lock:
+            calls = []
+            for (provider, endpoint), s in sorted(self._series.items()):
+                cumulative, running = {}, 0
+                for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), s.buckets):
+                    running += count
+                    cumulative["+Inf" if bound == float("inf") else str(bound)] = running
+                calls.append({
+                    "provider": provider,
+                    "endpoint": endpoint,
+                    "model": s.model,
+                    "calls": s.calls,
+                    "errors": s.errors,
+                    "error_types": dict(s.error_types),
+                    "latency_sum": round(s.latency_sum, 4),
+                    "latency_buckets": cumulative,
+                    "prompt_tokens": s.prompt_tokens,
+                    "completion_tokens": s.completion_tokens,
+                    "estimated_cost": estimate_cost(s.model, s.prompt_tokens, s.completion_tokens),
+                })
+            cache = {
+                endpoint: {**c, "hit_ratio": round(c["hits"] / (c["hits"] + c["misses"]), 4)}
+                for endpoint, c in self._cache.items()
+            }
+            return {"calls": calls, "fallbacks": dict(self._fallbacks), "cache_lookups": cache}
+
+    def summary(self, window_seconds: float) -> dict:
+        """Per-endpoint and per-provider rollup of the events in the trailing window."""
+        cutoff = time.monotonic() - window_seconds
+        with self._lock:
+            events = [e for e in self._events if e[0] >= cutoff]
+
+        groups: dict[str, dict[str, dict]] = {"endpoints": {}, "providers": {}}
+
+        def bucket(kind: str, name: str) -> dict:
+            return groups[kind].setdefault(name, {
+                "latencies": [], "calls": 0, "errors": 0, "fallbacks": 0,
+                "cache_hits": 0, "cache_lookups": 0,
+                "prompt_tokens": 0, "completion_tokens": 0, "cost": None,
+            })
+
+        for _, kind, provider, endpoint, model, latency, ok, prompt, completion in events:
+            targets = [bucket("endpoints", endpoint)]
+            if kind == "call":
+                targets.append(bucket("providers", provider))
+            for g in targets:
+                if kind == "call":
+                    g["calls"] += 1
+                    g["latencies"].append(latency)
+                    g["errors"] += 0 if ok else 1
+                    g["prompt_tokens"] += prompt
+                    g["completion_tokens"] += completion
+                    cost = estimate_cost(model, prompt, completion)
+                    if cost is not None:
+                        g["cost"] = round((g["cost"] or 0.0) + cost, 6)
+                elif kind == "fallback":
+                    g["fallbacks"] += 1
+                else:
+                    g["cache_lookups"] += 1
+                    g["cache_hits"] += 1 if ok else 0
+
+        for kind in groups.values():
+            for g in kind.values():
+                latencies = sorted(g.pop("latencies"))
+                g["latency_p50"] = _percentile(latencies, 0.50)
+                g["latency_p95"] = _percentile(latencies, 0.95)
+                g["latency_p99"] = _percentile(latencies, 0.99)
+                g["latency_total"] = round(sum(latencies), 4)
+                g["error_ratio"] = round(g["errors"] / g["calls"], 4) if g["calls"] else 0.0
+                g["cache_hit_ratio"] = (
+                    round(g["cache_hits"] / g["cache_lookups"], 4) if g["cache_lookups"] else None
+                )
+
+        return {"window_seconds": window_seconds, "events": len(events), **groups}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+            self._fallbacks.clear()
+            self._cache.clear()
+            self._events.clear()
+
+
+_metrics = AIMetrics()
+
+
+def get_ai_metrics() -> AIMetrics:
+    return _metrics
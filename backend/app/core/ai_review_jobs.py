@@ -0,0 +1,284 @@
+"""
+Background batch AI review of a hackathon's submissions.
+
+An organizer starts a job; the runner reviews every submitted project with
+at most AI_REVIEW_BATCH_CONCURRENCY upstream calls in flight and stores
+each result as soon as it arrives (SubmissionAIReview, keyed by a hash of
+the submission content + judging criteria). Because results are stored
+per submission, a job interrupted by a restart is simply run again: the
+submissions it already finished hash the same and are skipped.
+
+Jobs are claimed with a conditional UPDATE on status/heartbeat_at, so
+when several workers start up only one of them resumes a given job. While
+a job runs, a heartbeat task touches heartbeat_at every third of
+AI_REVIEW_JOB_STALE_SECONDS, so a single slow review never makes a live
+job look abandoned. A sweeper started with the app retries resume() on
+the same period, so a job orphaned by a restart inside the stale window is
+taken over once it does go stale, not only at the next boot.
+
+The runner's tasks live on the event loop, but every database step
+(claim, plan, progress bumps, stored reviews, the final status) runs in a
+worker thread, so a slow or locked write never stalls the requests the
+process is serving. Those writes are serialized per runner: the tasks of
+a job finish together, and concurrent writers on SQLite would only fail
+each other with "database is locked".
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy import or_, update
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.db import session as db_session
+from app.models.ai_review import AIReviewJob, AIReviewJobStatus, SubmissionAIReview
+from app.models.judging_criteria import JudgingCriteria
+from app.models.team_project import Submission, SubmissionStatus
+
+logger = logging.getLogger(__name__)
+
+# review(project_name, project_description, scoring_dimensions) -> {"scores", "comment", "model"}
+ReviewFn = Callable[[str, str, list[dict]], Awaitable[dict]]
+
+
+def scoring_dimensions(criteria: list[JudgingCriteria]) -> list[dict]:
+    return [
+        {"name": c.name, "description": c.description or "", "weight": c.weight_percentage}
+        for c in criteria
+    ]
+
+
+def submission_text(submission: Submission) -> str:
+    """The project description sent for review, with links and stack appended."""
+    parts = [submission.description or ""]
+    if submission.tech_stack:
+        parts.append(f"Tech Stack: {submission.tech_stack}")
+    if submission.repo_url:
+        parts.append(f"Repository: {submission.repo_url}")
+    if submission.demo_url:
+        parts.append(f"Demo: {submission.demo_url}")
+    return "\n".join(parts)
+
+
+def content_hash(title: str, text: str, dimensions: list[dict]) -> str:
+    payload = json.dumps([title, text, dimensions], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def job_progress(job: AIReviewJob) -> float:
+    if not job.total:
+        return 1.0 if job.status == AIReviewJobStatus.COMPLETED else 0.0
+    return round((job.reviewed + job.skipped + job.failed) / job.total, 4)
+
+
+class ReviewJobRunner:
+    """Runs review jobs as tasks on the current event loop."""
+
+    def __init__(self):
+        self._tasks: dict[int, asyncio.Task] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+        self._write_lock = threading.Lock()
+
+    @staticmethod
+    def _period() -> float:
+        return settings.AI_REVIEW_JOB_STALE_SECONDS / 3
+
+    def is_running(self, job_id: int) -> bool:
+        task = self._tasks.get(job_id)
+        return task is not None and not task.done()
+
+    def _claim(self, session: Session, job_id: int) -> bool:
+        """Mark the job running unless a live runner already owns it."""
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=settings.AI_REVIEW_JOB_STALE_SECONDS)
+        result = session.exec(
+            update(AIReviewJob)
+            .where(
+                AIReviewJob.id == job_id,
+                or_(
+                    AIReviewJob.status == AIReviewJobStatus.QUEUED,
+                    (AIReviewJob.status == AIReviewJobStatus.RUNNING)
+                    & or_(AIReviewJob.heartbeat_at == None, AIReviewJob.heartbeat_at < stale),  # noqa: E711
+                ),
+            )
+            .values(status=AIReviewJobStatus.RUNNING, heartbeat_at=now, started_at=now, finished_at=None)
+        )
+        session.commit()
+        return result.rowcount == 1
+
+    def _claim_job(self, job_id: int) -> bool:
+        with Session(db_session.engine) as session:
+            return self._claim(session, job_id)
+
+    async def start(self, job_id: int, review: ReviewFn) -> bool:
+        """Claim and schedule the job; False if it is owned elsewhere or already running here."""
+        if self.is_running(job_id):
+            return False
+        if not await asyncio.to_thread(self._claim_job, job_id):
+            return False
+        task = asyncio.get_running_loop().create_task(self._run(job_id, review))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda t, job_id=job_id: self._tasks.pop(job_id, None))
+        return True
+
+    def _resumable(self) -> list[int]:
+        with Session(db_session.engine) as session:
+            return session.exec(
+                select(AIReviewJob.id).where(
+                    AIReviewJob.status.in_([AIReviewJobStatus.QUEUED, AIReviewJobStatus.RUNNING])
+                )
+            ).all()
+
+    async def resume(self, review: ReviewFn) -> list[int]:
+        """Restart queued jobs and running jobs whose runner went away (startup hook)."""
+        job_ids = await asyncio.to_thread(self._resumable)
+        return [job_id for job_id in job_ids if await self.start(job_id, review)]
+
+    async def _sweep(self, review: ReviewFn) -> None:
+        while True:
+            await asyncio.sleep(self._period())
+            try:
+                await self.resume(review)
+            except Exception:
+                logger.exception("AI review job sweep failed")
+
+    def start_sweeper(self, review: ReviewFn) -> None:
+        """Keep taking over stale jobs for as long as the app runs (startup hook)."""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep(review))
+
+    async def aclose(self) -> None:
+        """Stop the sweeper (shutdown hook); running jobs are resumed by the next owner."""
+        sweeper, self._sweeper = self._sweeper, None
+        if sweeper is not None:
+            sweeper.cancel()
+            await asyncio.gather(sweeper, return_exceptions=True)
+
+    # -- the job itself ------------------------------------------------------
+
+    def _bump(self, job_id: int, **increments: int) -> None:
+        values: dict[str, Any] = {"heartbeat_at": datetime.utcnow()}
+        for column, amount in increments.items():
+            values[column] = getattr(AIReviewJob, column) + amount
+        with self._write_lock, Session(db_session.engine) as session:
+            session.exec(update(AIReviewJob).where(AIReviewJob.id == job_id).values(**values))
+            session.commit()
+
+    def _heartbeat(self, job_id: int) -> None:
+        with self._write_lock, Session(db_session.engine) as session:
+            session.exec(
+                update(AIReviewJob)
+                .where(AIReviewJob.id == job_id, AIReviewJob.status == AIReviewJobStatus.RUNNING)
+                .values(heartbeat_at=datetime.utcnow())
+            )
+            session.commit()
+
+    async def _beat(self, job_id: int) -> None:
+        while True:
+            await asyncio.sleep(self._period())
+            try:
+                await asyncio.to_thread(self._heartbeat, job_id)
+            except Exception as e:
+                logger.warning(f"AI review job {job_id} heartbeat failed: {e}")
+
+    def _plan(self, job_id: int) -> tuple[list[dict], list[tuple[int, str, str, str]], Optional[str]]:
+        """Work list: (submission_id, title, text, hash) for submissions needing a review."""
+        with self._write_lock, Session(db_session.engine) as session:
+            job = session.get(AIReviewJob, job_id)
+            criteria = session.exec(
+                select(JudgingCriteria)
+                .where(JudgingCriteria.hackathon_id == job.hackathon_id)
+                .order_by(JudgingCriteria.display_order)
+            ).all()
+            dimensions = scoring_dimensions(criteria)
+            submissions = session.exec(
+                select(Submission).where(
+                    Submission.hackathon_id == job.hackathon_id,
+                    Submission.status == SubmissionStatus.SUBMITTED,
+                )
+            ).all()
+            known = dict(session.exec(
+                select(SubmissionAIReview.submission_id, SubmissionAIReview.content_hash)
+                .where(SubmissionAIReview.hackathon_id == job.hackathon_id)
+            ).all())
+
+            todo = []
+            for s in submissions:
+                text = submission_text(s)
+                digest = content_hash(s.title, text, dimensions)
+                if known.get(s.id) != digest:
+                    todo.append((s.id, s.title, text, digest))
+
+            job.total = len(submissions)
+            job.skipped = len(submissions) - len(todo)
+            job.reviewed = 0
+            job.failed = 0
+            job.error = None
+            session.add(job)
+            session.commit()
+            return dimensions, todo, job.hackathon_id
+
+    def _store(self, job_id: int, hackathon_id: int, submission_id: int, digest: str, result: dict) -> None:
+        now = datetime.utcnow()
+        with self._write_lock, Session(db_session.engine) as session:
+            review = session.exec(
+                select(SubmissionAIReview).where(SubmissionAIReview.submission_id == submission_id)
+            ).first()
+            if review is None:
+                review = SubmissionAIReview(submission_id=submission_id, hackathon_id=hackathon_id, created_at=now)
+            review.job_id = job_id
+            review.content_hash = digest
+            review.scores = json.dumps(result["scores"], ensure_ascii=False)
+            review.comment = result["comment"]
+            review.model = result.get("model")
+            review.updated_at = now
+            session.add(review)
+            session.commit()
+
+    def _finish(self, job_id: int, status: AIReviewJobStatus, error: Optional[str]) -> None:
+        with self._write_lock, Session(db_session.engine) as session:
+            job = session.get(AIReviewJob, job_id)
+            job.status = status
+            job.error = error
+            job.finished_at = datetime.utcnow()
+            job.heartbeat_at = job.finished_at
+            session.add(job)
+            session.commit()
+
+    async def _run(self, job_id: int, review: ReviewFn) -> None:
+        beat = asyncio.get_running_loop().create_task(self._beat(job_id))
+        try:
+            dimensions, todo, hackathon_id = await asyncio.to_thread(self._plan, job_id)
+            semaphore = asyncio.Semaphore(settings.AI_REVIEW_BATCH_CONCURRENCY)
+
+            async def review_one(submission_id: int, title: str, text: str, digest: str):
+                async with semaphore:
+                    try:
+                        result = await review(title, text, dimensions)
+                    except Exception as e:
+                        logger.warning(f"AI review of submission {submission_id} failed: {e}")
+                        await asyncio.to_thread(self._bump, job_id, failed=1)
+                        return
+                await asyncio.to_thread(self._store, job_id, hackathon_id, submission_id, digest, result)
+                await asyncio.to_thread(self._bump, job_id, reviewed=1)
+
+            await asyncio.gather(*(review_one(*item) for item in todo))
+            status, error = AIReviewJobStatus.COMPLETED, None
+        except Exception as e:
+            logger.exception(f"AI review job {job_id} crashed")
+            status, error = AIReviewJobStatus.FAILED, str(e)
+        finally:
+            beat.cancel()
+        await asyncio.to_thread(self._finish, job_id, status, error)
+
+
+_runner = ReviewJobRunner()
+
+
+def get_review_job_runner() -> ReviewJobRunner:
+    return _runner
@@ -0,0 +1,165 @@
+"""
+Aggregates behind the community dashboard (GET /community/insights).
+
+  * activity trend — posts per day over the last week, one GROUP BY over
+    the hackathon's recent posts
+  * skill distribution — the Enrollment ⋈ User skill histogram kept by
+    app.core.participant_stats
+  * hot topics — keywords of the most recent posts, tokenized like the
+    hackathon search index (Latin words, CJK bigrams), title terms
+    weighted higher and each post counted once per term
+
+The result is cached per hackathon and recomputed after
+COMMUNITY_INSIGHTS_TTL seconds, so a dashboard refresh costs a dict
+lookup and a cold one a few indexed queries.
+"""
+import json
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from app.core import participant_stats
+from app.core.config import settings
+from app.core.search_index import tokenize
+from app.models.community import CommunityPost
+from app.models.participant_stats import ParticipantStats
+
+ACTIVITY_DAYS = 7
+HOT_TOPICS = 10
+HOT_TOPIC_POSTS = 200  # most recent posts scanned for keywords
+TITLE_WEIGHT = 2
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "can", "do", "for", "from", "has",
+    "have", "how", "i", "if", "in", "is", "it", "its", "me", "my", "no", "not", "of", "on", "or",
+    "our", "so", "that", "the", "this", "to", "us", "was", "we", "what", "when", "which", "who",
+    "why", "will", "with", "you", "your", "about", "any", "all", "just", "there", "here", "get",
+    "我们", "你们", "他们", "一个", "这个", "那个", "什么", "怎么", "如何", "可以", "没有", "就是",
+    "大家", "还是", "有没", "自己", "已经", "因为", "所以", "但是", "如果", "一下", "现在",
+}
+
+
+def activity_trend(session: Session, hackathon_id: int, days: int = ACTIVITY_DAYS, today: Optional[date] = None) -> list[dict]:
+    """Posts per (UTC) day for the last `days` days, oldest first, zero-filled."""
+    today = today or datetime.utcnow().date()
+    start = today - timedelta(days=days - 1)
+    day = func.date(CommunityPost.created_at)
+    rows = session.exec(
+        select(day, func.count(CommunityPost.id))
+        .where(
+            CommunityPost.hackathon_id == hackathon_id,
+            CommunityPost.created_at >= datetime.combine(start, datetime.min.time()),
+        )
+        .group_by(day)
+    ).all()
+    # SQLite's date() returns text, PostgreSQL's a date
+    counts = {str(d)[:10]: n for d, n in rows}
+    trend = []
+    for i in range(days):
+        d = start + timedelta(days=i)
+        trend.append({"date": d.strftime("%m-%d"), "count": counts.get(d.isoformat(), 0)})
+    return trend
+
+
+def _keywords(text: Optional[str]) -> set[str]:
+    return {
+        t for t in tokenize(text)
+        if t not in STOPWORDS and not t.isdigit() and (len(t) > 1 or not t.isascii())
+    }
+
+
+def hot_topics(session: Session, hackathon_id: int, limit: int = HOT_TOPICS) -> list[dict]:
+    """Most mentioned keywords across the hackathon's recent posts."""
+    posts = session.exec(
+        select(CommunityPost.title, CommunityPost.content)
+        .where(CommunityPost.hackathon_id == hackathon_id)
+        .order_by(CommunityPost.created_at.desc())
+        .limit(HOT_TOPIC_POSTS)
+    ).all()
+    scores = Counter()
+    for title, content in posts:
+        in_title = _keywords(title)
+        for term in in_title:
+            scores[term] += TITLE_WEIGHT
+        for term in _keywords(content) - in_title:
+            scores[term] += 1
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    return [{"text": term, "value": score} for term, score in ranked]
+
+
+def _portraits(stats: dict, summary: Optional[str], posts_this_week: int) -> list[str]:
+    lines = []
+    if summary:
+        try:
+            lines.append(json.loads(summary).get("summary") or "")
+        except ValueError:
+            pass
+    participants = stats["participants"]
+    if participants:
+        top = list(stats["skill_distribution"])[:3]
+        line = f"{participants} participants enrolled"
+        lines.append(line + (f"; most common skills: {', '.join(top)}." if top else "."))
+        mbti = stats["mbti_distribution"]
+        if mbti:
+            kind, n = max(mbti.items(), key=lambda item: item[1])
+            lines.append(f"Most common personality type: {kind} ({round(100 * n / sum(mbti.values()))}%).")
+    lines.append(f"{posts_this_week} community posts in the last {ACTIVITY_DAYS} days.")
+    return [line for line in lines if line]
+
+
+def compute_insights(session: Session, hackathon_id: int) -> dict:
+    stats = participant_stats.read(session, hackathon_id)
+    trend = activity_trend(session, hackathon_id)
+    row = session.get(ParticipantStats, hackathon_id)
+    return {
+        "hot_topics": hot_topics(session, hackathon_id),
+        "skill_distribution": [
+            {"name": name, "count": count} for name, count in stats["skill_distribution"].items()
+        ],
+        "activity_trend": trend,
+        "participant_portraits": _portraits(
+            stats, row.summary if row else None, sum(day["count"] for day in trend)
+        ),
+    }
+
+
+class InsightsCache:
+    """Per-hackathon computed insights, recomputed after `ttl` seconds."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: dict[int, tuple[float, dict]] = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, hackathon_id: int, compute: Callable[[], dict]) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(hackathon_id)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        value = compute()
+        with self._lock:
+            self._entries[hackathon_id] = (now + self.ttl, value)
+            for key in [k for k, (expires, _) in self._entries.items() if expires <= now]:
+                del self._entries[key]
+        return value
+
+    def invalidate(self, hackathon_id: int) -> None:
+        with self._lock:
+            self._entries.pop(hackathon_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = InsightsCache(ttl=settings.COMMUNITY_INSIGHTS_TTL)
+
+
+def get_insights_cache() -> InsightsCache:
+    return _cache
@@ -42,6 +42,43 @@ class Settings(BaseSettings):
 
         return _DEFAULT_SQLITE_URL
 
+    # Database engine profile (app/db/session.py) — "auto" picks "sqlite" or
+    # "postgres" from DATABASE_URL; "default" is a bare create_engine().
+    # DB_ECHO logs every SQL statement (local debugging only).
+    DB_ENGINE_PROFILE: str = "auto"
+    DB_ECHO: bool = False
+    # Pool sizing for server databases; connections are checked with a
+    # ping on checkout and recycled before server-side idle timeouts.
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    # SQLite pragmas applied to every new connection by the "sqlite" profile
+    SQLITE_BUSY_TIMEOUT_MS: int = 15000
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_FOREIGN_KEYS: bool = True
+    # Read replica: when set, safe (GET/HEAD) requests read from this
+    # database and everything else uses DATABASE_URL. A client that just
+    # wrote keeps reading from the primary for DB_READ_STICKY_SECONDS so it
+    # sees its own write despite replication lag.
+    DATABASE_READ_URL: Union[str, None] = None
+    DB_READ_STICKY_SECONDS: float = 5.0
+    # Per-request statement counts (app/core/query_stats.py): X-DB-Queries /
+    # X-DB-Time headers, and a warning when one statement shape repeats
+    # DB_N_PLUS_ONE_THRESHOLD+ times in a request (probable N+1).
+    DB_QUERY_STATS: bool = False
+    DB_N_PLUS_ONE_THRESHOLD: int = 5
+    # Slow-query log (app/core/slow_queries.py): statements taking
+    # SLOW_QUERY_MS or longer (0 disables) go to a rotating JSON-lines file
+    # with redacted parameters, the route and, once per statement shape,
+    # the query plan. Top offenders: GET /admin/slow-queries.
+    SLOW_QUERY_MS: float = 200.0
+    SLOW_QUERY_LOG_PATH: str = os.path.join(_BACKEND_DIR, "data", "slow_queries.log")
+    SLOW_QUERY_LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    SLOW_QUERY_LOG_BACKUPS: int = 5
+
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = ["*"]
 
@@ -65,7 +102,107 @@ class Settings(BaseSettings):
     SILICONFLOW_API_KEY: str = ""
     SILICONFLOW_BASE_URL: str = "https://api.siliconflow.cn/v1"
     SILICONFLOW_IMAGE_MODEL: str = "black-forest-labs/FLUX.1-schnell"
-    
+
+    # Shared async AI client — per-call timeout (seconds), max in-flight
+    # upstream requests across all AI endpoints, and SDK retry count.
+    AI_REQUEST_TIMEOUT: float = 60.0
+    AI_MAX_CONCURRENCY: int = 16
+    AI_MAX_RETRIES: int = 1
+
+    # AI completion cache — in-memory LRU over a SQLite file. Entry counts
+    # bound each tier; per-endpoint TTLs live next to the endpoints in ai.py.
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_PATH: str = os.path.join(_BACKEND_DIR, "data", "ai_cache.db")
+    AI_CACHE_MEMORY_ENTRIES: int = 512
+    AI_CACHE_DISK_ENTRIES: int = 20000
+
+    # AI team matching — candidates pre-ranked locally before the LLM call.
+    # TOP_K go to the model; the global pool (used when a hackathon has no
+    # other participants) is capped; in-process matrices rebuild after TTL.
+    TEAM_MATCH_TOP_K: int = 20
+    TEAM_MATCH_GLOBAL_POOL: int = 2000
+    TEAM_MATCH_INDEX_TTL: float = 600.0
+
+    # AI hackathon search — BM25 prefilter; only the top N candidates are
+    # sent to the model. The in-process index rebuilds after TTL seconds.
+    AI_SEARCH_TOP_N: int = 20
+    SEARCH_INDEX_TTL: float = 600.0
+
+    # AI upstream selection — "auto" uses DeepSeek or ModelScope for chat
+    # (USE_DEEPSEEK) and SiliconFlow for images; "fake" answers every call
+    # in-process with app.core.fake_llm, for load tests without paid APIs.
+    AI_PROVIDER: str = "auto"
+    # Fake provider behaviour: latency distribution (fixed | uniform |
+    # lognormal | exponential) around a median, injected failure rates,
+    # streamed chunk size and the seed that makes all of it reproducible.
+    AI_FAKE_LATENCY_DIST: str = "lognormal"
+    AI_FAKE_LATENCY_MS: float = 800.0
+    AI_FAKE_LATENCY_SIGMA: float = 0.5
+    AI_FAKE_ERROR_RATE: float = 0.0
+    AI_FAKE_MALFORMED_RATE: float = 0.0
+    AI_FAKE_STREAM_CHUNK_CHARS: int = 16
+    AI_FAKE_SEED: int = 0
+
+    # Token budget for the records (users, hackathons) packed into one AI
+    # prompt, with optional per-model overrides keyed by model name.
+    AI_PROMPT_TOKEN_BUDGET: int = 6000
+    AI_PROMPT_TOKEN_BUDGETS: dict[str, int] = {}
+
+    # AI telemetry — size of the recent-event ring behind the rolling
+    # summary, its default window, and optional prices per model as
+    # [prompt, completion] per million tokens for cost estimates.
+    AI_METRICS_WINDOW_EVENTS: int = 50000
+    AI_METRICS_SUMMARY_WINDOW: int = 900
+    AI_TOKEN_PRICES: dict[str, list[float]] = {}
+
+    # AI image jobs — worker pool size and how many jobs may wait for it
+    # (more get a 503), where finished images are stored
+    # (under the /static uploads mount), download limits, how long the
+    # blocking /ai/generate-image waits, and how many finished jobs are
+    # remembered in memory (files on disk are kept regardless).
+    AI_IMAGE_WORKERS: int = 4
+    AI_IMAGE_QUEUE_SIZE: int = 100
+    AI_IMAGE_DIR: str = "uploads/ai-images"
+    AI_IMAGE_URL_PREFIX: str = "/static/ai-images"
+    AI_IMAGE_DOWNLOAD_TIMEOUT: float = 60.0
+    AI_IMAGE_MAX_BYTES: int = 10 * 1024 * 1024
+    AI_IMAGE_WAIT_SECONDS: float = 90.0
+    AI_IMAGE_JOB_RETENTION: int = 1000
+
+    # Batch AI review of submissions — parallel upstream calls per job, and
+    # how long a running job may go without a heartbeat before another worker
+    # (or a restarted one) takes it over; heartbeats and the takeover sweep
+    # run every third of that.
+    AI_REVIEW_BATCH_CONCURRENCY: int = 4
+    AI_REVIEW_JOB_STALE_SECONDS: int = 300
+
+    # Community insights — the cached AI summary of a hackathon's participant
+    # pool is regenerated once the participant count, or the skill / MBTI
+    # distribution (total variation distance), has moved by this fraction
+    # since the summary was written.
+    AI_INSIGHTS_MATERIAL_CHANGE: float = 0.1
+
+    # Community dashboard (GET /community/insights) — aggregates are cached
+    # per hackathon and recomputed after this many seconds.
+    COMMUNITY_INSIGHTS_TTL: float = 300.0
+
+    # Hackathon detail documents (GET /hackathons/{id}) cached per process,
+    # invalidated by the row's doc_version; at most this many hackathons.
+    HACKATHON_DOC_CACHE_SIZE: int = 1000
+
+    # Hackathon list facet counts (GET /hackathons/facets) are cached per
+    # filter combination; writes clear this worker's cache, other workers
+    # recompute after this many seconds.
+    HACKATHON_FACETS_TTL: float = 60.0
+
+    # Cache-Control per route for responses with ETags (app/core/http_cache.py).
+    # "no-cache" lets clients keep the body but revalidate every time, which
+    # costs a 304 when nothing changed.
+    HTTP_CACHE_CONTROL: dict[str, str] = {
+        "hackathon_list": "public, no-cache",
+        "hackathon_detail": "public, no-cache",
+    }
+
     # GitHub OAuth
     GITHUB_CLIENT_ID: str = ""
     GITHUB_CLIENT_SECRET: str = ""
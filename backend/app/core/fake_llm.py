@@ -0,0 +1,530 @@
+"""
+Deterministic offline stand-in for the OpenAI-compatible AI upstreams.
+
+Set AI_PROVIDER=fake and every chat and image call made through
+app.core.llm goes to FakeOpenAIClient instead of DeepSeek / ModelScope /
+SiliconFlow. The same client also backs a standalone HTTP server
+(scripts/fake_llm_server.py). To use the server, point DEEPSEEK_BASE_URL
+or SILICONFLOW_BASE_URL at it. This exercises the real network path.
+
+Replies are valid JSON in the shape each prompt asks for. Every key in
+prompt.json is covered, and so are the inline prompts in ai.py. Content
+is derived from a hash of the prompt and AI_FAKE_SEED, so the same
+request always gets the same answer. Latency is drawn from
+AI_FAKE_LATENCY_DIST. AI_FAKE_ERROR_RATE and AI_FAKE_MALFORMED_RATE inject
+upstream 500s and unparseable replies, so the fallback paths get load too.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import struct
+import time
+import zlib
+from typing import Any, AsyncIterator, Callable, Optional
+
+import httpx
+import openai
+from openai.types import ImagesResponse
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+from app.core.config import settings
+from app.core.llm import LLMProvider
+
+_PROMPT_FILE = os.path.join(os.path.dirname(__file__), "..", "..", "prompt.json")
+_FAKE_URL = "http://fake-llm.local/v1"
+
+_WORDS = (
+    "adaptive agent analytics assistant carbon civic cloud collaborative copilot data "
+    "edge equity graph green health insight learning local market mesh mobile open "
+    "planner privacy realtime resilient retrieval safety smart social supply trust vision"
+).split()
+_SKILLS = ["Python", "React", "FastAPI", "TypeScript", "PyTorch", "Figma", "PostgreSQL", "Go", "Docker", "Rust"]
+_MBTI = ["INTJ", "ENFP", "ENTP", "INFJ", "ISTJ", "ESFP"]
+
+
+# ---------------------------------------------------------------------------
+# Prompt identification
+# ---------------------------------------------------------------------------
+
+def _load_prompts() -> dict[str, str]:
+    for path in ("prompt.json", _PROMPT_FILE):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            continue
+    return {}
+
+
+PROMPTS = _load_prompts()
+
+# The prompts ai.py writes inline, recognized by a phrase unique to each
+_INLINE_MARKERS = {
+    "project_idea": "Hackathon Project Mentor",
+    "recruitment": "Tech Recruiter for a Hackathon Team",
+    "refine_project": "Professional Tech Editor",
+}
+
+
+def identify_prompt(system_prompt: str) -> Optional[str]:
+    """The prompt.json key (or inline prompt name) a system prompt came from."""
+    text = system_prompt.strip()
+    for key, value in PROMPTS.items():
+        override = os.getenv(f"SYSTEM_PROMPT_{key.upper()}")
+        if text in (value.strip(), (override or "").strip()):
+            return key
+    for name, marker in _INLINE_MARKERS.items():
+        if marker in system_prompt:
+            return name
+    return None
+
+
+def _json_after(text: str, label: str, default: Any = None) -> Any:
+    """Decode the JSON value that follows `label` in a user prompt."""
+    start = text.find(label)
+    if start < 0:
+        return default
+    match = re.search(r"[\[{]", text[start + len(label):])
+    if not match:
+        return default
+    try:
+        value, _ = json.JSONDecoder().raw_decode(text, start + len(label) + match.start())
+        return value
+    except ValueError:
+        return default
+
+
+# ---------------------------------------------------------------------------
+# Reply generators, one per prompt
+# ---------------------------------------------------------------------------
+
+def _phrase(rng: random.Random, n: int = 3) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(n)).title()
+
+
+def _sentence(rng: random.Random, n: int = 12) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(n)).capitalize() + "."
+
+
+def _team_match(rng, user_prompt):
+    candidates = _json_after(user_prompt, "Candidate Users:", [])
+    picks = rng.sample(candidates, min(len(candidates), rng.randint(3, 5)))
+    return {"matches": [
+        {
+            "user_id": c.get("id"),
+            "name": c.get("name"),
+            "match_score": rng.randint(55, 98),
+            "match_reason": _sentence(rng),
+        }
+        for c in picks
+    ]}
+
+
+def _brainstorm(rng, user_prompt):
+    return {"ideas": [
+        {
+            "title": _phrase(rng),
+            "description": _sentence(rng, 30),
+            "tech_stack": ", ".join(rng.sample(_SKILLS, 3)),
+            "complexity": rng.choice(["Easy", "Medium", "Hard"]),
+            "impact_potential": {"score": rng.randint(50, 95), "reason": _sentence(rng)},
+        }
+        for _ in range(rng.randint(3, 4))
+    ]}
+
+
+def _pitch_deck(rng, user_prompt):
+    return {"slides": [
+        {
+            "title": _phrase(rng),
+            "content": "\n".join(f"- {_sentence(rng, 8)}" for _ in range(3)),
+            "speaker_notes": _sentence(rng, 25),
+            "visual_idea": _sentence(rng),
+        }
+        for _ in range(rng.randint(7, 8))
+    ]}
+
+
+def _roadmap(rng, user_prompt):
+    hours = sorted(rng.sample(range(6, 72, 6), 7))
+    phases = zip([0] + hours[:-1], hours)
+    return {"roadmap": [f"[{a}-{b}h] {_phrase(rng, 2)}: {_phrase(rng)} -> {_phrase(rng, 2)}" for a, b in phases]}
+
+
+def _resume(rng, user_prompt):
+    return {"bio": _sentence(rng, 60), "skills": rng.sample(_SKILLS, rng.randint(6, 8))}
+
+
+def _search_hackathons(rng, user_prompt):
+    hackathons = _json_after(user_prompt, "Active Hackathons:", [])
+    picks = hackathons[:rng.randint(1, 3)]
+    return {
+        "matches": [{"id": h.get("id"), "reason": _sentence(rng)} for h in picks],
+        "summary": _sentence(rng, 30),
+    }
+
+
+def _review(rng, user_prompt):
+    dimensions = _json_after(user_prompt, "Scoring Dimensions:", [])
+    names = [d.get("name") for d in dimensions if isinstance(d, dict) and d.get("name")]
+    return {
+        "scores": {name: rng.randint(5, 10) for name in names},
+        "comment": "\n\n".join(_sentence(rng, 30) for _ in range(3)),
+    }
+
+
+def _hackathon_refinement(rng, user_prompt):
+    current = _json_after(user_prompt, "Current Data:", {})
+    refined = dict(current) if isinstance(current, dict) else {}
+    refined["description"] = f"{refined.get('description', '')}\n\nWhy Now? {_sentence(rng, 20)}".strip()
+    refined["theme_tags"] = ", ".join(rng.sample(_WORDS, 4))
+    return refined
+
+
+def _hackathon_creation(rng, user_prompt):
+    weights = [30, 25, 25, 20]
+    return {
+        "title": f"{_phrase(rng)} Hackathon",
+        "subtitle": _sentence(rng, 8),
+        "description": "\n\n".join(_sentence(rng, 40) for _ in range(5)),
+        "theme_tags": ", ".join(rng.sample(_WORDS, 4)),
+        "professionalism_tags": ", ".join(rng.sample(_WORDS, 2)),
+        "rules_detail": _sentence(rng, 30),
+        "requirements": _sentence(rng, 20),
+        "resource_detail": _sentence(rng, 20),
+        "organizer_name": f"{_phrase(rng, 2)} Lab",
+        "location": "线上",
+        "registration_type": rng.choice(["individual", "team"]),
+        "format": rng.choice(["online", "offline"]),
+        "contact_info_text": "hello@example.com",
+        "awards_detail": _sentence(rng, 15),
+        "scoring_dimensions": [
+            {"name": _phrase(rng, 1), "description": _sentence(rng), "weight": w} for w in weights
+        ],
+    }
+
+
+def _project_refinement(rng, user_prompt):
+    return {"description": _sentence(rng, 150), "business_plan": _sentence(rng, 80)}
+
+
+def _participant_analysis(rng, user_prompt):
+    skills = _json_after(user_prompt, "Skill Distribution:", {}) or {s: rng.randint(1, 9) for s in rng.sample(_SKILLS, 4)}
+    return {
+        "summary": _sentence(rng, 40),
+        "skill_distribution": skills,
+        "interest_clusters": [
+            {"name": _phrase(rng, 2), "count": rng.randint(1, 20), "description": _sentence(rng)}
+            for _ in range(3)
+        ],
+        "recommendations": [_sentence(rng) for _ in range(rng.randint(3, 5))],
+    }
+
+
+def _individual_participant_analysis(rng, user_prompt):
+    return {
+        "technical_depth": _sentence(rng),
+        "versatility": rng.randint(40, 95),
+        "potential_contribution": _sentence(rng),
+        "perfect_teammate_roles": [_phrase(rng, 2) for _ in range(3)],
+        "aura_insight": _sentence(rng, 10),
+    }
+
+
+def _matching(rng, user_prompt):
+    return {"matches": [
+        {
+            "user_id": index + 1,
+            "name": f"{_phrase(rng, 2)} Guru",
+            "skills": ", ".join(rng.sample(_SKILLS, 2)),
+            "personality": rng.choice(_MBTI),
+            "match_score": rng.randint(60, 95),
+            "match_reason": _sentence(rng),
+        }
+        for index in range(3)
+    ]}
+
+
+def _project_idea(rng, user_prompt):
+    return {
+        "title": _phrase(rng),
+        "description": _sentence(rng, 30),
+        "tech_stack": rng.sample(_SKILLS, 4),
+        "implementation_path": [f"Step {i + 1}: {_sentence(rng, 6)}" for i in range(3)],
+    }
+
+
+def _recruitment(rng, user_prompt):
+    return [
+        {
+            "role": f"{rng.choice(['Frontend', 'Backend', 'ML', 'Design'])} {rng.choice(['Dev', 'Engineer', 'Lead'])}",
+            "skills": ", ".join(rng.sample(_SKILLS, 2)),
+            "count": rng.randint(1, 2),
+            "description": _sentence(rng),
+        }
+        for _ in range(rng.randint(2, 3))
+    ]
+
+
+def _refine_project(rng, user_prompt):
+    original = user_prompt.split("Original Description:", 1)[-1].strip()
+    return {"refined_description": f"{original} {_sentence(rng, 20)}".strip()}
+
+
+GENERATORS: dict[str, Callable[[random.Random, str], Any]] = {
+    "team_match_system": _team_match,
+    "brainstorm_system": _brainstorm,
+    "pitch_deck_system": _pitch_deck,
+    "roadmap_system": _roadmap,
+    "resume_system": _resume,
+    "search_hackathon_system": _search_hackathons,
+    "review_system": _review,
+    "hackathon_refinement_system": _hackathon_refinement,
+    "hackathon_creation_system": _hackathon_creation,
+    "project_refinement_system": _project_refinement,
+    "participant_analysis_system": _participant_analysis,
+    "individual_participant_analysis_system": _individual_participant_analysis,
+    "matching_system": _matching,
+    "project_idea": _project_idea,
+    "recruitment": _recruitment,
+    "refine_project": _refine_project,
+}
+
+
+def _rng_for(*parts: str) -> random.Random:
+    digest = hashlib.sha256("\x00".join((str(settings.AI_FAKE_SEED),) + parts).encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def fake_reply(system_prompt: str, user_prompt: str) -> Any:
+    """The JSON value the stand-in answers this prompt pair with."""
+    key = identify_prompt(system_prompt)
+    generator = GENERATORS.get(key)
+    if generator is None:
+        return {"content": _sentence(_rng_for(system_prompt, user_prompt), 20)}
+    return generator(_rng_for(system_prompt, user_prompt), user_prompt)
+
+
+def fake_image_url(prompt: str, size: str) -> str:
+    """A deterministic solid-colour PNG placeholder as a data: URL (no network needed)."""
+    width, _, height = size.partition("x")
+    width, height = int(width or 1), int(height or 1)
+    rng = _rng_for("image", prompt)
+    pixel = rng.randrange(0x1000000).to_bytes(3, "big")
+    rows = (b"\x00" + pixel * width) * height
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    png = (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(rows))
+        + chunk(b"IEND", b"")
+    )
+    return "data:image/png;base64," + base64.b64encode(png).decode("ascii")
+
+
+# ---------------------------------------------------------------------------
+# OpenAI-compatible client
+# ---------------------------------------------------------------------------
+
+class LatencyModel:
+    """Samples response times (seconds) around a median."""
+
+    def __init__(self, dist: str, median_ms: float, sigma: float, seed: int):
+        self.dist = dist
+        self.median = median_ms / 1000.0
+        self.sigma = sigma
+        self._rng = random.Random(seed)
+
+    def sample(self) -> float:
+        if self.median <= 0:
+            return 0.0
+        if self.dist == "uniform":
+            return self._rng.uniform(self.median * (1 - self.sigma), self.median * (1 + self.sigma))
+        if self.dist == "exponential":
+            return self._rng.expovariate(math.log(2) / self.median)
+        if self.dist == "lognormal":
+            return self._rng.lognormvariate(math.log(self.median), self.sigma)
+        return self.median
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class _ChunkStream:
+    """What AsyncOpenAI returns for stream=True: async-iterable chunks with close()."""
+
+    def __init__(self, chunks: AsyncIterator[ChatCompletionChunk]):
+        self._chunks = chunks
+
+    def __aiter__(self):
+        return self._chunks
+
+    async def close(self):
+        await self._chunks.aclose()
+
+
+class FakeOpenAIClient:
+    """The slice of AsyncOpenAI that LLMProvider uses, answered locally."""
+
+    def __init__(self):
+        self.latency = LatencyModel(
+            settings.AI_FAKE_LATENCY_DIST,
+            settings.AI_FAKE_LATENCY_MS,
+            settings.AI_FAKE_LATENCY_SIGMA,
+            settings.AI_FAKE_SEED,
+        )
+        self._faults = random.Random(settings.AI_FAKE_SEED + 1)
+        self.chat = _Namespace(completions=_Namespace(create=self._create_completion))
+        self.images = _Namespace(generate=self._generate_image)
+
+    async def _delay(self, timeout: Optional[float], path: str) -> float:
+        """Wait out one sampled latency, failing the way a real upstream would."""
+        seconds = self.latency.sample()
+        if timeout is not None and seconds > timeout:
+            await asyncio.sleep(timeout)
+            raise openai.APITimeoutError(request=httpx.Request("POST", f"{_FAKE_URL}{path}"))
+        if self._faults.random() < settings.AI_FAKE_ERROR_RATE:
+            await asyncio.sleep(seconds / 2)
+            request = httpx.Request("POST", f"{_FAKE_URL}{path}")
+            raise openai.InternalServerError(
+                "Injected upstream error", response=httpx.Response(500, request=request), body=None
+            )
+        return seconds
+
+    def _reply_text(self, messages: list[dict]) -> str:
+        system = next((m["content"] for m in messages if m["role"] == "system"), "")
+        user = "\n".join(m["content"] for m in messages if m["role"] == "user")
+        text = json.dumps(fake_reply(system, user), ensure_ascii=False)
+        if self._faults.random() < settings.AI_FAKE_MALFORMED_RATE:
+            text = text[: len(text) // 2]
+        return text
+
+    async def _create_completion(self, *, model: str, messages: list[dict], stream: bool = False,
+                                 timeout: Optional[float] = None, **kwargs):
+        seconds = await self._delay(timeout, "/chat/completions")
+        text = self._reply_text(messages)
+        prompt_tokens = _tokens("".join(m["content"] for m in messages))
+        if stream:
+            return _ChunkStream(self._chunks(model, text, seconds))
+        await asyncio.sleep(seconds)
+        return ChatCompletion.model_validate({
+            "id": "fake-" + hashlib.sha1(text.encode("utf-8")).hexdigest()[:12],
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": text}}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": _tokens(text),
+                "total_tokens": prompt_tokens + _tokens(text),
+            },
+        })
+
+    async def _chunks(self, model: str, text: str, seconds: float) -> AsyncIterator[ChatCompletionChunk]:
+        size = max(1, settings.AI_FAKE_STREAM_CHUNK_CHARS)
+        pieces = [text[i:i + size] for i in range(0, len(text), size)] or [""]
+        created = int(time.time())
+        for index, piece in enumerate(pieces + [None]):
+            if piece is not None:
+                await asyncio.sleep(seconds / len(pieces))
+            yield ChatCompletionChunk.model_validate({
+                "id": "fake-stream",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": piece} if piece is not None else {},
+                    "finish_reason": None if piece is not None else "stop",
+                }],
+            })
+
+    async def _generate_image(self, *, model: str, prompt: str, size: str = "1024x1024",
+                              n: int = 1, timeout: Optional[float] = None, **kwargs) -> ImagesResponse:
+        seconds = await self._delay(timeout, "/images/generations")
+        await asyncio.sleep(seconds)
+        return ImagesResponse.model_validate({
+            "created": int(time.time()),
+            "data": [{"url": fake_image_url(prompt, size), "revised_prompt": prompt}],
+        })
+
+    async def close(self) -> None:
+        pass
+
+
+class _Namespace:
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+
+
+class FakeLLMProvider(LLMProvider):
+    """LLMProvider backed by FakeOpenAIClient (AI_PROVIDER=fake)."""
+
+    def __init__(self, name: str = "fake", model: str = "fake-model"):
+        super().__init__(name, "fake", _FAKE_URL, model)
+
+    def _build_client(self) -> FakeOpenAIClient:
+        return FakeOpenAIClient()
+
+
+# ---------------------------------------------------------------------------
+# HTTP stand-in server
+# ---------------------------------------------------------------------------
+
+def build_stand_in_app():
+    """
+    FastAPI app serving POST /chat/completions and /images/generations
+    (OpenAI wire format, including SSE for stream=true) from FakeOpenAIClient.
+    """
+    from fastapi import FastAPI
+    from fastapi.responses import JSONResponse, StreamingResponse
+
+    client = FakeOpenAIClient()
+    app = FastAPI(title="Fake LLM")
+
+    def error_response(e: openai.APIError) -> JSONResponse:
+        status = getattr(e, "status_code", None) or 504
+        return JSONResponse({"error": {"message": e.message, "type": type(e).__name__}}, status_code=status)
+
+    @app.post("/chat/completions")
+    async def chat_completions(body: dict):
+        try:
+            result = await client.chat.completions.create(
+                model=body.get("model", "fake-model"),
+                messages=body.get("messages", []),
+                stream=bool(body.get("stream")),
+            )
+        except openai.APIError as e:
+            return error_response(e)
+        if not body.get("stream"):
+            return result.model_dump(exclude_none=True)
+
+        async def events():
+            async for chunk in result:
+                yield f"data: {chunk.model_dump_json(exclude_none=True)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/images/generations")
+    async def images_generations(body: dict):
+        try:
+            result = await client.images.generate(
+                model=body.get("model", "fake-image"),
+                prompt=body.get("prompt", ""),
+                size=body.get("size", "1024x1024"),
+            )
+        except openai.APIError as e:
+            return error_response(e)
+        return result.model_dump(exclude_none=True)
+
+    return app
@@ -0,0 +1,181 @@
+"""
+Full-text index behind the `search` filter of GET /hackathons.
+
+Title, description and tags of every hackathon are indexed in the
+database, next to the rows they describe, so a search combines with the
+other list filters in one statement and ranks by relevance:
+
+  sqlite      an FTS5 table `hackathon_fts` (rowid = hackathon id), ranked
+              with bm25() weighting title matches TITLE_BOOST times
+  postgresql  a table `hackathon_fts` (hackathon_id, document tsvector)
+              with a GIN index, title terms weighted 'A', ranked with
+              ts_rank()
+
+Neither backend's built-in tokenizer handles Chinese, so text is run
+through search_index.tokenize() (Latin words plus CJK bigrams) before it
+is stored and the stored tokens are plain whitespace-separated words. A
+query is tokenized the same way and every term must match, as a prefix,
+so "hack" still finds "Hackathon" as the old LIKE filter did.
+
+The index is created along with the hackathon table (DDL hooked to its
+after_create event), by migration q7r8s9t0u1v2 on existing databases, or
+by ensure_index() from init_db(). The create/update/delete endpoints keep
+it in sync inside their own transaction through index_hackathon() and
+unindex_hackathon(), so a search never sees a half-applied edit. Both
+take a connection and plain column values rather than a Hackathon, so
+migrations can index rows they read through their own table stubs.
+"""
+import json
+from typing import Optional
+
+from sqlalchemy import DDL, Column, Connection, Integer, MetaData, Table, event, func, literal_column, select, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+from app.core.search_index import TITLE_BOOST, tokenize
+from app.models.hackathon import Hackathon
+
+# Not in SQLModel.metadata: the tables are created by the DDL below, not
+# by create_all(). SQLite: FTS5 virtual table whose rowid is the hackathon id
+sqlite_fts = Table(
+    "hackathon_fts", MetaData(),
+    Column("rowid", Integer, primary_key=True),
+    Column("title"), Column("description"), Column("tags"),
+)
+# PostgreSQL: one tsvector per hackathon
+postgres_fts = Table(
+    "hackathon_fts", MetaData(),
+    Column("hackathon_id", Integer, primary_key=True),
+    Column("document", TSVECTOR),
+)
+
+_CREATE = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS hackathon_fts "
+        "USING fts5(title, description, tags, tokenize = 'unicode61')",
+    ],
+    "postgresql": [
+        "CREATE TABLE IF NOT EXISTS hackathon_fts ("
+        "hackathon_id INTEGER PRIMARY KEY REFERENCES hackathon (id) ON DELETE CASCADE, "
+        "document TSVECTOR NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS ix_hackathon_fts_document ON hackathon_fts USING GIN (document)",
+    ],
+}
+
+for _dialect, _statements in _CREATE.items():
+    for _statement in _statements:
+        event.listen(Hackathon.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+    event.listen(
+        Hackathon.__table__, "before_drop",
+        DDL("DROP TABLE IF EXISTS hackathon_fts").execute_if(dialect=_dialect),
+    )
+
+
+def create_index(connection) -> None:
+    """Create the index on an existing database (no-op where it exists)."""
+    for statement in _CREATE.get(connection.dialect.name, []):
+        connection.exec_driver_sql(statement)
+
+
+def index_fields(title: Optional[str], description: Optional[str], tags: Optional[str]) -> dict:
+    """Pre-tokenized title, description and tags (the JSON list stored in hackathon.tags)."""
+    try:
+        tag_list = json.loads(tags) if tags else []
+    except (json.JSONDecodeError, TypeError):
+        tag_list = []
+    if not isinstance(tag_list, list):
+        tag_list = [tag_list]
+    return {
+        "title": " ".join(tokenize(title)),
+        "description": " ".join(tokenize(description)),
+        "tags": " ".join(tokenize(" ".join(str(t) for t in tag_list))),
+    }
+
+
+def index_hackathon(
+    connection: Connection,
+    hackathon_id: int,
+    title: Optional[str],
+    description: Optional[str],
+    tags: Optional[str],
+) -> None:
+    """(Re)index one hackathon; endpoints call it with session.connection() before their commit."""
+    dialect = connection.dialect.name
+    fields = {"id": hackathon_id, **index_fields(title, description, tags)}
+    if dialect == "sqlite":
+        connection.execute(text("DELETE FROM hackathon_fts WHERE rowid = :id"), {"id": hackathon_id})
+        connection.execute(
+            text("INSERT INTO hackathon_fts (rowid, title, description, tags) "
+                 "VALUES (:id, :title, :description, :tags)"),
+            fields,
+        )
+    elif dialect == "postgresql":
+        connection.execute(
+            text("INSERT INTO hackathon_fts (hackathon_id, document) VALUES (:id, "
+                 "setweight(to_tsvector('simple', :title), 'A') || to_tsvector('simple', :body)) "
+                 "ON CONFLICT (hackathon_id) DO UPDATE SET document = EXCLUDED.document"),
+            {"id": hackathon_id, "title": fields["title"],
+             "body": f"{fields['description']} {fields['tags']}"},
+        )
+
+
+def unindex_hackathon(connection: Connection, hackathon_id: int) -> None:
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        connection.execute(text("DELETE FROM hackathon_fts WHERE rowid = :id"), {"id": hackathon_id})
+    elif dialect == "postgresql":
+        connection.execute(text("DELETE FROM hackathon_fts WHERE hackathon_id = :id"), {"id": hackathon_id})
+
+
+def matches(dialect: str, search: str):
+    """
+    Subquery of (hackathon_id, rank) for hackathons matching every term of
+    `search`, lower rank = more relevant; None if `search` has no indexable
+    terms (or the backend has no index).
+    """
+    terms = list(dict.fromkeys(tokenize(search)))
+    if not terms:
+        return None
+    if dialect == "sqlite":
+        # Terms are [a-z0-9]+ or CJK runs, so quoting is all FTS5 needs
+        expression = " ".join(f'"{t}"*' for t in terms)
+        return (
+            select(
+                sqlite_fts.c.rowid.label("hackathon_id"),
+                func.bm25(literal_column("hackathon_fts"), float(TITLE_BOOST), 1.0, 1.0)
+                .label("rank"),
+            )
+            .where(literal_column("hackathon_fts").op("MATCH")(expression))
+            .subquery("fts")
+        )
+    if dialect == "postgresql":
+        query = func.to_tsquery("simple", " & ".join(f"{t}:*" for t in terms))
+        return (
+            select(
+                postgres_fts.c.hackathon_id,
+                (-func.ts_rank(postgres_fts.c.document, query)).label("rank"),
+            )
+            .where(postgres_fts.c.document.op("@@")(query))
+            .subquery("fts")
+        )
+    return None
+
+
+def rebuild(connection: Connection) -> int:
+    """Re-index every hackathon (backfill); returns the number indexed."""
+    rows = connection.execute(
+        select(Hackathon.id, Hackathon.title, Hackathon.description, Hackathon.tags)
+    ).all()
+    for row in rows:
+        index_hackathon(connection, *row)
+    return len(rows)
+
+
+def ensure_index(engine) -> Optional[int]:
+    """Create the index if missing and backfill it when it is empty but hackathons exist."""
+    if engine.dialect.name not in _CREATE:
+        return None
+    with engine.begin() as connection:
+        create_index(connection)
+        indexed = connection.execute(text("SELECT COUNT(*) FROM hackathon_fts")).scalar()
+        total = connection.execute(select(func.count(Hackathon.id))).scalar()
+        return rebuild(connection) if total and not indexed else None
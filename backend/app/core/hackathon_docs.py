@@ -0,0 +1,76 @@
+"""
+Cache of assembled hackathon detail documents (GET /hackathons/{id}).
+
+Building the document costs six queries and a from_orm().dict() per child
+row. Each hackathon row carries a doc_version counter, and every endpoint
+that changes the document (the hackathon row, its hosts, sections,
+schedules, prizes, judging criteria or partners) calls bump_doc_version()
+inside its own transaction. The detail endpoint loads the row anyway (404
+check, core fields) and serves the cached document if it was built at the
+same version, so a hit is one primary-key lookup plus a dict lookup.
+
+The version lives in the database rather than in this process, so
+several workers (and a lagging read replica) never serve a document older
+than the row they just read, and no TTL is needed. Only the documents are
+kept per process, in a bounded LRU.
+"""
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import update
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models.hackathon import Hackathon
+
+
+def bump_doc_version(session: Session, hackathon_id: int) -> None:
+    """Invalidate cached detail documents of a hackathon; call before the endpoint's commit."""
+    session.exec(
+        update(Hackathon)
+        .where(Hackathon.id == hackathon_id)
+        .values(doc_version=Hackathon.doc_version + 1)
+    )
+
+
+class HackathonDocCache:
+    """Assembled detail documents keyed by hackathon id, valid for one doc_version."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._docs: OrderedDict[int, tuple[int, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, hackathon_id: int, version: int) -> Optional[dict]:
+        with self._lock:
+            entry = self._docs.get(hackathon_id)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._docs.move_to_end(hackathon_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, hackathon_id: int, version: int, doc: dict) -> None:
+        with self._lock:
+            current = self._docs.get(hackathon_id)
+            if current is not None and current[0] > version:
+                return  # a reader that saw a newer row got here first
+            self._docs[hackathon_id] = (version, doc)
+            self._docs.move_to_end(hackathon_id)
+            while len(self._docs) > self.max_entries:
+                self._docs.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._docs.clear()
+
+
+_cache = HackathonDocCache(settings.HACKATHON_DOC_CACHE_SIZE)
+
+
+def get_hackathon_doc_cache() -> HackathonDocCache:
+    return _cache
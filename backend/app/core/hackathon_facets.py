@@ -0,0 +1,110 @@
+"""
+Facet counts for the hackathon list filters (GET /hackathons/facets).
+
+For each filter dimension (status, format, province, city, district) one
+GROUP BY query counts the listed hackathons per value, applying every
+active filter except the dimension's own, plus the full-text `search`.
+Ticking "online" therefore narrows the province counts but still shows
+how many offline hackathons there are. The list endpoint builds its WHERE
+clause from the same filter_clauses(), so a count always equals the
+length of the list that option would produce.
+
+Results are cached per filter combination. The hackathon create, update
+and delete endpoints invalidate the cache of their process; other worker
+processes pick up the change after HACKATHON_FACETS_TTL seconds.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core import fulltext
+from app.core.config import settings
+from app.models.hackathon import Hackathon, HackathonStatus
+
+DIMENSIONS = ("status", "format", "province", "city", "district")
+
+
+def filter_clauses(filters: dict) -> dict:
+    """WHERE clause per active filter dimension (unset filters are skipped)."""
+    return {
+        name: getattr(Hackathon, name) == value
+        for name, value in filters.items()
+        if name in DIMENSIONS and value
+    }
+
+
+async def compute_facets(session: AsyncSession, filters: dict, search: Optional[str] = None) -> dict:
+    clauses = filter_clauses(filters)
+    hits = fulltext.matches(session.bind.dialect.name, search) if search else None
+    facets = {}
+    for name in DIMENSIONS:
+        column = getattr(Hackathon, name)
+        query = select(column, func.count(Hackathon.id)).where(Hackathon.status != HackathonStatus.DELETED)
+        if hits is not None:
+            query = query.join(hits, hits.c.hackathon_id == Hackathon.id)
+        elif search:
+            query = query.where(Hackathon.title.contains(search))
+        for other, clause in clauses.items():
+            if other != name:
+                query = query.where(clause)
+        rows = (await session.exec(query.where(column.is_not(None)).group_by(column))).all()
+        facets[name] = sorted(
+            ({"value": getattr(value, "value", value), "count": count} for value, count in rows),
+            key=lambda item: (-item["count"], item["value"]),
+        )
+    # The status facet is filtered by everything else; with a status
+    # filter only its own bucket is listed
+    status = filters.get("status")
+    status = getattr(status, "value", status)
+    total = sum(item["count"] for item in facets["status"] if not status or item["value"] == status)
+    return {"total": total, "facets": facets}
+
+
+class FacetCache:
+    """Facet results per filter combination, dropped on writes or after `ttl` seconds."""
+
+    def __init__(self, ttl: float, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[float, dict]] = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        """Read before computing and pass to put(), so a result computed across a write is not kept."""
+        return self._generation
+
+    def get(self, key: tuple) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: tuple, generation: int, value: dict) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+_cache = FacetCache(ttl=settings.HACKATHON_FACETS_TTL)
+
+
+def get_facet_cache() -> FacetCache:
+    return _cache
@@ -0,0 +1,51 @@
+"""
+Conditional GET helpers: strong ETags, If-None-Match and per-route
+Cache-Control (HTTP_CACHE_CONTROL).
+
+Endpoints compute the ETag from version columns they have to read anyway
+(a hackathon's updated_at and doc_version, the ids and versions of a list
+page), so a 304 skips assembling and serializing the body.
+"""
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+
+
+def etag(*parts) -> str:
+    """Strong ETag over `parts` (anything with a stable repr)."""
+    return '"' + hashlib.sha1(repr(parts).encode()).hexdigest()[:32] + '"'
+
+
+def not_modified(request: Request, tag: str) -> bool:
+    """Whether the request's If-None-Match lists `tag` (or is "*")."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison: W/"x" matches "x"
+    candidates = {c.strip().removeprefix("W/") for c in header.split(",")}
+    return tag in candidates
+
+
+def cache_headers(tag: str, route: str) -> dict:
+    headers = {"ETag": tag}
+    policy: Optional[str] = settings.HTTP_CACHE_CONTROL.get(route)
+    if policy:
+        headers["Cache-Control"] = policy
+    return headers
+
+
+def conditional(request: Request, response: Response, route: str, tag: str) -> Optional[Response]:
+    """
+    A bodiless 304 if the client already has `tag`; otherwise None, with
+    the ETag and Cache-Control set on `response` for the full reply.
+    """
+    headers = cache_headers(tag, route)
+    if not_modified(request, tag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
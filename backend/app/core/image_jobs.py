@@ -0,0 +1,305 @@
+"""
+Queued AI image generation with local, content-addressed storage.
+
+POST /ai/image-jobs only enqueues; a small pool of workers on the event
+loop calls the image provider, downloads the result into upload storage
+and records it next to a JSON sidecar. The job id is the hash of (model,
+prompt, size), so:
+
+  * submitting the same prompt again returns the same job, already
+    completed if the file is on disk (served from /static, no upstream call);
+  * any worker process sharing the uploads directory can answer a poll
+    for a finished job, even one it did not run.
+
+A job belongs to the users who submitted it. Their ids are kept on the job
+and in the sidecar, and get() answers only those users. Someone else who
+sends the same prompt becomes an owner too and shares the work, but cannot
+look up a job they never submitted. Each job carries the generate callback
+it was submitted with, so a different provider or model takes effect on
+the next submission.
+
+Third-party URLs (SiliconFlow CDN links, Pollinations) expire; the local
+copy does not. Only raster formats are kept: the files are served from our
+own origin, and an SVG there could carry script. Downloads stop as soon as
+they pass AI_IMAGE_MAX_BYTES, and at most AI_IMAGE_QUEUE_SIZE jobs wait
+for a worker; submit() raises ImageQueueFull beyond that.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# generate(prompt, size) -> (remote or data: URL, revised prompt, source name)
+ImageFn = Callable[[str, str], Awaitable[tuple[str, Optional[str], str]]]
+
+_EXTENSIONS = {
+    "image/png": "png",
+    "image/jpeg": "jpg",
+    "image/webp": "webp",
+    "image/gif": "gif",
+}
+
+
+class ImageQueueFull(Exception):
+    """Raised by submit() when AI_IMAGE_QUEUE_SIZE jobs are already waiting."""
+
+
+class ImageJobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+@dataclass
+class ImageJob:
+    id: str
+    prompt: str
+    size: str
+    status: str = ImageJobStatus.QUEUED
+    url: Optional[str] = None
+    revised_prompt: Optional[str] = None
+    source: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    owners: set[int] = field(default_factory=set, repr=False)
+    generate: Optional[ImageFn] = field(default=None, repr=False)
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "url": self.url,
+            "revised_prompt": self.revised_prompt,
+            "source": self.source,
+            "error": self.error,
+        }
+
+
+def image_key(model: str, prompt: str, size: str) -> str:
+    payload = json.dumps([model, prompt, size], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _extension(content_type: str) -> str:
+    extension = _EXTENSIONS.get(content_type)
+    if extension is None:
+        raise ValueError(f"Unsupported image content type: {content_type or 'unknown'}")
+    return extension
+
+
+def _too_large(size: int) -> ValueError:
+    return ValueError(f"Image too large: {size} bytes (limit {settings.AI_IMAGE_MAX_BYTES})")
+
+
+async def fetch_image(url: str) -> tuple[bytes, str]:
+    """Image bytes and file extension for an http(s) or data: URL."""
+    limit = settings.AI_IMAGE_MAX_BYTES
+    if url.startswith("data:"):
+        header, _, data = url[5:].partition(",")
+        extension = _extension(header.split(";")[0])
+        body = base64.b64decode(data) if ";base64" in header else data.encode("utf-8")
+        if len(body) > limit:
+            raise _too_large(len(body))
+        return body, extension
+
+    async with httpx.AsyncClient(follow_redirects=True, timeout=settings.AI_IMAGE_DOWNLOAD_TIMEOUT) as http:
+        async with http.stream("GET", url) as response:
+            response.raise_for_status()
+            extension = _extension(response.headers.get("content-type", "").split(";")[0].strip())
+            declared = response.headers.get("content-length")
+            if declared and declared.isdigit() and int(declared) > limit:
+                raise _too_large(int(declared))
+            # Content-Length may be missing or wrong; count what actually arrives
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if len(body) > limit:
+                    raise _too_large(len(body))
+    return bytes(body), extension
+
+
+class ImageStore:
+    """Generated images on disk: <key>.<ext> plus <key>.json metadata."""
+
+    def __init__(self, directory: str, url_prefix: str):
+        self.directory = directory
+        self.url_prefix = url_prefix.rstrip("/")
+        self._lock = threading.Lock()
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    @staticmethod
+    def _write(path: str, data: bytes) -> None:
+        # Write to a temp name and rename so readers never see a partial file
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _write_meta(self, key: str, meta: dict) -> None:
+        self._write(self._meta_path(key), json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._meta_path(key), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not os.path.exists(os.path.join(self.directory, meta["file"])):
+            return None
+        return {**meta, "url": f"{self.url_prefix}/{meta['file']}"}
+
+    def put(
+        self, key: str, body: bytes, extension: str, revised_prompt: Optional[str], source: str, owners: set[int],
+    ) -> dict:
+        os.makedirs(self.directory, exist_ok=True)
+        file_name = f"{key}.{extension}"
+        meta = {"file": file_name, "revised_prompt": revised_prompt, "source": source, "owners": sorted(owners)}
+        # The sidecar goes last because its presence marks the image as done
+        self._write(os.path.join(self.directory, file_name), body)
+        with self._lock:
+            self._write_meta(key, meta)
+        return {**meta, "url": f"{self.url_prefix}/{file_name}"}
+
+    def add_owners(self, key: str, owners: set[int]) -> None:
+        """Record more owners of a stored image."""
+        with self._lock:
+            meta = self.get(key)
+            if meta is None or owners <= set(meta.get("owners", [])):
+                return
+            meta["owners"] = sorted(owners | set(meta.get("owners", [])))
+            self._write_meta(key, {k: v for k, v in meta.items() if k != "url"})
+
+
+class ImageJobQueue:
+    """Bounded worker pool draining an asyncio queue of image jobs."""
+
+    def __init__(self, store: Optional[ImageStore] = None, workers: Optional[int] = None):
+        self.store = store or ImageStore(settings.AI_IMAGE_DIR, settings.AI_IMAGE_URL_PREFIX)
+        self.workers = workers or settings.AI_IMAGE_WORKERS
+        self._jobs: dict[str, ImageJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_workers(self) -> asyncio.Queue:
+        """Start the pool lazily, once per event loop (like LLMProvider's client)."""
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            self._queue = asyncio.Queue(maxsize=settings.AI_IMAGE_QUEUE_SIZE)
+            self._loop = loop
+            self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+        return self._queue
+
+    async def _from_store(self, key: str, prompt: str, size: str) -> Optional[ImageJob]:
+        stored = await asyncio.to_thread(self.store.get, key)
+        if stored is None:
+            return None
+        job = ImageJob(
+            id=key, prompt=prompt, size=size, status=ImageJobStatus.COMPLETED,
+            url=stored["url"], revised_prompt=stored.get("revised_prompt"), source=stored.get("source"),
+            owners=set(stored.get("owners", [])),
+        )
+        job.done.set()
+        return job
+
+    async def _add_owner(self, job: ImageJob, user_id: int) -> None:
+        if user_id in job.owners:
+            return
+        job.owners.add(user_id)
+        if job.status == ImageJobStatus.COMPLETED:
+            await asyncio.to_thread(self.store.add_owners, job.id, {user_id})
+
+    async def submit(self, user_id: int, model: str, prompt: str, size: str, generate: ImageFn) -> ImageJob:
+        """Queue a job, or join the existing/finished one for the same prompt; raises ImageQueueFull."""
+        key = image_key(model, prompt, size)
+        job = self._jobs.get(key)
+        if job is None or job.status == ImageJobStatus.FAILED:
+            job = await self._from_store(key, prompt, size)
+            if job is None:
+                job = ImageJob(id=key, prompt=prompt, size=size, generate=generate)
+                try:
+                    self._ensure_workers().put_nowait(job)
+                except asyncio.QueueFull:
+                    raise ImageQueueFull(f"{self._queue.maxsize} image jobs already queued") from None
+            self._jobs[key] = job
+        await self._add_owner(job, user_id)
+        return job
+
+    async def get(self, job_id: str, user_id: int) -> Optional[ImageJob]:
+        """The job, if `user_id` submitted it."""
+        job = self._jobs.get(job_id) or await self._from_store(job_id, "", "")
+        return job if job is not None and user_id in job.owners else None
+
+    async def wait(self, job: ImageJob, timeout: Optional[float] = None) -> ImageJob:
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            job.status = ImageJobStatus.RUNNING
+            try:
+                remote_url, revised_prompt, source = await job.generate(job.prompt, job.size)
+                body, extension = await fetch_image(remote_url)
+                owners = set(job.owners)
+                stored = await asyncio.to_thread(
+                    self.store.put, job.id, body, extension, revised_prompt, source, owners,
+                )
+                job.url, job.revised_prompt, job.source = stored["url"], revised_prompt, source
+                job.status = ImageJobStatus.COMPLETED
+                if job.owners - owners:
+                    # Joined while the files were being written
+                    await asyncio.to_thread(self.store.add_owners, job.id, set(job.owners))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Image job {job.id[:12]} failed: {e}")
+                job.status, job.error = ImageJobStatus.FAILED, str(e)
+            finally:
+                job.finished_at = time.time()
+                job.done.set()
+                self._queue.task_done()
+            self._prune()
+
+    def _prune(self) -> None:
+        """Forget finished jobs beyond the retention limit (their files stay)."""
+        finished = [j for j in self._jobs.values() if j.finished_at is not None]
+        excess = len(finished) - settings.AI_IMAGE_JOB_RETENTION
+        if excess > 0:
+            for job in sorted(finished, key=lambda j: j.finished_at)[:excess]:
+                self._jobs.pop(job.id, None)
+
+    async def aclose(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._queue = None
+        self._loop = None
+
+
+_queue = ImageJobQueue()
+
+
+def get_image_job_queue() -> ImageJobQueue:
+    return _queue
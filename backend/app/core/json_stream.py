@@ -0,0 +1,79 @@
+"""
+Incremental JSON parsing for streamed model replies.
+
+Models answer generation prompts with objects like {"slides": [{...}, ...]}.
+JSONItemStream is fed raw text chunks as they arrive and reports each
+array element object the moment its closing brace is seen, so the client
+can render slide 1 while slide 5 is still being written. Text outside the
+JSON value (e.g. a ```json fence) is ignored; the complete reply is kept
+for the final parse.
+"""
+import json
+from typing import Any, Optional
+
+
+class JSONItemStream:
+    """
+    Emit (key, index, item) for every object that completes directly
+    inside a top-level array: either an array under a key of the root
+    object ({"ideas": [ {...} ]} -> key "ideas") or a root array
+    ([ {...} ] -> key None).
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._key: Optional[str] = None
+        self._item_start: Optional[int] = None
+        self._counts: dict[Optional[str], int] = {}
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    def feed(self, chunk: str) -> list[tuple[Optional[str], int, Any]]:
+        self._text += chunk
+        items = []
+        text = self._text
+        for pos in range(self._pos, len(text)):
+            ch = text[pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._stack == ["{"]:
+                        self._last_string = json.loads(text[self._string_start:pos + 1])
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = pos
+            elif ch == ":" and self._stack == ["{"]:
+                self._key = self._last_string
+            elif ch in "{[":
+                if ch == "{" and self._item_start is None and self._stack in (["{", "["], ["["]):
+                    self._item_start = pos
+                self._stack.append(ch)
+            elif ch in "}]" and self._stack:
+                self._stack.pop()
+                if ch == "}" and self._item_start is not None and self._stack in (["{", "["], ["["]):
+                    key = self._key if self._stack == ["{", "["] else None
+                    try:
+                        item = json.loads(text[self._item_start:pos + 1])
+                    except json.JSONDecodeError:
+                        item = None
+                    self._item_start = None
+                    if item is not None:
+                        index = self._counts.get(key, 0)
+                        self._counts[key] = index + 1
+                        items.append((key, index, item))
+        self._pos = len(text)
+        return items
@@ -0,0 +1,284 @@
+"""
+Async LLM provider layer shared by every AI endpoint.
+
+Each provider owns one AsyncOpenAI client backed by a pooled HTTP client,
+so slow DeepSeek / ModelScope / SiliconFlow calls yield the event loop
+instead of blocking it. A semaphore bounds the number of in-flight
+upstream requests per provider and every call carries its own timeout.
+Each call's latency, token usage and outcome are recorded in ai_metrics
+under the calling endpoint's name.
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Optional
+
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from app.core.ai_metrics import get_ai_metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def extract_json(content: str) -> Any:
+    """Parse a model reply as JSON, tolerating a ```json fenced block."""
+    if "```json" in content:
+        content = content.split("```json")[1].split("```")[0].strip()
+    return json.loads(content)
+
+
+class LLMProvider:
+    """An OpenAI-compatible upstream (chat or image model) with bounded concurrency."""
+
+    def __init__(
+        self,
+        name: str,
+        api_key: str,
+        base_url: str,
+        model: str,
+        *,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        self.name = name
+        self.api_key = api_key
+        self.base_url = base_url
+        self.model = model
+        self.timeout = timeout if timeout is not None else settings.AI_REQUEST_TIMEOUT
+        self.max_concurrency = max_concurrency or settings.AI_MAX_CONCURRENCY
+        self._client: Optional[AsyncOpenAI] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _build_client(self) -> AsyncOpenAI:
+        return AsyncOpenAI(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            timeout=self.timeout,
+            max_retries=settings.AI_MAX_RETRIES,
+            http_client=DefaultAsyncHttpxClient(),
+        )
+
+    def _ensure_client(self) -> AsyncOpenAI:
+        """
+        Build the client and semaphore lazily, once per event loop.
+        Construction is deferred so a missing API key surfaces as a call
+        error inside the endpoint (and its fallback) rather than at import.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = self._build_client()
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._client
+
+    async def complete(
+        self,
+        messages: list[dict],
+        *,
+        json_mode: bool = True,
+        timeout: Optional[float] = None,
+        endpoint: str = "other",
+    ) -> str:
+        """Run one chat completion and return the raw message content."""
+        client = self._ensure_client()
+        extra: dict[str, Any] = {}
+        if json_mode:
+            extra["response_format"] = {"type": "json_object"}
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                completion = await client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    timeout=timeout if timeout is not None else self.timeout,
+                    **extra,
+                )
+            except Exception as e:
+                self._record(endpoint, started, error=e)
+                raise
+        self._record(endpoint, started, usage=getattr(completion, "usage", None))
+        return completion.choices[0].message.content
+
+    def _record(self, endpoint: str, started: float, *, usage: Any = None, error: Optional[BaseException] = None) -> None:
+        get_ai_metrics().record_call(
+            self.name, self.model, endpoint, time.perf_counter() - started, usage=usage, error=error
+        )
+
+    async def chat_json(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        timeout: Optional[float] = None,
+        endpoint: str = "other",
+    ) -> Any:
+        """Send a system + user prompt pair and parse the JSON reply."""
+        content = await self.complete(
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            timeout=timeout,
+            endpoint=endpoint,
+        )
+        return extract_json(content)
+
+    async def stream(
+        self,
+        messages: list[dict],
+        *,
+        json_mode: bool = True,
+        timeout: Optional[float] = None,
+        endpoint: str = "other",
+    ) -> AsyncIterator[str]:
+        """
+        Run one streamed chat completion, yielding content deltas as they
+        arrive. Latency is recorded when the stream ends; usage only if
+        the upstream sends it on a chunk.
+        """
+        client = self._ensure_client()
+        extra: dict[str, Any] = {}
+        if json_mode:
+            extra["response_format"] = {"type": "json_object"}
+        async with self._semaphore:
+            started = time.perf_counter()
+            usage, error = None, None
+            try:
+                response = await client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    stream=True,
+                    timeout=timeout if timeout is not None else self.timeout,
+                    **extra,
+                )
+                try:
+                    async for chunk in response:
+                        usage = getattr(chunk, "usage", None) or usage
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            yield chunk.choices[0].delta.content
+                finally:
+                    await response.close()
+            except BaseException as e:
+                # Includes the client disconnecting (CancelledError) and the
+                # consumer dropping the generator (GeneratorExit): an aborted
+                # stream is not a successful call
+                error = e
+                raise
+            finally:
+                self._record(endpoint, started, usage=usage, error=error)
+
+    def stream_chat(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        timeout: Optional[float] = None,
+        endpoint: str = "other",
+    ) -> AsyncIterator[str]:
+        """Streamed counterpart of chat_json: yields raw reply text chunks."""
+        return self.stream(
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            timeout=timeout,
+            endpoint=endpoint,
+        )
+
+    async def generate_image(
+        self,
+        prompt: str,
+        *,
+        size: str = "1024x1024",
+        timeout: Optional[float] = None,
+        endpoint: str = "generate_image",
+    ):
+        """Generate one image; returns the first result item or None."""
+        client = self._ensure_client()
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.images.generate(
+                    model=self.model,
+                    prompt=prompt,
+                    size=size,
+                    n=1,
+                    timeout=timeout if timeout is not None else self.timeout,
+                )
+            except Exception as e:
+                self._record(endpoint, started, error=e)
+                raise
+        self._record(endpoint, started)
+        return response.data[0] if response.data else None
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client."""
+        client, self._client = self._client, None
+        self._semaphore = None
+        self._loop = None
+        if client is not None:
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning(f"Error closing AI client {self.name}: {e}")
+
+
+# ---------------------------------------------------------------------------
+# Provider registry — one shared instance per role
+# ---------------------------------------------------------------------------
+
+_providers: dict[str, LLMProvider] = {}
+
+
+def get_chat_provider() -> LLMProvider:
+    """Return the text model provider (DeepSeek, ModelScope, or the offline fake)."""
+    provider = _providers.get("chat")
+    if provider is None:
+        if settings.AI_PROVIDER == "fake":
+            from app.core.fake_llm import FakeLLMProvider
+            provider = FakeLLMProvider("fake", "fake-chat")
+        elif settings.USE_DEEPSEEK:
+            provider = LLMProvider(
+                "deepseek",
+                settings.DEEPSEEK_API_KEY,
+                settings.DEEPSEEK_BASE_URL,
+                settings.DEEPSEEK_MODEL_NAME,
+            )
+        else:
+            provider = LLMProvider(
+                "modelscope",
+                settings.MODELSCOPE_API_KEY,
+                settings.MODELSCOPE_BASE_URL,
+                settings.MODELSCOPE_MODEL_NAME,
+            )
+        logger.info(f"Using {provider.name} AI: {provider.model}")
+        _providers["chat"] = provider
+    return provider
+
+
+def get_image_provider() -> LLMProvider:
+    """Return the image model provider (SiliconFlow, or the offline fake)."""
+    provider = _providers.get("image")
+    if provider is None:
+        if settings.AI_PROVIDER == "fake":
+            from app.core.fake_llm import FakeLLMProvider
+            provider = FakeLLMProvider("fake", "fake-image")
+        else:
+            provider = LLMProvider(
+                "siliconflow",
+                settings.SILICONFLOW_API_KEY,
+                settings.SILICONFLOW_BASE_URL,
+                settings.SILICONFLOW_IMAGE_MODEL,
+            )
+        _providers["image"] = provider
+    return provider
+
+
+async def close_providers() -> None:
+    """Close every provider's HTTP pool (called on app shutdown)."""
+    for provider in list(_providers.values()):
+        await provider.aclose()
+    _providers.clear()
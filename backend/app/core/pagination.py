@@ -0,0 +1,98 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+A Keyset names a list's sort order, e.g. (created_at, id) descending, with
+the primary key last as a tie-breaker. A page is fetched with
+`WHERE (created_at, id) < (:last_created_at, :last_id)` followed by the
+same ORDER BY. Backed by an index on the sort columns, every page costs
+the same, however deep it is. Rows inserted while a client scrolls do not
+shift later pages the way OFFSET does.
+
+The cursor is opaque to clients: URL-safe base64 of the keyset name and
+the last row's sort values. Endpoints keep their list response bodies and
+return the next page's cursor in the X-Next-Cursor header whenever the
+page is full. `offset` still works when no cursor is sent.
+"""
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass(frozen=True)
+class Keyset:
+    name: str
+    columns: tuple  # model attributes, primary key last
+    descending: bool = True
+
+    def order_by(self) -> list:
+        return [c.desc() if self.descending else c.asc() for c in self.columns]
+
+    def encode(self, row) -> str:
+        values = [getattr(row, c.key) for c in self.columns]
+        payload = [self.name] + [v.isoformat() if isinstance(v, datetime) else v for v in values]
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+    def decode(self, cursor: str) -> list:
+        """Sort values in `cursor`; ValueError if it is malformed or from another keyset."""
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        except (ValueError, TypeError) as e:
+            raise ValueError("malformed cursor") from e
+        if not isinstance(payload, list) or payload[:1] != [self.name] or len(payload) != len(self.columns) + 1:
+            raise ValueError("cursor does not match this list's sort order")
+        return [_coerce(column, value) for column, value in zip(self.columns, payload[1:])]
+
+    def after(self, cursor: str):
+        """WHERE clause selecting the rows that sort after `cursor`."""
+        row, bound = tuple_(*self.columns), tuple_(*self.decode(cursor))
+        return row < bound if self.descending else row > bound
+
+
+def _coerce(column, value):
+    """`value` from a cursor as the Python type of `column`; ValueError if it cannot be one."""
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        if not isinstance(value, str):
+            raise ValueError(f"{column.key} must be a timestamp")
+        try:
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{column.key} must be a timestamp") from e
+    # JSON gives bool/int/float/str; bool is an int subclass, so check it first
+    if python_type is bool:
+        ok = isinstance(value, bool)
+    elif python_type is float:
+        ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+    else:
+        ok = isinstance(value, python_type) and not isinstance(value, bool)
+    if not ok:
+        raise ValueError(f"{column.key} must be of type {python_type.__name__}")
+    return python_type(value)
+
+
+def paginate(query, keyset: Keyset, cursor: Optional[str], offset: int, limit: int):
+    """`query` ordered by `keyset` and limited to one page, from `cursor` if given else `offset`."""
+    query = query.order_by(*keyset.order_by())
+    if cursor:
+        try:
+            query = query.where(keyset.after(cursor))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+    elif offset:
+        query = query.offset(offset)
+    return query.limit(limit)
+
+
+def set_next_cursor(response: Response, keyset: Keyset, rows: list, limit: int) -> None:
+    """Advertise the cursor after the last row when the page is full (there may be more)."""
+    if rows and len(rows) >= limit:
+        response.headers[NEXT_CURSOR_HEADER] = keyset.encode(rows[-1])
@@ -0,0 +1,247 @@
+"""
+Incrementally maintained skill / MBTI histograms of each hackathon's
+participants, behind POST /ai/community-insights.
+
+The endpoint used to load every enrolled user and re-split their skills
+on each call. Now participant_histogram holds one (kind, value, count)
+row per skill and MBTI type, and participant_stats the head count. The
+enrollment and profile endpoints apply each change as a delta inside the
+transaction that makes it. Reading the statistics is a few small indexed
+queries whose size does not grow with the number of participants.
+
+A hackathon's histogram is built from its enrollments on first read (no
+participant_stats row yet). Until then the hooks are no-ops, so
+hackathons nobody asks about cost nothing. A join that commits while that
+first build is scanning finds no row to update and is missed by the scan,
+so every read also compares the head count with an indexed COUNT of the
+enrollments and rebuilds when they disagree.
+
+The AI summary is stored next to the counts together with the snapshot
+it was written from, and reused until material_change() says the pool
+has moved enough to be worth another LLM call.
+"""
+import json
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, func, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.enrollment import Enrollment
+from app.models.participant_stats import ParticipantHistogram, ParticipantStats
+from app.models.user import User
+
+SKILL = "skill"
+MBTI = "mbti"
+TOP_SKILLS = 15
+
+
+def parse_skills(skills: Optional[str]) -> list[str]:
+    """Distinct skills of a profile, stored either as a JSON list or comma-separated."""
+    if not skills:
+        return []
+    try:
+        parsed = json.loads(skills)
+    except ValueError:
+        parsed = None
+    items = parsed if isinstance(parsed, list) else skills.split(",")
+    out = []
+    for item in items:
+        item = str(item).strip()
+        if item and item not in out:
+            out.append(item)
+    return out
+
+
+def contribution(skills: Optional[str], personality: Optional[str]) -> Counter:
+    """Histogram entries one participant adds: each skill once, plus their MBTI type."""
+    counts = Counter((SKILL, skill) for skill in parse_skills(skills))
+    if personality and len(personality.strip()) == 4:
+        counts[(MBTI, personality.strip().upper())] += 1
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# Incremental updates (called before the endpoint's commit)
+# ---------------------------------------------------------------------------
+
+def _apply(session: Session, hackathon_id: int, delta: dict, participants: int) -> None:
+    result = session.exec(
+        update(ParticipantStats)
+        .where(ParticipantStats.hackathon_id == hackathon_id)
+        .values(participants=ParticipantStats.participants + participants, updated_at=datetime.utcnow())
+    )
+    if not result.rowcount:
+        return  # not built yet; the first read builds it from committed data
+
+    emptied = []
+    for (kind, value), d in delta.items():
+        if not d:
+            continue
+        key = (
+            ParticipantHistogram.hackathon_id == hackathon_id,
+            ParticipantHistogram.kind == kind,
+            ParticipantHistogram.value == value,
+        )
+        increment = update(ParticipantHistogram).where(*key).values(count=ParticipantHistogram.count + d)
+        if session.exec(increment).rowcount:
+            if d < 0:
+                emptied.append(value)
+            continue
+        if d < 0:
+            continue
+        try:
+            with session.begin_nested():
+                session.add(ParticipantHistogram(hackathon_id=hackathon_id, kind=kind, value=value, count=d))
+        except IntegrityError:
+            # Another request inserted the row in the meantime
+            session.exec(increment)
+
+    if emptied:
+        session.exec(
+            delete(ParticipantHistogram).where(
+                ParticipantHistogram.hackathon_id == hackathon_id,
+                ParticipantHistogram.value.in_(emptied),
+                ParticipantHistogram.count <= 0,
+            )
+        )
+
+
+def record_join(session: Session, hackathon_id: int, user: User) -> None:
+    _apply(session, hackathon_id, contribution(user.skills, user.personality), 1)
+
+
+def record_leave(session: Session, hackathon_id: int, user: User) -> None:
+    counts = contribution(user.skills, user.personality)
+    _apply(session, hackathon_id, {k: -n for k, n in counts.items()}, -1)
+
+
+def record_profile_change(session: Session, user: User, before: Counter) -> None:
+    """Move `user` from their old entries (`before`) to the current ones in every hackathon they joined."""
+    after = contribution(user.skills, user.personality)
+    delta = {k: after[k] - before[k] for k in before.keys() | after.keys() if after[k] != before[k]}
+    if not delta:
+        return
+    hackathon_ids = session.exec(select(Enrollment.hackathon_id).where(Enrollment.user_id == user.id)).all()
+    for hackathon_id in hackathon_ids:
+        _apply(session, hackathon_id, delta, 0)
+
+
+# ---------------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------------
+
+def rebuild(session: Session, hackathon_id: int) -> None:
+    """Recount a hackathon's histogram from its enrollments and commit."""
+    rows = session.exec(
+        select(User.skills, User.personality)
+        .join(Enrollment, Enrollment.user_id == User.id)
+        .where(Enrollment.hackathon_id == hackathon_id)
+    ).all()
+    counts = Counter()
+    for skills, personality in rows:
+        counts.update(contribution(skills, personality))
+
+    session.exec(delete(ParticipantHistogram).where(ParticipantHistogram.hackathon_id == hackathon_id))
+    session.add_all(
+        ParticipantHistogram(hackathon_id=hackathon_id, kind=kind, value=value, count=n)
+        for (kind, value), n in counts.items()
+    )
+    stats = session.get(ParticipantStats, hackathon_id) or ParticipantStats(hackathon_id=hackathon_id)
+    stats.participants = len(rows)
+    stats.updated_at = datetime.utcnow()
+    session.add(stats)
+    try:
+        session.commit()
+    except IntegrityError:
+        # A concurrent first read built it; use theirs
+        session.rollback()
+
+
+def _enrolled(session: Session, hackathon_id: int) -> int:
+    return session.exec(
+        select(func.count()).select_from(Enrollment).where(Enrollment.hackathon_id == hackathon_id)
+    ).one()
+
+
+def read(session: Session, hackathon_id: int) -> dict:
+    """Participant count, top skills and MBTI distribution of a hackathon."""
+    stats = session.get(ParticipantStats, hackathon_id)
+    if stats is None or stats.participants != _enrolled(session, hackathon_id):
+        rebuild(session, hackathon_id)
+        stats = session.get(ParticipantStats, hackathon_id, populate_existing=True)
+
+    def histogram(kind: str, limit: Optional[int] = None) -> dict[str, int]:
+        query = (
+            select(ParticipantHistogram.value, ParticipantHistogram.count)
+            .where(
+                ParticipantHistogram.hackathon_id == hackathon_id,
+                ParticipantHistogram.kind == kind,
+                ParticipantHistogram.count > 0,
+            )
+            .order_by(ParticipantHistogram.count.desc(), ParticipantHistogram.value)
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        return dict(session.exec(query).all())
+
+    return {
+        "participants": stats.participants if stats else 0,
+        "skill_distribution": histogram(SKILL, TOP_SKILLS),
+        "mbti_distribution": histogram(MBTI),  # at most 16 types
+    }
+
+
+# ---------------------------------------------------------------------------
+# Cached AI summary
+# ---------------------------------------------------------------------------
+
+def _distance(a: dict[str, int], b: dict[str, int]) -> float:
+    """Total variation distance between two count histograms (0 = same shape, 1 = disjoint)."""
+    total_a, total_b = sum(a.values()), sum(b.values())
+    if not total_a or not total_b:
+        return 0.0 if total_a == total_b else 1.0
+    return sum(abs(a.get(k, 0) / total_a - b.get(k, 0) / total_b) for k in a.keys() | b.keys()) / 2
+
+
+def material_change(basis: dict, current: dict, threshold: Optional[float] = None) -> bool:
+    """Whether the pool moved by at least `threshold` (AI_INSIGHTS_MATERIAL_CHANGE) since `basis`."""
+    if threshold is None:
+        threshold = settings.AI_INSIGHTS_MATERIAL_CHANGE
+    before, now = basis.get("participants", 0), current["participants"]
+    if abs(now - before) / max(before, 1) >= threshold:
+        return True
+    return any(
+        _distance(basis.get(kind, {}), current[kind]) >= threshold
+        for kind in ("skill_distribution", "mbti_distribution")
+    )
+
+
+def cached_summary(session: Session, hackathon_id: int, current: dict) -> Optional[dict]:
+    """The stored AI summary, unless the pool has changed materially since it was written."""
+    stats = session.get(ParticipantStats, hackathon_id)
+    if stats is None or not stats.summary or not stats.summary_basis:
+        return None
+    try:
+        summary, basis = json.loads(stats.summary), json.loads(stats.summary_basis)
+    except ValueError:
+        return None
+    if material_change(basis, current):
+        return None
+    return summary
+
+
+def store_summary(session: Session, hackathon_id: int, summary: dict, basis: dict) -> None:
+    session.exec(
+        update(ParticipantStats)
+        .where(ParticipantStats.hackathon_id == hackathon_id)
+        .values(
+            summary=json.dumps(summary, ensure_ascii=False),
+            summary_basis=json.dumps(basis, ensure_ascii=False),
+            summary_at=datetime.utcnow(),
+        )
+    )
+    session.commit()
@@ -0,0 +1,58 @@
+"""
+Prize summary denormalized onto the hackathon row.
+
+The hackathon list shows each hackathon's cash prize pool and whether it
+also offers non-cash awards, and can be sorted by the pool. Both values
+are kept on the row (hackathon.total_cash_prize, has_non_cash_prizes),
+so listing never reads the prize table or parses awards_sublist JSON.
+
+The prize create/update/delete handlers and section deletion (which
+cascades to its prizes) call refresh_prize_summary() before their commit.
+It recomputes from the hackathon's current prizes instead of applying a
+delta, so an edit can never leave the summary drifting. Call it after
+bump_doc_version(). That UPDATE locks the hackathon row, so a concurrent
+prize write on the same hackathon waits and then sees this one.
+
+Only prizes whose section still exists are counted (the join on section).
+Deleting a section relies on the database's ON DELETE CASCADE to remove
+its prizes. With SQLITE_FOREIGN_KEYS off the prize rows stay behind,
+and they are no longer shown anywhere on the hackathon page either.
+"""
+import json
+from typing import Optional
+
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+from app.models.hackathon import Hackathon
+from app.models.prize import Prize
+from app.models.section import Section
+
+
+def has_non_cash_awards(awards_sublist: Optional[str]) -> bool:
+    """Whether a prize's awards_sublist JSON lists anything but cash."""
+    try:
+        sublist = json.loads(awards_sublist) if awards_sublist else []
+    except (json.JSONDecodeError, TypeError):
+        return False
+    if not isinstance(sublist, list):
+        return False
+    return any(item.get("type") != "cash" for item in sublist if isinstance(item, dict))
+
+
+def refresh_prize_summary(session: Session, hackathon_id: int) -> None:
+    """Recompute a hackathon's prize summary from its prizes; call before the endpoint's commit."""
+    session.flush()
+    prizes = session.exec(
+        select(Prize.total_cash_amount, Prize.awards_sublist)
+        .join(Section, Section.id == Prize.section_id)
+        .where(Prize.hackathon_id == hackathon_id)
+    ).all()
+    session.exec(
+        update(Hackathon)
+        .where(Hackathon.id == hackathon_id)
+        .values(
+            total_cash_prize=sum(float(amount or 0) for amount, _ in prizes),
+            has_non_cash_prizes=any(has_non_cash_awards(sublist) for _, sublist in prizes),
+        )
+    )
@@ -0,0 +1,131 @@
+"""
+Fit lists of records (users, hackathons) into a prompt token budget.
+
+Endpoints used to cut their payloads with fixed slices ([:30], [:50]),
+which ignores how long each record is: thirty one-line profiles waste
+the context, thirty essay-length bios overflow it. pack_records instead
+estimates the token cost of each serialized record and degrades the
+payload in steps until it fits:
+
+  0. every record as-is (empty fields removed)
+  1..n. long text fields cut to successively shorter lengths
+  last. low-value fields dropped entirely
+
+and only if even the leanest form does not fit, sends fewer records —
+the leading ones for a ranked list, an evenly spaced sample otherwise so
+the model still sees the whole pool's spread.
+
+Token counts are estimated (about 4 characters per token for Latin text,
+one per CJK character), which is close enough to size a budget without a
+tokenizer dependency.
+"""
+import json
+import math
+import re
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence
+
+from app.core.config import settings
+
+_CJK = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯＀-￯]")
+
+
+def estimate_tokens(text: str) -> int:
+    cjk = len(_CJK.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def value_tokens(value: Any) -> int:
+    """Estimated tokens of `value` serialized the way prompts embed it."""
+    return estimate_tokens(json.dumps(value, ensure_ascii=False))
+
+
+def prompt_budget(model: str) -> int:
+    """Token budget for packed prompt data, per model (AI_PROMPT_TOKEN_BUDGETS) or the default."""
+    return settings.AI_PROMPT_TOKEN_BUDGETS.get(model, settings.AI_PROMPT_TOKEN_BUDGET)
+
+
+@dataclass
+class PackResult:
+    records: list[dict]
+    total: int  # records offered
+    tokens: int  # estimated tokens of json.dumps(records)
+    level: int  # 0 = untouched; higher = more abbreviated
+
+    @property
+    def omitted(self) -> int:
+        return self.total - len(self.records)
+
+
+def _shorten(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit].rstrip() + "…"
+
+
+def _degrade(record: dict, caps: dict[str, int], drop: Sequence[str]) -> dict:
+    out = {}
+    for key, value in record.items():
+        if value is None or value == "" or value == [] or key in drop:
+            continue
+        if key in caps and isinstance(value, str):
+            value = _shorten(value, caps[key])
+        out[key] = value
+    return out
+
+
+def _spread(n: int, total: int) -> list[int]:
+    """n indices spread evenly over range(total), first and last included."""
+    if n >= total:
+        return list(range(total))
+    if n == 1:
+        return [0]
+    return sorted({round(i * (total - 1) / (n - 1)) for i in range(n)})
+
+
+def pack_records(
+    records: Sequence[dict],
+    budget: int,
+    *,
+    abbreviate: Optional[dict[str, Sequence[int]]] = None,
+    drop: Sequence[str] = (),
+    ranked: bool = True,
+) -> PackResult:
+    """
+    Fit `records` into `budget` estimated tokens.
+
+    abbreviate  field -> decreasing character caps, applied one step per level
+    drop        fields removed at the last level
+    ranked      records are in relevance order (keep a prefix) rather than
+                an unordered pool (keep an evenly spaced sample)
+    """
+    abbreviate = abbreviate or {}
+    steps = max((len(caps) for caps in abbreviate.values()), default=0)
+    levels = [({}, ())]
+    for step in range(steps):
+        levels.append(({f: caps[min(step, len(caps) - 1)] for f, caps in abbreviate.items()}, ()))
+    if drop:
+        levels.append((levels[-1][0], tuple(drop)))
+
+    for level, (caps, dropped) in enumerate(levels):
+        packed = [_degrade(r, caps, dropped) for r in records]
+        costs = [value_tokens(r) + 1 for r in packed]  # +1 for the separator
+        if sum(costs) + 1 <= budget:
+            return PackResult(packed, len(records), sum(costs) + 1, level)
+
+    # Even the leanest form is too big: send as many records as fit
+    if ranked:
+        chosen, used = [], 1
+        for record, cost in zip(packed, costs):
+            if used + cost > budget:
+                break
+            chosen.append(record)
+            used += cost
+        return PackResult(chosen, len(records), used, level)
+
+    n = max(1, min(len(packed), int((budget - 1) / (sum(costs) / len(costs)))))
+    while n > 0:
+        indices = _spread(n, len(packed))
+        used = 1 + sum(costs[i] for i in indices)
+        if used <= budget:
+            return PackResult([packed[i] for i in indices], len(records), used, level)
+        n -= 1
+    return PackResult([], len(records), 1, level)
@@ -0,0 +1,98 @@
+"""
+Per-request SQL statement counts and N+1 detection.
+
+A listener on every Engine (sync engines and the sync side of the async
+ones) times each statement and, while a request is being tracked, adds it
+to that request's QueryStats: statement count, total time in the driver
+and a count per statement shape (the SQL text with IN-lists collapsed,
+bound values are already placeholders). A shape repeated
+DB_N_PLUS_ONE_THRESHOLD or more times in one request is a probable N+1:
+the same lookup issued once per row of an earlier result.
+
+With DB_QUERY_STATS on, the middleware in app.main tracks every request,
+returns the totals in X-DB-Queries / X-DB-Time (ms) headers, names the
+worst repeated shape in X-DB-N-Plus-One and logs it. Off, the listener
+costs a context variable lookup per statement.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger("uvicorn")
+
+_IN_LIST = re.compile(r"\((?:\?|%\(\w+\)s|\$\d+)(?:\s*,\s*(?:\?|%\(\w+\)s|\$\d+))+\)")
+_SPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """SQL text with whitespace normalized and IN (?, ?, ...) lists collapsed to IN (?)."""
+    return _IN_LIST.sub("(?)", _SPACE.sub(" ", statement).strip())
+
+
+class QueryStats:
+    """Statements run while handling one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: Optional[int] = None) -> list[tuple[str, int]]:
+        """Shapes issued at least `threshold` times, most repeated first."""
+        if threshold is None:
+            threshold = settings.DB_N_PLUS_ONE_THRESHOLD
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Count the statements run in this context (and threads/tasks started from it)."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context._query_stats_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    start = getattr(context, "_query_stats_start", None)
+    if stats is None or start is None:
+        return
+    stats.record(statement, time.perf_counter() - start)
+
+
+def add_headers(request, response, stats: QueryStats) -> None:
+    response.headers["X-DB-Queries"] = str(stats.count)
+    response.headers["X-DB-Time"] = f"{stats.seconds * 1000:.1f}"
+    repeated = stats.repeated()
+    if repeated:
+        shape, n = repeated[0]
+        response.headers["X-DB-N-Plus-One"] = f"{n}x {shape[:200]}"
+        for shape, n in repeated:
+            logger.warning(f"Probable N+1 in {request.method} {request.url.path}: {n}x {shape}")
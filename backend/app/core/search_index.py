@@ -0,0 +1,161 @@
+"""
+In-process BM25 index over active hackathons for /ai/search-hackathons.
+
+Documents are built from title, description, tags and province/city.
+Latin text is split into lower-cased words; CJK runs are split into
+overlapping bigrams (plus the single character for 1-char runs), which
+is the usual dictionary-free approach for Chinese retrieval.
+
+The index holds only published/ongoing hackathons. It is built lazily on
+first search and then kept current by the hackathon create/update/delete
+endpoints; a TTL rebuild picks up changes made by other worker processes.
+"""
+import json
+import math
+import re
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.hackathon import Hackathon, HackathonStatus
+
+SEARCHABLE_STATUSES = (HackathonStatus.PUBLISHED, HackathonStatus.ONGOING)
+
+# Title terms count this many times, so a title hit outranks a passing
+# mention deep in the description.
+TITLE_BOOST = 3
+
+_TOKEN = re.compile(r"[a-z0-9]+|[一-鿿]+")
+
+
+def tokenize(text: Optional[str]) -> list[str]:
+    """Lower-cased Latin words and CJK bigrams."""
+    if not text:
+        return []
+    tokens = []
+    for run in _TOKEN.findall(text.lower()):
+        if "一" <= run[0] <= "鿿":
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def _document_terms(h: Hackathon) -> list[str]:
+    try:
+        tags = json.loads(h.tags) if h.tags else []
+    except (json.JSONDecodeError, TypeError):
+        tags = []
+    terms = tokenize(h.title) * TITLE_BOOST
+    terms += tokenize(h.description)
+    terms += tokenize(" ".join(str(t) for t in tags))
+    terms += tokenize(" ".join(p for p in (h.province, h.city) if p))
+    return terms
+
+
+class BM25Index:
+    """Okapi BM25 over an inverted index that supports single-doc updates."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, ttl: float = 600.0):
+        self.k1 = k1
+        self.b = b
+        self.ttl = ttl
+        self._postings: dict[str, dict[int, int]] = {}
+        self._doc_len: dict[int, int] = {}
+        self._doc_terms: dict[int, tuple[str, ...]] = {}
+        self._total_len = 0
+        self._built_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._doc_len)
+
+    # -- maintenance ---------------------------------------------------------
+
+    def _remove_locked(self, doc_id: int) -> None:
+        length = self._doc_len.pop(doc_id, None)
+        if length is None:
+            return
+        self._total_len -= length
+        for term in self._doc_terms.pop(doc_id):
+            docs = self._postings[term]
+            del docs[doc_id]
+            if not docs:
+                del self._postings[term]
+
+    def _add_locked(self, doc_id: int, terms: list[str]) -> None:
+        self._doc_len[doc_id] = len(terms)
+        self._total_len += len(terms)
+        counts = Counter(terms)
+        self._doc_terms[doc_id] = tuple(counts)
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+
+    def upsert(self, hackathon: Hackathon) -> None:
+        """Index (or re-index) one hackathon; inactive ones are dropped."""
+        with self._lock:
+            if self._built_at is None:
+                return  # not built yet; the first search loads everything
+            self._remove_locked(hackathon.id)
+            if hackathon.status in SEARCHABLE_STATUSES:
+                self._add_locked(hackathon.id, _document_terms(hackathon))
+
+    def remove(self, hackathon_id: int) -> None:
+        with self._lock:
+            self._remove_locked(hackathon_id)
+
+    def rebuild(self, session: Session) -> None:
+        hackathons = session.exec(
+            select(Hackathon).where(Hackathon.status.in_(SEARCHABLE_STATUSES))
+        ).all()
+        docs = [(h.id, _document_terms(h)) for h in hackathons]
+        with self._lock:
+            self._postings.clear()
+            self._doc_len.clear()
+            self._doc_terms.clear()
+            self._total_len = 0
+            for doc_id, terms in docs:
+                self._add_locked(doc_id, terms)
+            self._built_at = time.monotonic()
+
+    def ensure_built(self, session: Session) -> None:
+        if self._built_at is None or time.monotonic() - self._built_at >= self.ttl:
+            self.rebuild(session)
+
+    # -- querying ------------------------------------------------------------
+
+    def search(self, query: str, limit: int = 20) -> list[tuple[int, float, list[str]]]:
+        """Top `limit` (hackathon_id, score, matched_terms), best first."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            n = len(self._doc_len)
+            if not terms or n == 0:
+                return []
+            avgdl = self._total_len / n or 1.0
+            scores: dict[int, float] = {}
+            matched: dict[int, list[str]] = {}
+            for term in terms:
+                docs = self._postings.get(term)
+                if not docs:
+                    continue
+                idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+                for doc_id, tf in docs.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_len[doc_id] / avgdl)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+                    matched.setdefault(doc_id, []).append(term)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [(doc_id, score, matched[doc_id]) for doc_id, score in ranked]
+
+
+_index = BM25Index(ttl=settings.SEARCH_INDEX_TTL)
+
+
+def get_hackathon_search_index() -> BM25Index:
+    return _index
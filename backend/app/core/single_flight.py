@@ -0,0 +1,71 @@
+"""
+Single-flight coalescing for identical in-flight AI calls.
+
+When many users ask the same question at the same moment (e.g. everyone
+opening /ai/community-insights for a hackathon that just went live), only
+the first caller starts an upstream call; everyone else with the same key
+awaits that shared task. The task runs detached from the caller that
+started it, so a client disconnect does not cancel the answer the others
+are waiting on. Counters record how many upstream calls were saved.
+"""
+import asyncio
+import copy
+from collections import defaultdict
+from typing import Any, Awaitable, Callable
+
+
+class SingleFlight:
+    """Coalesce concurrent awaits of the same key onto one shared task."""
+
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._counters: dict[str, dict[str, int]] = defaultdict(
+            lambda: {"upstream_calls": 0, "coalesced": 0}
+        )
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        namespace: str = "default",
+    ) -> Any:
+        """
+        Run `fn()` unless a call for `key` is already in flight, in which
+        case wait for that one. Every caller gets its own deep copy of the
+        result; an upstream exception is raised to every caller.
+        """
+        task = self._inflight.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self._counters[namespace]["coalesced"] += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._forget(key, t))
+            self._counters[namespace]["upstream_calls"] += 1
+        # shield: one waiter being cancelled must not cancel the shared call
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every waiter went away
+
+    def stats(self) -> dict:
+        """Upstream vs. coalesced call counts per namespace."""
+        namespaces = {}
+        for name, c in self._counters.items():
+            requests = c["upstream_calls"] + c["coalesced"]
+            namespaces[name] = {
+                **c,
+                "saved_ratio": round(c["coalesced"] / requests, 4) if requests else 0.0,
+            }
+        return {"in_flight": len(self._inflight), "namespaces": namespaces}
+
+
+_single_flight = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    return _single_flight
@@ -0,0 +1,322 @@
+"""
+Packed skill vectors and per-hackathon candidate matrices for team matching.
+
+Each user's skills / interests / personality are hashed into a fixed-size
+float32 vector (stored packed in User.skills_vector). The layout is three
+independently L2-normalised blocks:
+
+    [ skills (128) | interests (64) | personality (8) ]
+
+Team matching keeps one NumPy matrix per hackathon (rows = enrolled users)
+and scores every candidate against the requester in a few matrix-vector
+products, so only the top-K candidates are sent to the LLM. Matrices are
+built lazily on first use and then kept current by the enrollment and
+profile endpoints (add / remove / update a single row).
+"""
+import hashlib
+import logging
+import re
+import threading
+import time
+from typing import Iterable, Optional
+
+import numpy as np
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.enrollment import Enrollment
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+SKILL_DIM = 128
+INTEREST_DIM = 64
+PERSONALITY_DIM = 8
+VECTOR_DIM = SKILL_DIM + INTEREST_DIM + PERSONALITY_DIM
+
+_SKILLS = slice(0, SKILL_DIM)
+_INTERESTS = slice(SKILL_DIM, SKILL_DIM + INTEREST_DIM)
+_PERSONALITY = slice(SKILL_DIM + INTEREST_DIM, VECTOR_DIM)
+
+# Score = weighted sum of: fit with the free-text requirements, how much
+# the candidate's skills differ from the requester's (complementarity),
+# shared interests, and differing MBTI letters.
+WEIGHTS = {"requirements": 0.45, "complement": 0.3, "interests": 0.15, "personality": 0.1}
+
+_MBTI_AXES = "EISNTFJP"
+_SPLIT = re.compile(r"[,，、;；/|\n]+")
+_WORD = re.compile(r"[a-z0-9+#.]+|[一-鿿]+")
+
+
+# ---------------------------------------------------------------------------
+# Vectorisation
+# ---------------------------------------------------------------------------
+
+def _tokens(text: Optional[str]) -> list[str]:
+    """Whole comma-separated phrases plus their words (CJK runs as bigrams)."""
+    if not text:
+        return []
+    tokens = []
+    for phrase in _SPLIT.split(text.lower()):
+        phrase = phrase.strip()
+        if not phrase:
+            continue
+        tokens.append(phrase)
+        for word in _WORD.findall(phrase):
+            if word != phrase:
+                tokens.append(word)
+            if "一" <= word[0] <= "鿿" and len(word) > 2:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def _hash_into(block: np.ndarray, tokens: Iterable[str]) -> None:
+    """Signed feature hashing; stable across processes (unlike hash())."""
+    dim = block.shape[0]
+    for token in tokens:
+        digest = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+        block[digest % dim] += 1.0 if (digest >> 63) & 1 else -1.0
+
+
+def _normalise(block: np.ndarray) -> None:
+    norm = float(np.linalg.norm(block))
+    if norm > 0:
+        block /= norm
+
+
+def build_vector(
+    skills: Optional[str],
+    interests: Optional[str],
+    personality: Optional[str],
+) -> np.ndarray:
+    vector = np.zeros(VECTOR_DIM, dtype=np.float32)
+    _hash_into(vector[_SKILLS], _tokens(skills))
+    _hash_into(vector[_INTERESTS], _tokens(interests))
+    if personality and len(personality) == 4:
+        for letter in personality.upper():
+            idx = _MBTI_AXES.find(letter)
+            if idx >= 0:
+                vector[SKILL_DIM + INTEREST_DIM + idx] = 1.0
+    for block in (_SKILLS, _INTERESTS, _PERSONALITY):
+        _normalise(vector[block])
+    return vector
+
+
+def requirements_vector(text: Optional[str]) -> np.ndarray:
+    """Hash free-text requirements into the skills block for relevance scoring."""
+    block = np.zeros(SKILL_DIM, dtype=np.float32)
+    _hash_into(block, _tokens(text))
+    _normalise(block)
+    return block
+
+
+def pack(vector: np.ndarray) -> bytes:
+    return vector.astype("<f4", copy=False).tobytes()
+
+
+def unpack(blob: Optional[bytes]) -> Optional[np.ndarray]:
+    """Decode User.skills_vector; None if missing or from another layout."""
+    if not blob or len(blob) != VECTOR_DIM * 4:
+        return None
+    return np.frombuffer(blob, dtype="<f4")
+
+
+def user_vector(user: User) -> np.ndarray:
+    """The stored vector if current, otherwise one computed from the profile."""
+    vector = unpack(user.skills_vector)
+    if vector is None:
+        vector = build_vector(user.skills, user.interests, user.personality)
+    return vector
+
+
+def refresh_user_vector(user: User) -> np.ndarray:
+    """Recompute the user's vector and store it (caller commits)."""
+    vector = build_vector(user.skills, user.interests, user.personality)
+    user.skills_vector = pack(vector)
+    return vector
+
+
+# ---------------------------------------------------------------------------
+# Candidate matrices
+# ---------------------------------------------------------------------------
+
+class CandidateMatrix:
+    """Growable float32 matrix of user vectors with O(1) row add/remove."""
+
+    def __init__(self, capacity: int = 16):
+        self.matrix = np.zeros((max(capacity, 1), VECTOR_DIM), dtype=np.float32)
+        self.user_ids: list[int] = []
+        self.rows: dict[int, int] = {}
+        self.built_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def upsert(self, user_id: int, vector: np.ndarray) -> None:
+        row = self.rows.get(user_id)
+        if row is None:
+            row = len(self.user_ids)
+            if row == self.matrix.shape[0]:
+                grown = np.zeros((row * 2, VECTOR_DIM), dtype=np.float32)
+                grown[:row] = self.matrix
+                self.matrix = grown
+            self.user_ids.append(user_id)
+            self.rows[user_id] = row
+        self.matrix[row] = vector
+
+    def remove(self, user_id: int) -> None:
+        row = self.rows.pop(user_id, None)
+        if row is None:
+            return
+        last = len(self.user_ids) - 1
+        if row != last:
+            moved = self.user_ids[last]
+            self.matrix[row] = self.matrix[last]
+            self.user_ids[row] = moved
+            self.rows[moved] = row
+        self.user_ids.pop()
+
+    def score(
+        self,
+        requester: np.ndarray,
+        requirements: np.ndarray,
+        exclude_user_id: Optional[int] = None,
+    ) -> np.ndarray:
+        """Match score in [0, 1]-ish for every row (excluded row gets -inf)."""
+        n = len(self.user_ids)
+        m = self.matrix[:n]
+        skills = m[:, _SKILLS]
+        has_skills = np.any(skills != 0, axis=1)
+
+        scores = WEIGHTS["requirements"] * (skills @ requirements)
+        complement = 1.0 - skills @ requester[_SKILLS]
+        if np.any(requester[_SKILLS]):
+            scores += WEIGHTS["complement"] * np.where(has_skills, complement, 0.0)
+        scores += WEIGHTS["interests"] * (m[:, _INTERESTS] @ requester[_INTERESTS])
+        if np.any(requester[_PERSONALITY]):
+            personality = m[:, _PERSONALITY]
+            differs = 1.0 - personality @ requester[_PERSONALITY]
+            scores += WEIGHTS["personality"] * np.where(np.any(personality != 0, axis=1), differs, 0.0)
+
+        if exclude_user_id is not None and exclude_user_id in self.rows:
+            scores[self.rows[exclude_user_id]] = -np.inf
+        return scores
+
+
+class SkillIndex:
+    """
+    Process-local cache of CandidateMatrix per hackathon, plus one bounded
+    global pool used when a hackathon has no other participants yet.
+    Entries are rebuilt after TEAM_MATCH_INDEX_TTL seconds so rows changed
+    by other worker processes eventually show up.
+    """
+
+    GLOBAL = None  # key of the global pool
+
+    def __init__(self, ttl: float = 600.0, global_pool: int = 2000):
+        self.ttl = ttl
+        self.global_pool = global_pool
+        self._matrices: dict[Optional[int], CandidateMatrix] = {}
+        self._lock = threading.Lock()
+
+    # -- building -----------------------------------------------------------
+
+    def _load(self, session: Session, hackathon_id: Optional[int]) -> CandidateMatrix:
+        columns = select(User.id, User.skills_vector, User.skills, User.interests, User.personality)
+        if hackathon_id is self.GLOBAL:
+            query = (
+                columns.where(User.is_active == True, (User.skills != None) | (User.interests != None))  # noqa: E711,E712
+                .order_by(User.id.desc())
+                .limit(self.global_pool)
+            )
+        else:
+            query = columns.join(Enrollment, Enrollment.user_id == User.id).where(
+                Enrollment.hackathon_id == hackathon_id
+            )
+        rows = session.exec(query).all()
+
+        matrix = CandidateMatrix(capacity=len(rows))
+        backfill = []
+        for user_id, blob, skills, interests, personality in rows:
+            vector = unpack(blob)
+            if vector is None:
+                vector = build_vector(skills, interests, personality)
+                backfill.append((user_id, pack(vector)))
+            matrix.upsert(user_id, vector)
+
+        if backfill:
+            # Persist vectors for users created before the column was populated
+            for user_id, blob in backfill:
+                session.exec(update(User).where(User.id == user_id).values(skills_vector=blob))
+            session.commit()
+        return matrix
+
+    def get(self, session: Session, hackathon_id: Optional[int]) -> CandidateMatrix:
+        with self._lock:
+            matrix = self._matrices.get(hackathon_id)
+            if matrix is not None and time.monotonic() - matrix.built_at < self.ttl:
+                return matrix
+        matrix = self._load(session, hackathon_id)
+        with self._lock:
+            self._matrices[hackathon_id] = matrix
+        return matrix
+
+    def top_k(
+        self,
+        session: Session,
+        hackathon_id: Optional[int],
+        requester: User,
+        requirements: str,
+        k: int,
+    ) -> list[tuple[int, float]]:
+        """Best k (user_id, score) pairs, excluding the requester."""
+        matrix = self.get(session, hackathon_id)
+        requester_vec = user_vector(requester)
+        with self._lock:
+            scores = matrix.score(requester_vec, requirements_vector(requirements), requester.id)
+            user_ids = list(matrix.user_ids)
+        count = min(k, len(user_ids) - (1 if requester.id in matrix.rows else 0))
+        if count <= 0:
+            return []
+        top = np.argpartition(-scores, count - 1)[:count]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(user_ids[i], float(scores[i])) for i in top]
+
+    # -- incremental maintenance -------------------------------------------
+
+    def add_member(self, hackathon_id: int, user: User) -> None:
+        with self._lock:
+            matrix = self._matrices.get(hackathon_id)
+            if matrix is not None:
+                matrix.upsert(user.id, user_vector(user))
+
+    def remove_member(self, hackathon_id: int, user_id: int) -> None:
+        with self._lock:
+            matrix = self._matrices.get(hackathon_id)
+            if matrix is not None:
+                matrix.remove(user_id)
+
+    def update_user(self, user: User) -> None:
+        """Refresh the user's row in every loaded matrix that holds it."""
+        vector = user_vector(user)
+        with self._lock:
+            for key, matrix in self._matrices.items():
+                if user.id in matrix.rows:
+                    matrix.upsert(user.id, vector)
+                elif key is self.GLOBAL and (user.skills or user.interests):
+                    matrix.upsert(user.id, vector)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._matrices.clear()
+
+
+_index = SkillIndex(
+    ttl=settings.TEAM_MATCH_INDEX_TTL,
+    global_pool=settings.TEAM_MATCH_GLOBAL_POOL,
+)
+
+
+def get_skill_index() -> SkillIndex:
+    return _index
@@ -0,0 +1,212 @@
+"""
+Slow-query log.
+
+A statement that takes SLOW_QUERY_MS or longer is written as one JSON
+line to a rotating file (SLOW_QUERY_LOG_PATH). Each line has the elapsed
+time, the statement shape (see query_stats.statement_shape), the
+redacted parameters and the originating route. The first time a shape is
+seen slow, its plan is captured on the same connection and logged with
+it: EXPLAIN QUERY PLAN on SQLite, EXPLAIN on PostgreSQL. The plan is not
+captured again for that shape.
+
+Per-shape totals (count, cumulative and max time, last route and
+parameters, plan) are kept in memory for GET /admin/slow-queries, which
+lists the top offenders by cumulative time.
+
+Parameters are redacted: numbers, booleans, dates and NULLs are kept
+because ids and limits explain plans, while strings and bytes are
+replaced by their length.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime
+from logging.handlers import RotatingFileHandler
+from typing import Any, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.query_stats import statement_shape
+
+logger = logging.getLogger("uvicorn")
+
+MAX_SHAPES = 500  # distinct slow shapes kept in memory
+_EXPLAIN = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN "}
+
+_scope: ContextVar[Optional[dict]] = ContextVar("slow_query_scope", default=None)
+
+
+@contextmanager
+def request_scope(scope: dict) -> Iterator[None]:
+    """Attribute statements run in this context to the request with ASGI `scope`."""
+    token = _scope.set(scope)
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def _route() -> Optional[str]:
+    scope = _scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")  # set once routing has matched
+    return f"{scope.get('method')} {getattr(route, 'path', None) or scope.get('path')}"
+
+
+def _redact_value(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, datetime, date)):
+        return value.isoformat() if isinstance(value, (datetime, date)) else value
+    if isinstance(value, str):
+        return f"<str {len(value)}>"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<bytes {len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def redact(parameters: Any) -> Any:
+    if isinstance(parameters, dict):
+        return {k: _redact_value(v) for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact_value(v) for v in parameters]
+    return _redact_value(parameters)
+
+
+def _explain(conn, statement: str, parameters: Any) -> Optional[str]:
+    prefix = _EXPLAIN.get(conn.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        rows = cursor.fetchall()
+    except Exception as e:
+        return f"unavailable: {e}"
+    finally:
+        cursor.close()
+    # SQLite: (id, parent, notused, detail); PostgreSQL: one text column
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+class SlowQueryLog:
+    """Per-shape totals of slow statements plus the rotating JSON-lines file."""
+
+    def __init__(self, path: str, max_bytes: int = 10 * 1024 * 1024, backups: int = 5):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._shapes: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._file_logger: Optional[logging.Logger] = None
+
+    def _file(self) -> logging.Logger:
+        if self._file_logger is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            handler = RotatingFileHandler(self.path, maxBytes=self.max_bytes, backupCount=self.backups,
+                                          encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            file_logger = logging.Logger("aura.slow_query")
+            file_logger.addHandler(handler)
+            self._file_logger = file_logger
+        return self._file_logger
+
+    def needs_plan(self, shape: str) -> bool:
+        with self._lock:
+            entry = self._shapes.get(shape)
+        return entry is None or entry["plan"] is None
+
+    def record(self, shape: str, seconds: float, parameters: Any, route: Optional[str],
+               plan: Optional[str] = None) -> None:
+        params = redact(parameters)
+        with self._lock:
+            entry = self._shapes.get(shape)
+            if entry is None:
+                if len(self._shapes) >= MAX_SHAPES:
+                    del self._shapes[min(self._shapes, key=lambda s: self._shapes[s]["total_seconds"])]
+                entry = self._shapes[shape] = {
+                    "shape": shape, "count": 0, "total_seconds": 0.0, "max_seconds": 0.0,
+                    "routes": {}, "last_params": None, "plan": None,
+                }
+            entry["count"] += 1
+            entry["total_seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+            entry["last_params"] = params
+            entry["last_seen"] = time.time()
+            if route:
+                entry["routes"][route] = entry["routes"].get(route, 0) + 1
+            if plan is not None and entry["plan"] is None:
+                entry["plan"] = plan
+            else:
+                plan = None  # only logged the first time
+
+        line = {
+            "ts": datetime.utcnow().isoformat(timespec="milliseconds"),
+            "ms": round(seconds * 1000, 1),
+            "route": route,
+            "shape": shape,
+            "params": params,
+        }
+        if plan is not None:
+            line["plan"] = plan
+        try:
+            self._file().warning(json.dumps(line, ensure_ascii=False, default=str))
+        except OSError as e:
+            logger.error(f"Slow query log unavailable ({self.path}): {e}")
+
+    def top(self, limit: int = 20) -> list[dict]:
+        """Shapes by cumulative time, slowest first."""
+        with self._lock:
+            entries = sorted(self._shapes.values(), key=lambda e: e["total_seconds"], reverse=True)[:limit]
+            return [
+                {
+                    **{k: v for k, v in e.items() if k not in ("total_seconds", "max_seconds", "routes")},
+                    "total_ms": round(e["total_seconds"] * 1000, 1),
+                    "avg_ms": round(e["total_seconds"] * 1000 / e["count"], 1),
+                    "max_ms": round(e["max_seconds"] * 1000, 1),
+                    "routes": dict(e["routes"]),
+                }
+                for e in entries
+            ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._shapes.clear()
+
+
+_log = SlowQueryLog(
+    settings.SLOW_QUERY_LOG_PATH,
+    max_bytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+    backups=settings.SLOW_QUERY_LOG_BACKUPS,
+)
+
+
+def get_slow_query_log() -> SlowQueryLog:
+    return _log
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if settings.SLOW_QUERY_MS > 0 and context is not None:
+        context._slow_query_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_slow_query_start", None)
+    if start is None:
+        return
+    seconds = time.perf_counter() - start
+    if settings.SLOW_QUERY_MS <= 0 or seconds * 1000 < settings.SLOW_QUERY_MS:
+        return
+    log = get_slow_query_log()
+    shape = statement_shape(statement)
+    plan = None
+    if not executemany and log.needs_plan(shape):
+        plan = _explain(conn, statement, parameters)
+    log.record(shape, seconds, parameters, _route(), plan)
@@ -1,7 +1,196 @@
+"""
+Database engine and request sessions.
+
+The engine is built from a named profile (DB_ENGINE_PROFILE):
+
+  postgres  sized QueuePool, pre-ping on checkout, periodic recycle
+  sqlite    WAL journal plus per-connection pragmas (synchronous, busy
+            timeout, mmap, page cache, foreign keys) so concurrent
+            requests wait for the write lock instead of failing with
+            "database is locked"
+  default   a bare create_engine(), as before the profiles existed
+
+"auto" picks postgres or sqlite from the DATABASE_URL scheme. Hot read
+endpoints use an async engine built from the same profile (aiosqlite /
+asyncpg) through get_async_session; everything else uses get_session.
+
+With DATABASE_READ_URL set, both dependencies route by HTTP method: safe
+requests (GET, HEAD, OPTIONS) get a session on the read replica, anything
+else one on the primary. A client that commits a write is pinned to the
+primary for DB_READ_STICKY_SECONDS (keyed by its access token), so it
+reads its own writes while the replica catches up. The few GET handlers
+that write use get_primary_session.
+"""
+import hashlib
+import os
+import threading
+import time
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import create_engine, SQLModel, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL, echo=True)
+ENGINE_PROFILES = ("postgres", "sqlite", "default")
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def resolve_profile(url: str, profile: Optional[str] = None) -> str:
+    profile = (profile or settings.DB_ENGINE_PROFILE).lower()
+    if profile == "auto":
+        backend = make_url(url).get_backend_name()
+        return {"postgresql": "postgres", "sqlite": "sqlite"}.get(backend, "default")
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown DB_ENGINE_PROFILE {profile!r}; expected auto or one of {ENGINE_PROFILES}")
+    return profile
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    # Negative cache_size is in KiB rather than pages
+    cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+    cursor.execute(f"PRAGMA foreign_keys={'ON' if settings.SQLITE_FOREIGN_KEYS else 'OFF'}")
+    cursor.close()
+
+
+def _engine_options(url: str, profile: str) -> dict:
+    options: dict = {"echo": settings.DB_ECHO}
+    pool = dict(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    if profile == "postgres":
+        options.update(pool, pool_recycle=settings.DB_POOL_RECYCLE, pool_pre_ping=True)
+    elif profile == "sqlite":
+        database = make_url(url).database
+        if database and database != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(database)), exist_ok=True)
+            options.update(pool)
+        options["connect_args"] = {"timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000}
+    return options
+
+
+def create_db_engine(url: Optional[str] = None, profile: Optional[str] = None, **kwargs) -> Engine:
+    """Engine for `url` (DATABASE_URL) configured by the named profile; kwargs override."""
+    url = url or settings.DATABASE_URL
+    profile = resolve_profile(url, profile)
+    options = _engine_options(url, profile)
+    if profile == "sqlite":
+        options["connect_args"]["check_same_thread"] = False
+    options.update(kwargs)
+    engine = create_engine(url, **options)
+    if profile == "sqlite":
+        event.listen(engine, "connect", _sqlite_pragmas)
+    return engine
+
+
+def async_url(url: str) -> URL:
+    """`url` with its async driver: aiosqlite for SQLite, asyncpg for PostgreSQL."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend!r} databases")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def create_async_db_engine(url: Optional[str] = None, profile: Optional[str] = None, **kwargs) -> AsyncEngine:
+    """Async counterpart of create_db_engine(), same profile and pragmas."""
+    url = url or settings.DATABASE_URL
+    profile = resolve_profile(url, profile)
+    options = _engine_options(url, profile)
+    options.update(kwargs)
+    engine = create_async_engine(async_url(url), **options)
+    if profile == "sqlite":
+        event.listen(engine.sync_engine, "connect", _sqlite_pragmas)
+    return engine
+
+
+engine = create_db_engine()
+read_engine: Optional[Engine] = (
+    create_db_engine(settings.DATABASE_READ_URL) if settings.DATABASE_READ_URL else None
+)
+# Created on first use so the async driver is only needed by processes
+# that serve the async endpoints
+async_engine: Optional[AsyncEngine] = None
+async_read_engine: Optional[AsyncEngine] = None
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class ReadYourWrites:
+    """Clients (by access token) that committed a write in the last `seconds`."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self._until: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, key: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._until[key] = now + self.seconds
+            if len(self._until) > 10_000:
+                for k in [k for k, until in self._until.items() if until <= now]:
+                    del self._until[k]
+
+    def is_sticky(self, key: Optional[str]) -> bool:
+        if key is None:
+            return False
+        with self._lock:
+            until = self._until.get(key)
+        return until is not None and until > time.monotonic()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._until.clear()
+
+
+_read_your_writes = ReadYourWrites(settings.DB_READ_STICKY_SECONDS)
+
+
+def get_read_your_writes() -> ReadYourWrites:
+    return _read_your_writes
+
+
+def _client_key(request: Request) -> Optional[str]:
+    """Stable key for the caller's credentials (bearer token or access_token cookie)."""
+    auth = request.headers.get("Authorization", "")
+    token = auth[7:] if auth[:7].lower() == "bearer " else request.cookies.get("access_token")
+    if not token or token in ("null", "undefined"):
+        return None
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _use_replica(request: Optional[Request]) -> bool:
+    return (
+        request is not None
+        and request.method in SAFE_METHODS
+        and not get_read_your_writes().is_sticky(_client_key(request))
+    )
+
+
+@event.listens_for(Session, "after_commit")
+def _stick_after_write(session) -> None:
+    key = session.info.get("read_your_writes")
+    if key is not None:
+        get_read_your_writes().mark(key)
+
+
+def _primary_info(request: Optional[Request]) -> dict:
+    """Session.info for a primary session: commits from unsafe requests pin the client."""
+    if request is None or request.method in SAFE_METHODS:
+        return {}
+    key = _client_key(request)
+    return {"read_your_writes": key} if key else {}
 
 def init_db():
     # Import all models so SQLModel registers them in metadata
@@ -20,8 +209,54 @@ def init_db():
     from app.models.judging_criteria import JudgingCriteria  # noqa: F401
     from app.models.partner import Partner  # noqa: F401
     from app.models.hackathon_organizer import HackathonOrganizer  # noqa: F401
+    from app.models.ai_review import AIReviewJob, SubmissionAIReview  # noqa: F401
+    from app.models.participant_stats import ParticipantHistogram, ParticipantStats  # noqa: F401
+    from app.core import fulltext
     SQLModel.metadata.create_all(engine)
+    fulltext.ensure_index(engine)
+
+def get_read_engine() -> Engine:
+    return read_engine if read_engine is not None else engine
+
+
+def get_session(request: Request = None):
+    """Session on the read replica for safe requests, on the primary otherwise."""
+    if _use_replica(request):
+        with Session(get_read_engine()) as session:
+            yield session
+        return
+    with Session(engine, info=_primary_info(request)) as session:
+        yield session
+
+
+def get_primary_session(request: Request = None):
+    """Session on the primary regardless of method, for GET handlers that write."""
+    with Session(engine, info=_primary_info(request)) as session:
+        yield session
+
+
+def get_async_engine() -> AsyncEngine:
+    global async_engine
+    if async_engine is None:
+        async_engine = create_async_db_engine()
+    return async_engine
+
+
+def get_async_read_engine() -> AsyncEngine:
+    global async_read_engine
+    if not settings.DATABASE_READ_URL:
+        return get_async_engine()
+    if async_read_engine is None:
+        async_read_engine = create_async_db_engine(settings.DATABASE_READ_URL)
+    return async_read_engine
+
 
-def get_session():
-    with Session(engine) as session:
+async def get_async_session(request: Request = None):
+    """
+    AsyncSession for `async def` read endpoints, so they run on the event
+    loop instead of holding one of the threadpool slots sync handlers use.
+    Routed like get_session.
+    """
+    bind = get_async_read_engine() if _use_replica(request) else get_async_engine()
+    async with AsyncSession(bind) as session:
         yield session
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
@@ -21,6 +21,20 @@ async def startup_event():
     # Ensure database tables exist (fallback for local dev when alembic hasn't run)
     from app.db.session import init_db
     init_db()
+    # Resume batch AI review jobs interrupted by the previous shutdown
+    from app.api.v1.endpoints.ai import resume_review_jobs
+    await resume_review_jobs()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Stop the image job workers and the review job sweeper, then release
+    # pooled connections held by the async AI provider clients
+    from app.core.image_jobs import get_image_job_queue
+    await get_image_job_queue().aclose()
+    from app.core.ai_review_jobs import get_review_job_runner
+    await get_review_job_runner().aclose()
+    from app.core.llm import close_providers
+    await close_providers()
 
 # Ensure uploads directory exists
 if not os.path.exists("uploads"):
@@ -34,8 +48,23 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-DB-Queries", "X-DB-Time", "X-DB-N-Plus-One", "X-Next-Cursor"],
     )
 
+# SQL instrumentation: slow statements are attributed to the request's
+# route; per-request statement counts when DB_QUERY_STATS is on
+from app.core import query_stats, slow_queries
+
+@app.middleware("http")
+async def db_query_stats(request: Request, call_next):
+    with slow_queries.request_scope(request.scope):
+        if not settings.DB_QUERY_STATS:
+            return await call_next(request)
+        with query_stats.track_queries() as stats:
+            response = await call_next(request)
+    query_stats.add_headers(request, response, stats)
+    return response
+
 # 1. API Router (Must be first)
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
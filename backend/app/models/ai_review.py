@@ -0,0 +1,81 @@
+from typing import Optional
+from datetime import datetime
+from enum import Enum
+from sqlmodel import SQLModel, Field
+from sqlalchemy import String
+
+
+class AIReviewJobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class AIReviewJob(SQLModel, table=True):
+    """
+    One organizer-triggered batch AI review over a hackathon's submissions.
+    Counters are updated as reviews finish so clients can poll progress;
+    heartbeat_at lets a restarted (or another) worker pick up a job whose
+    runner died.
+    """
+    __tablename__ = "ai_review_job"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    hackathon_id: int = Field(foreign_key="hackathon.id", index=True)
+    status: AIReviewJobStatus = Field(default=AIReviewJobStatus.QUEUED, sa_type=String, index=True)
+    total: int = Field(default=0)
+    reviewed: int = Field(default=0)
+    skipped: int = Field(default=0)  # unchanged since their last review
+    failed: int = Field(default=0)
+    error: Optional[str] = None
+    created_by: int = Field(foreign_key="user.id")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+
+
+class SubmissionAIReview(SQLModel, table=True):
+    """
+    Latest AI review of a submission. content_hash covers the submission
+    text and the judging criteria it was scored against; a batch run skips
+    submissions whose hash is unchanged.
+    """
+    __tablename__ = "submission_ai_review"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    submission_id: int = Field(foreign_key="submission.id", unique=True)
+    hackathon_id: int = Field(foreign_key="hackathon.id", index=True)
+    job_id: Optional[int] = Field(default=None, foreign_key="ai_review_job.id")
+    content_hash: str
+    scores: str  # JSON object: criterion name -> score
+    comment: str
+    model: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class AIReviewJobRead(SQLModel):
+    id: int
+    hackathon_id: int
+    status: AIReviewJobStatus
+    total: int
+    reviewed: int
+    skipped: int
+    failed: int
+    progress: float
+    error: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+
+class SubmissionAIReviewRead(SQLModel):
+    submission_id: int
+    hackathon_id: int
+    job_id: Optional[int]
+    scores: dict[str, int]
+    comment: str
+    model: Optional[str]
+    updated_at: datetime
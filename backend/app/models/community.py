@@ -1,6 +1,6 @@
 from typing import Optional, List
 from datetime import datetime
-from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel import SQLModel, Field, Index, Relationship
 from app.models.user import User
 
 class CommunityPostBase(SQLModel):
@@ -10,6 +10,9 @@ class CommunityPostBase(SQLModel):
     hackathon_id: int = Field(foreign_key="hackathon.id")
 
 class CommunityPost(CommunityPostBase, table=True):
+    __table_args__ = (
+        Index("ix_communitypost_hackathon_created", "hackathon_id", "created_at"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     author_id: int = Field(foreign_key="user.id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
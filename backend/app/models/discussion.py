@@ -1,6 +1,6 @@
 from typing import Optional, List
 from datetime import datetime
-from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel import SQLModel, Field, Index, Relationship
 
 class DiscussionBase(SQLModel):
     title: str
@@ -11,6 +11,9 @@ class DiscussionBase(SQLModel):
     is_announcement: bool = Field(default=False)
 
 class Discussion(DiscussionBase, table=True):
+    __table_args__ = (
+        Index("ix_discussion_pinned_created", "is_pinned", "created_at"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     author_id: int = Field(foreign_key="user.id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
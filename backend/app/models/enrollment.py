@@ -1,7 +1,7 @@
 from typing import Optional
 from datetime import datetime
 from enum import Enum
-from sqlmodel import SQLModel, Field
+from sqlmodel import SQLModel, Field, Index
 from sqlalchemy import String
 
 class EnrollmentStatus(str, Enum):
@@ -11,6 +11,13 @@ class EnrollmentStatus(str, Enum):
     WAITLISTED = "waitlisted"
 
 class Enrollment(SQLModel, table=True):
+    __table_args__ = (
+        # A named unique index rather than a UNIQUE constraint: on SQLite a
+        # constraint becomes an unnamed autoindex, and migration n4o5p6q7r8s9
+        # would then add a second, identical index next to it
+        Index("uq_enrollment_hackathon_user", "hackathon_id", "user_id", unique=True),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     hackathon_id: int = Field(foreign_key="hackathon.id")
@@ -2,7 +2,7 @@ import json
 from typing import Optional
 from datetime import datetime
 from enum import Enum
-from sqlmodel import SQLModel, Field
+from sqlmodel import SQLModel, Field, Index
 from sqlalchemy import String
 
 
@@ -64,6 +64,11 @@ class HackathonBase(SQLModel):
 
 
 class Hackathon(HackathonBase, table=True):
+    __table_args__ = (
+        # List orders and keyset pagination cursors (see app.core.pagination)
+        Index("ix_hackathon_created_id", "created_at", "id"),
+        Index("ix_hackathon_prize_id", "total_cash_prize", "id"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
 
     # Denormalized creator reference – the same user also gets an "owner"
@@ -74,6 +79,15 @@ class Hackathon(HackathonBase, table=True):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     updated_by: Optional[int] = Field(default=None, foreign_key="user.id")
 
+    # Bumped whenever the detail document (row, hosts, sections and their
+    # children, partners) changes; see app.core.hackathon_docs.
+    doc_version: int = Field(default=0)
+
+    # Summary of the hackathon's prizes for the list, maintained by the
+    # prize endpoints; see app.core.prize_summary.
+    total_cash_prize: float = Field(default=0.0)
+    has_non_cash_prizes: bool = Field(default=False)
+
 
 class HackathonCreate(SQLModel):
     """Payload for creating a new hackathon (step 1 of the wizard)."""
@@ -1,6 +1,6 @@
 from typing import Optional, List, Dict, Any
 from datetime import datetime
-from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel import SQLModel, Field, Index, Relationship
 import json
 
 class NotificationBase(SQLModel):
@@ -13,6 +13,9 @@ class NotificationBase(SQLModel):
     data: Optional[str] = Field(default=None)
 
 class Notification(NotificationBase, table=True):
+    __table_args__ = (
+        Index("ix_notification_user_read_created", "user_id", "is_read", "created_at"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     user: "User" = Relationship(back_populates="notifications")
@@ -0,0 +1,36 @@
+from typing import Optional
+from datetime import datetime
+from sqlmodel import SQLModel, Field, UniqueConstraint
+
+
+class ParticipantHistogram(SQLModel, table=True):
+    """
+    Per-hackathon count of enrolled participants per skill / MBTI type,
+    kept up to date by the enrollment and profile endpoints.
+    """
+    __tablename__ = "participant_histogram"
+    __table_args__ = (
+        UniqueConstraint("hackathon_id", "kind", "value", name="uq_participant_histogram"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    hackathon_id: int = Field(foreign_key="hackathon.id", index=True)
+    kind: str  # "skill" | "mbti"
+    value: str
+    count: int = Field(default=0)
+
+
+class ParticipantStats(SQLModel, table=True):
+    """
+    Participant total per hackathon, plus the last AI community summary and
+    the histogram it was written from (reused until the pool changes
+    materially). A missing row means the histogram has not been built yet.
+    """
+    __tablename__ = "participant_stats"
+
+    hackathon_id: int = Field(foreign_key="hackathon.id", primary_key=True)
+    participants: int = Field(default=0)
+    summary: Optional[str] = None  # JSON: summary, interest_clusters, recommendations
+    summary_basis: Optional[str] = None  # JSON: histogram snapshot at summary time
+    summary_at: Optional[datetime] = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,11 +1,13 @@
 from typing import Optional
 from datetime import datetime
-from sqlmodel import SQLModel, Field, UniqueConstraint
+from sqlmodel import SQLModel, Field, Index, UniqueConstraint
 
 
 class Score(SQLModel, table=True):
     __table_args__ = (
+        # Also serves the (judge_id, submission_id) lookups through its prefix
         UniqueConstraint("judge_id", "submission_id", "criteria_id", name="uq_score_judge_sub_criteria"),
+        Index("ix_score_submission_criteria", "submission_id", "criteria_id"),
     )
 
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -1,7 +1,7 @@
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
-from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel import SQLModel, Field, Index, Relationship
 from sqlalchemy import String
 from app.models.user import User, UserRead
 
@@ -15,7 +15,7 @@ class TeamBase(SQLModel):
 
 class Team(TeamBase, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    hackathon_id: int = Field(foreign_key="hackathon.id")
+    hackathon_id: int = Field(foreign_key="hackathon.id", index=True)
     leader_id: int = Field(foreign_key="user.id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -25,7 +25,7 @@ class Team(TeamBase, table=True):
 class TeamMember(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     team_id: int = Field(foreign_key="team.id")
-    user_id: int = Field(foreign_key="user.id")
+    user_id: int = Field(foreign_key="user.id", index=True)
     joined_at: datetime = Field(default_factory=datetime.utcnow)
 
     team: Optional[Team] = Relationship(back_populates="members")
@@ -73,13 +73,17 @@ class SubmissionBase(SQLModel):
 
 class Submission(SubmissionBase, table=True):
     __tablename__ = "submission"
+    __table_args__ = (
+        Index("ix_submission_hackathon_score", "hackathon_id", "total_score"),
+        Index("ix_submission_hackathon_id", "hackathon_id", "id"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     hackathon_id: int = Field(foreign_key="hackathon.id")
     team_id: Optional[int] = Field(default=None, foreign_key="team.id")
     user_id: Optional[int] = Field(default=None, foreign_key="user.id")
     project_id: Optional[int] = Field(default=None, foreign_key="master_project.id")
     status: SubmissionStatus = Field(default=SubmissionStatus.DRAFT, sa_type=String)
-    total_score: Optional[float] = Field(default=0.0)
+    total_score: float = Field(default=0.0)
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     team: Optional[Team] = Relationship(back_populates="submissions")
@@ -94,7 +98,7 @@ class SubmissionRead(SubmissionBase):
     user_id: Optional[int]
     project_id: Optional[int]
     status: SubmissionStatus
-    total_score: Optional[float]
+    total_score: float
     created_at: datetime
 
 class SubmissionReadWithTeam(SubmissionRead):
@@ -1,7 +1,8 @@
 from typing import Optional, List
 from datetime import datetime
 from pydantic import EmailStr
-from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Column, LargeBinary
+from sqlmodel import SQLModel, Field, Index, Relationship
 
 class UserBase(SQLModel):
     email: Optional[EmailStr] = Field(unique=True, index=True)
@@ -12,7 +13,6 @@ class UserBase(SQLModel):
     
     # New Fields for the platform
     can_create_hackathon: bool = Field(default=False)  # Organizer permission
-    skills_vector: Optional[str] = None  # For AI matching (stored as text for now)
     invitation_code: Optional[str] = Field(default=None, index=True)  # 邀请码
     
     # WeChat fields
@@ -43,6 +43,9 @@ class UserBase(SQLModel):
 class User(UserBase, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     hashed_password: Optional[str] = None # Password optional for WeChat login
+    # Packed float32 vector for AI team matching (see app/core/skill_vectors.py);
+    # derived from skills/interests/personality, never set by clients.
+    skills_vector: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary))
     notifications: List["Notification"] = Relationship(back_populates="user")
     discussions: List["Discussion"] = Relationship(back_populates="author")
 
@@ -60,7 +63,6 @@ class UserUpdate(SQLModel):
     personality: Optional[str] = None
     bio: Optional[str] = None
     can_create_hackathon: Optional[bool] = None
-    skills_vector: Optional[str] = None
     invitation_code: Optional[str] = None
     # Community Hall settings
     show_in_community: Optional[bool] = None
@@ -77,6 +79,9 @@ class UserRead(UserBase):
     id: int
 
 class VerificationCode(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_verificationcode_email_code", "email", "code"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     email: str = Field(index=True)
     code: str
@@ -0,0 +1,166 @@
+"""
+Benchmark: concurrent AI calls must not stall unrelated CRUD requests.
+
+Starts a slow OpenAI-compatible stand-in (every chat completion sleeps
+--delay seconds) and the real API against a throwaway SQLite database,
+then fires --calls concurrent POST /ai/brainstorm-ideas requests while
+probing GET /api/v1/hackathons in a loop.
+
+With the async provider layer the brainstorm batch finishes in roughly
+ceil(calls / AI_MAX_CONCURRENCY) * delay and the hackathon probes stay in
+the low milliseconds. With a blocking client the batch would take
+calls * delay and every probe would wait behind it.
+
+Usage:
+  cd backend
+  python scripts/bench_ai_concurrency.py --calls 50 --delay 1.0
+"""
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import asyncio
+import socket
+import statistics
+import tempfile
+import threading
+import time
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _serve(app, port: int):
+    """Run a uvicorn server in a daemon thread and wait until it accepts."""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def _build_stand_in(delay: float):
+    """Minimal OpenAI-compatible chat endpoint that answers after `delay` seconds."""
+    import json
+    from fastapi import FastAPI
+
+    stand_in = FastAPI()
+
+    @stand_in.post("/chat/completions")
+    async def chat_completions(body: dict):
+        await asyncio.sleep(delay)
+        content = json.dumps({"ideas": [{"title": "Bench", "description": "", "tech_stack": [], "complexity": "Low"}]})
+        return {
+            "id": "bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "bench"),
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    return stand_in
+
+
+def _percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def _run(api_url: str, token: str, calls: int):
+    import httpx
+
+    headers = {"Authorization": f"Bearer {token}"}
+    probe_latencies: list[float] = []
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(base_url=api_url, timeout=None) as http:
+        async def probe():
+            while not done.is_set():
+                t0 = time.perf_counter()
+                resp = await http.get("/api/v1/hackathons")
+                resp.raise_for_status()
+                probe_latencies.append(time.perf_counter() - t0)
+                await asyncio.sleep(0.05)
+
+        async def brainstorm(i: int):
+            resp = await http.post(
+                "/api/v1/ai/brainstorm-ideas",
+                json={"theme": f"theme {i}", "skills": "Python", "interests": "AI"},
+                headers=headers,
+            )
+            resp.raise_for_status()
+            return resp.json()
+
+        # Warm up the upstream client pool so the probe measures steady state
+        await brainstorm(-1)
+
+        probe_task = asyncio.create_task(probe())
+        t0 = time.perf_counter()
+        results = await asyncio.gather(*(brainstorm(i) for i in range(calls)))
+        batch_time = time.perf_counter() - t0
+        done.set()
+        await probe_task
+
+    ok = sum(1 for r in results if r.get("ideas"))
+    return batch_time, ok, probe_latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=1.0)
+    args = parser.parse_args()
+
+    stand_in_port, api_port = _free_port(), _free_port()
+    db_dir = tempfile.mkdtemp(prefix="aura-bench-")
+
+    # Settings are read at import time, so configure before importing the app.
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(db_dir, 'bench.db')}"
+    os.environ["USE_DEEPSEEK"] = "true"
+    os.environ["DEEPSEEK_API_KEY"] = "bench"
+    os.environ["DEEPSEEK_BASE_URL"] = f"http://127.0.0.1:{stand_in_port}"
+    os.environ["AI_MAX_RETRIES"] = "0"
+    os.environ["AI_CACHE_PATH"] = os.path.join(db_dir, "ai_cache.db")
+
+    from sqlmodel import Session
+    from app.main import app
+    from app.core.config import settings
+    from app.core.security import create_access_token
+    from app.db.session import engine, init_db
+    from app.models.user import User
+
+    init_db()
+    with Session(engine) as session:
+        user = User(email="bench@aura.com", full_name="Bench", is_active=True)
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        token = create_access_token(user.id)
+
+    _serve(_build_stand_in(args.delay), stand_in_port)
+    _serve(app, api_port)
+
+    batch_time, ok, probes = asyncio.run(_run(f"http://127.0.0.1:{api_port}", token, args.calls))
+
+    serial_time = args.calls * args.delay
+    print(f"brainstorm calls : {args.calls} ({ok} succeeded), upstream delay {args.delay:.2f}s")
+    print(f"concurrency cap  : AI_MAX_CONCURRENCY={settings.AI_MAX_CONCURRENCY}")
+    print(f"batch wall time  : {batch_time:.2f}s (a blocking client would need >= {serial_time:.2f}s)")
+    if probes:
+        print(
+            f"/hackathons probe: n={len(probes)} "
+            f"p50={statistics.median(probes) * 1000:.1f}ms "
+            f"p95={_percentile(probes, 0.95) * 1000:.1f}ms "
+            f"max={max(probes) * 1000:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
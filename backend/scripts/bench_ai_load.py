@@ -0,0 +1,114 @@
+"""
+Benchmark: AI endpoint throughput and tail latency against the offline fake.
+
+Runs the real API on a throwaway SQLite database with AI_PROVIDER=fake, so
+no paid upstream is called. It then keeps --concurrency clients busy
+posting to one AI endpoint for --requests requests in total. Each prompt
+is unique (the completion cache never hits) unless --repeat is given.
+
+Reports requests/s, p50/p95/p99 latency and how many responses were
+fallbacks. Fallback detection comes from the /ai/metrics/summary counters.
+
+Usage:
+  cd backend
+  python scripts/bench_ai_load.py --endpoint brainstorm --requests 500 --concurrency 50 \\
+      --latency-ms 800 --dist lognormal --error-rate 0.02
+"""
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import asyncio
+import tempfile
+import time
+
+from bench_ai_concurrency import _free_port, _percentile, _serve
+
+ENDPOINTS = {
+    "brainstorm": ("/api/v1/ai/brainstorm-ideas", lambda i: {"theme": f"AI {i}", "skills": "Python", "interests": "Health"}),
+    "pitch_deck": ("/api/v1/ai/generate-pitch-deck", lambda i: {"project_name": f"P{i}", "project_description": "Hackathon platform"}),
+    "resume": ("/api/v1/ai/generate-resume", lambda i: {"keywords": f"python {i}", "role": "Backend", "lang": "en"}),
+    "refine_project": ("/api/v1/ai/refine-project", lambda i: {"description": f"An app number {i}"}),
+    "generate": ("/api/v1/ai/generate", lambda i: {"prompt": f"Climate {i}", "type": "hackathon"}),
+}
+
+
+async def _run(api_url: str, token: str, path: str, payload, total: int, concurrency: int, repeat: bool):
+    import httpx
+
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies: list[float] = []
+    queue = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=api_url, timeout=None, limits=limits) as http:
+
+        async def worker():
+            for i in queue:
+                started = time.perf_counter()
+                resp = await http.post(path, json=payload(0 if repeat else i), headers=headers)
+                resp.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        summary = (await http.get("/api/v1/ai/metrics/summary", headers=headers)).json()
+    return latencies, elapsed, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="brainstorm")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=800.0)
+    parser.add_argument("--dist", choices=["fixed", "uniform", "lognormal", "exponential"], default="lognormal")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--repeat", action="store_true", help="send the same prompt every time")
+    args = parser.parse_args()
+
+    api_port = _free_port()
+    db_dir = tempfile.mkdtemp(prefix="aura-bench-")
+
+    # Settings are read at import time, so configure before importing the app.
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(db_dir, 'bench.db')}"
+    os.environ["AI_CACHE_PATH"] = os.path.join(db_dir, "ai_cache.db")
+    os.environ["AI_PROVIDER"] = "fake"
+    os.environ["AI_FAKE_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["AI_FAKE_LATENCY_DIST"] = args.dist
+    os.environ["AI_FAKE_ERROR_RATE"] = str(args.error_rate)
+
+    from sqlmodel import Session
+    from app.main import app
+    from app.core.security import create_access_token
+    from app.db.session import engine, init_db
+    from app.models.user import User
+
+    init_db()
+    with Session(engine) as session:
+        user = User(email="bench@aura.com", full_name="Bench", is_active=True, is_superuser=True)
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        token = create_access_token(user.id)
+
+    _serve(app, api_port)
+    path, payload = ENDPOINTS[args.endpoint]
+    latencies, elapsed, summary = asyncio.run(_run(
+        f"http://127.0.0.1:{api_port}", token, path, payload, args.requests, args.concurrency, args.repeat,
+    ))
+
+    stats = summary["endpoints"].get(args.endpoint, {})
+    print(f"{args.endpoint}: {args.requests} requests, {args.concurrency} clients, "
+          f"fake upstream {args.dist} median {args.latency_ms:.0f}ms, error rate {args.error_rate:.0%}")
+    print(f"  throughput   {args.requests / elapsed:8.1f} req/s")
+    print(f"  latency p50  {_percentile(latencies, 0.50) * 1000:8.0f} ms")
+    print(f"  latency p95  {_percentile(latencies, 0.95) * 1000:8.0f} ms")
+    print(f"  latency p99  {_percentile(latencies, 0.99) * 1000:8.0f} ms")
+    print(f"  upstream calls {stats.get('calls', 0)}, errors {stats.get('errors', 0)}, "
+          f"fallbacks {stats.get('fallbacks', 0)}, cache hits {stats.get('cache_hits', 0)}")
+
+
+if __name__ == "__main__":
+    main()
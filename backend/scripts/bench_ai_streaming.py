@@ -0,0 +1,146 @@
+"""
+Benchmark: time-to-first-byte of the streamed AI endpoints.
+
+Starts an OpenAI-compatible stand-in that writes a pitch deck reply of
+--slides slides over --duration seconds (token deltas spaced evenly, or
+the whole body at the end when not streaming) and the real API against
+a throwaway SQLite database. For /ai/generate-pitch-deck and its /stream
+variant it reports:
+
+  first byte   first response byte from the API
+  first slide  first complete slide the client can render
+  complete     full payload received
+
+The blocking endpoint can only show something after the full reply; the
+streaming one flushes headers immediately and delivers slide 1 after
+roughly duration / slides.
+
+Usage:
+  cd backend
+  python scripts/bench_ai_streaming.py --duration 5 --slides 8
+"""
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+
+from bench_ai_concurrency import _free_port, _serve
+
+
+def _build_stand_in(duration: float, slides: int):
+    """Chat endpoint that answers over `duration` seconds, streamed or not."""
+    from fastapi import FastAPI
+    from fastapi.responses import StreamingResponse
+
+    reply = json.dumps({
+        "slides": [
+            {"title": f"Slide {i + 1}", "content": "Lorem ipsum " * 20, "speaker_notes": "Notes " * 10}
+            for i in range(slides)
+        ]
+    })
+    pieces = [reply[i:i + 16] for i in range(0, len(reply), 16)]
+    stand_in = FastAPI()
+
+    def chunk(body: dict, delta: dict, finish=None) -> str:
+        return "data: " + json.dumps({
+            "id": "bench", "object": "chat.completion.chunk", "created": int(time.time()),
+            "model": body.get("model", "bench"),
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+        }) + "\n\n"
+
+    @stand_in.post("/chat/completions")
+    async def chat_completions(body: dict):
+        if not body.get("stream"):
+            await asyncio.sleep(duration)
+            return {
+                "id": "bench", "object": "chat.completion", "created": int(time.time()),
+                "model": body.get("model", "bench"),
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": reply}}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            }
+
+        async def events():
+            for piece in pieces:
+                await asyncio.sleep(duration / len(pieces))
+                yield chunk(body, {"content": piece})
+            yield chunk(body, {}, finish="stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return stand_in
+
+
+async def _measure(api_url: str, token: str, path: str, payload: dict) -> dict:
+    import httpx
+
+    headers = {"Authorization": f"Bearer {token}"}
+    marks = {}
+    async with httpx.AsyncClient(base_url=api_url, timeout=None) as http:
+        t0 = time.perf_counter()
+        async with http.stream("POST", path, json=payload, headers=headers) as resp:
+            body = ""
+            async for text in resp.aiter_text():
+                marks.setdefault("first byte", time.perf_counter() - t0)
+                body += text
+                if "first slide" not in marks and "event: item" in body:
+                    marks["first slide"] = time.perf_counter() - t0
+            marks["complete"] = time.perf_counter() - t0
+            # The blocking endpoint only has a renderable slide once the body is complete
+            marks.setdefault("first slide", marks["complete"])
+    return marks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds the stand-in takes to write the reply")
+    parser.add_argument("--slides", type=int, default=8)
+    args = parser.parse_args()
+
+    stand_in_port, api_port = _free_port(), _free_port()
+    db_dir = tempfile.mkdtemp(prefix="aura-bench-")
+
+    # Settings are read at import time, so configure before importing the app.
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(db_dir, 'bench.db')}"
+    os.environ["USE_DEEPSEEK"] = "true"
+    os.environ["DEEPSEEK_API_KEY"] = "bench"
+    os.environ["DEEPSEEK_BASE_URL"] = f"http://127.0.0.1:{stand_in_port}"
+    os.environ["AI_MAX_RETRIES"] = "0"
+    os.environ["AI_CACHE_ENABLED"] = "false"
+
+    from sqlmodel import Session
+    from app.main import app
+    from app.core.security import create_access_token
+    from app.db.session import engine, init_db
+    from app.models.user import User
+
+    init_db()
+    with Session(engine) as session:
+        user = User(email="bench@aura.com", full_name="Bench", is_active=True)
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        token = create_access_token(user.id)
+
+    _serve(_build_stand_in(args.duration, args.slides), stand_in_port)
+    _serve(app, api_port)
+
+    api_url = f"http://127.0.0.1:{api_port}"
+    payload = {"project_name": "Aura", "project_description": "Hackathon platform"}
+    print(f"stand-in writes {args.slides} slides over {args.duration:.1f}s")
+    print(f"{'endpoint':<38}{'first byte':>12}{'first slide':>13}{'complete':>10}")
+    for path in ("/api/v1/ai/generate-pitch-deck", "/api/v1/ai/generate-pitch-deck/stream"):
+        marks = asyncio.run(_measure(api_url, token, path, payload))
+        print(
+            f"{path:<38}{marks['first byte']:>11.2f}s"
+            f"{marks['first slide']:>12.2f}s{marks['complete']:>9.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
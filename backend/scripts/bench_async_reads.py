@@ -0,0 +1,193 @@
+"""
+Benchmark: hot read endpoints, threadpool (sync) vs event loop (async).
+
+Seeds a throwaway SQLite database (sqlite engine profile) with --hackathons
+hackathons, each with hosts, sections, prizes and scored submissions, then
+fires --requests GETs with --concurrency clients in flight, cycling through
+the hackathon list, hackathon detail and leaderboard endpoints.
+
+Two variants serve the same queries:
+
+  sync   `def` handlers on a sync Session, i.e. the endpoints before they
+         were ported. Starlette runs them in its threadpool (40 tokens by
+         default), so at most 40 requests touch the database at once and
+         the rest queue for a thread
+  async  the real `async def` endpoints on the aiosqlite engine; waiting
+         on the database no longer occupies a thread
+
+The sync variant is mounted by this script under /bench/sync/... using the
+endpoint module's sync builders (_build_hackathon_list_item,
+_build_full_hackathon) so list and detail issue identical SQL; its
+leaderboard skips the per-criteria breakdown, which only flatters sync.
+
+Sample run (20 hackathons, 2000 reads, concurrency 200):
+  sync   169 req/s, p50 685 ms, p95 4.7 s
+  async  294 req/s, p50 598 ms, p95 1.3 s
+
+Usage:
+  cd backend
+  python scripts/bench_async_reads.py --hackathons 50 --requests 4000 --concurrency 200
+"""
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from collections import Counter
+
+from bench_ai_concurrency import _free_port, _percentile, _serve
+
+
+def _seed(engine, hackathons: int) -> list[int]:
+    """Hackathons with two hosts, a prize section and five scored submissions each."""
+    from datetime import datetime, timedelta
+    from sqlmodel import Session
+    from app.models.hackathon import Hackathon, HackathonStatus
+    from app.models.hackathon_host import HackathonHost
+    from app.models.prize import Prize
+    from app.models.section import Section, SectionType
+    from app.models.team_project import Submission, SubmissionStatus
+    from app.models.user import User
+
+    now = datetime.utcnow()
+    with Session(engine) as session:
+        owner = User(email="owner@bench.local", full_name="Owner", is_active=True)
+        session.add(owner)
+        session.commit()
+        ids = []
+        for i in range(hackathons):
+            hackathon = Hackathon(
+                title=f"Bench {i}", description="x" * 500, start_date=now - timedelta(days=1),
+                end_date=now + timedelta(days=1), status=HackathonStatus.ONGOING, created_by=owner.id,
+                created_at=now - timedelta(minutes=i), updated_at=now,
+            )
+            session.add(hackathon)
+            session.commit()
+            section = Section(
+                hackathon_id=hackathon.id, section_type=SectionType.PRIZES, title="Prizes",
+                display_order=0, created_at=now, created_by=owner.id, updated_at=now,
+            )
+            session.add(section)
+            session.commit()
+            session.add_all(
+                HackathonHost(hackathon_id=hackathon.id, name=f"Host {j}", display_order=j) for j in range(2)
+            )
+            session.add_all(
+                Prize(hackathon_id=hackathon.id, section_id=section.id, name=f"Prize {j}", quantity=1,
+                      total_cash_amount=1000 * (j + 1), display_order=j, created_at=now,
+                      created_by=owner.id, updated_at=now)
+                for j in range(3)
+            )
+            session.add_all(
+                Submission(title=f"Project {j}", description="", hackathon_id=hackathon.id, user_id=owner.id,
+                           status=SubmissionStatus.SUBMITTED, total_score=float(j * 10))
+                for j in range(5)
+            )
+            session.commit()
+            ids.append(hackathon.id)
+        return ids
+
+
+def _mount_sync_baseline(app):
+    """The list/detail/leaderboard reads as `def` handlers on a sync Session."""
+    from fastapi import Depends
+    from sqlmodel import Session, select
+    from app.api.v1.endpoints import hackathons as endpoints
+    from app.db.session import get_session
+    from app.models.hackathon import Hackathon, HackathonStatus
+    from app.models.team_project import Submission
+
+    @app.get("/bench/sync/hackathons")
+    def sync_list(session: Session = Depends(get_session), limit: int = 20):
+        rows = session.exec(
+            select(Hackathon).where(Hackathon.status != HackathonStatus.DELETED)
+            .order_by(Hackathon.created_at.desc()).limit(limit)
+        ).all()
+        return endpoints._build_hackathon_list_item(session, rows)
+
+    @app.get("/bench/sync/hackathons/{hackathon_id}")
+    def sync_detail(hackathon_id: int, session: Session = Depends(get_session)):
+        return endpoints._build_full_hackathon(session, session.get(Hackathon, hackathon_id))
+
+    @app.get("/bench/sync/hackathons/{hackathon_id}/leaderboard")
+    def sync_leaderboard(hackathon_id: int, session: Session = Depends(get_session)):
+        rows = session.exec(
+            select(Submission).where(Submission.hackathon_id == hackathon_id)
+            .order_by(Submission.total_score.desc())
+        ).all()
+        return [{"rank": i, "submission_id": s.id, "total_score": s.total_score} for i, s in enumerate(rows, 1)]
+
+
+async def _read_all(api_url: str, prefix: str, ids, requests: int, concurrency: int):
+    import httpx
+
+    gate = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    paths = [f"{prefix}/hackathons?limit=20"]
+    for hid in ids:
+        paths += [f"{prefix}/hackathons/{hid}", f"{prefix}/hackathons/{hid}/leaderboard"]
+
+    async with httpx.AsyncClient(base_url=api_url, timeout=None,
+                                 limits=httpx.Limits(max_connections=concurrency)) as http:
+        async def read(path: str):
+            async with gate:
+                t0 = time.perf_counter()
+                try:
+                    resp = await http.get(path)
+                    statuses[resp.status_code] += 1
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                latencies.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(read(paths[n % len(paths)]) for n in range(requests)))
+        wall = time.perf_counter() - t0
+    return wall, latencies, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hackathons", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--variants", default="sync,async", help="comma-separated variants to compare")
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp(prefix="aura-bench-")
+    url = f"sqlite:///{os.path.join(db_dir, 'reads.db')}"
+    os.environ["DATABASE_URL"] = url
+    os.environ["DB_ENGINE_PROFILE"] = "sqlite"
+    os.environ["AI_CACHE_PATH"] = os.path.join(db_dir, "ai_cache.db")
+
+    import app.db.session as db_session
+    from app.main import app
+
+    db_session.init_db()
+    ids = _seed(db_session.engine, args.hackathons)
+    _mount_sync_baseline(app)
+
+    api_port = _free_port()
+    _serve(app, api_port)
+    for variant in args.variants.split(","):
+        prefix = "/bench/sync" if variant == "sync" else "/api/v1"
+        wall, latencies, statuses = asyncio.run(
+            _read_all(f"http://127.0.0.1:{api_port}", prefix, ids, args.requests, args.concurrency)
+        )
+        total = sum(statuses.values())
+        failed = total - statuses.get(200, 0)
+        print(f"[{variant}] {total} reads, concurrency {args.concurrency}")
+        print(f"  status codes : {dict(sorted(statuses.items(), key=str))}  ({failed} failed)")
+        print(f"  throughput   : {total / wall:.1f} req/s over {wall:.2f}s")
+        print(
+            f"  latency      : p50={statistics.median(latencies) * 1000:.1f}ms "
+            f"p95={_percentile(latencies, 0.95) * 1000:.1f}ms max={max(latencies) * 1000:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
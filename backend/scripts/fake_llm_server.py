@@ -0,0 +1,36 @@
+"""
+Run the offline LLM stand-in as an OpenAI-compatible HTTP server.
+
+Point the app at it instead of a paid upstream, e.g.
+
+  DEEPSEEK_BASE_URL=http://127.0.0.1:9100 USE_DEEPSEEK=true DEEPSEEK_API_KEY=x
+  SILICONFLOW_BASE_URL=http://127.0.0.1:9100 SILICONFLOW_API_KEY=x
+
+Latency, error injection and the seed come from the AI_FAKE_* settings
+(environment or .env), the same ones AI_PROVIDER=fake uses in-process.
+
+Usage:
+  cd backend
+  AI_FAKE_LATENCY_MS=1500 AI_FAKE_ERROR_RATE=0.02 python scripts/fake_llm_server.py --port 9100
+"""
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    args = parser.parse_args()
+
+    import uvicorn
+    from app.core.fake_llm import build_stand_in_app
+
+    uvicorn.run(build_stand_in_app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
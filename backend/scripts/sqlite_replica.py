@@ -0,0 +1,48 @@
+"""
+Local read-replica stand-in for SQLite.
+
+Copies the primary database file into a replica file every --interval
+seconds with SQLite's online backup API, so the replica lags the primary
+the way a streaming replica would. Point the app at both to try the
+read/write routing locally:
+
+  DATABASE_URL=sqlite:///./data/vibebuild.db
+  DATABASE_READ_URL=sqlite:///./data/replica.db
+
+Usage:
+  cd backend
+  python scripts/sqlite_replica.py data/vibebuild.db data/replica.db --interval 2
+"""
+
+import argparse
+import sqlite3
+import time
+
+
+def sync_once(primary: str, replica: str) -> None:
+    src = sqlite3.connect(f"file:{primary}?mode=ro", uri=True)
+    dst = sqlite3.connect(replica)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("primary")
+    parser.add_argument("replica")
+    parser.add_argument("--interval", type=float, default=2.0, help="replication lag in seconds")
+    parser.add_argument("--once", action="store_true", help="copy once and exit")
+    args = parser.parse_args()
+
+    while True:
+        sync_once(args.primary, args.replica)
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,8 @@
 Core test fixtures: in-memory SQLite DB, FastAPI test client, user factories.
 
 Design decisions:
-  - StaticPool keeps one in-memory DB shared across all connections in a test.
+  - StaticPool keeps one in-memory DB shared across all connections in a test;
+    async endpoints reach the same DB through a shared-cache aiosqlite engine.
   - Each test gets a nested transaction that is rolled back after the test,
     so tables are created once and every test starts with a clean slate.
   - Auth uses real JWT tokens (no mocking) so the full deps.py path is tested.
@@ -11,11 +12,12 @@ Design decisions:
 import pytest
 from datetime import datetime, timedelta
 from sqlalchemy import create_engine
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool, StaticPool
 from sqlmodel import SQLModel, Session
 from fastapi.testclient import TestClient
 
-from app.db.session import get_session
+from app.db.session import get_primary_session, get_session
 from app.core.security import create_access_token, get_password_hash
 from app.models.user import User
 from app.models.hackathon import Hackathon, HackathonStatus, HackathonFormat, RegistrationType
@@ -28,11 +30,17 @@ from app.models.judging_criteria import JudgingCriteria
 # Engine & table setup (once per session)
 # ---------------------------------------------------------------------------
 
+# A named shared-cache memory database, so the async engine used by the
+# async endpoints (aiosqlite, one connection per session) sees the same
+# tables and rows as the sync engine.
+TEST_DB = "file:aura_test?mode=memory&cache=shared&uri=true"
+
 engine = create_engine(
-    "sqlite://",
+    f"sqlite:///{TEST_DB}",
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
+async_engine = create_async_engine(f"sqlite+aiosqlite:///{TEST_DB}", poolclass=NullPool)
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -42,6 +50,7 @@ def _register_models():
     # in-memory engine instead of trying to open the real SQLite file.
     import app.db.session as session_mod
     session_mod.engine = engine
+    session_mod.async_engine = async_engine
 
     from app.models.user import User  # noqa
     from app.models.hackathon import Hackathon  # noqa
@@ -58,6 +67,8 @@ def _register_models():
     from app.models.judging_criteria import JudgingCriteria  # noqa
     from app.models.partner import Partner  # noqa
     from app.models.hackathon_organizer import HackathonOrganizer  # noqa
+    from app.models.ai_review import AIReviewJob, SubmissionAIReview  # noqa
+    from app.models.participant_stats import ParticipantHistogram, ParticipantStats  # noqa
 
 
 @pytest.fixture(autouse=True)
@@ -67,6 +78,94 @@ def _reset_tables():
     SQLModel.metadata.create_all(engine)
 
 
+@pytest.fixture(autouse=True)
+def _isolate_ai_cache(tmp_path, monkeypatch):
+    """Give every test its own empty AI completion cache on disk."""
+    from app.core import ai_cache
+    cache = ai_cache.CompletionCache(str(tmp_path / "ai_cache.db"))
+    monkeypatch.setattr(ai_cache, "_cache", cache)
+    yield cache
+    cache.close()
+
+
+@pytest.fixture(autouse=True)
+def _isolate_single_flight(monkeypatch):
+    """Fresh in-flight table and counters for the AI request coalescer."""
+    from app.core import single_flight
+    monkeypatch.setattr(single_flight, "_single_flight", single_flight.SingleFlight())
+
+
+@pytest.fixture(autouse=True)
+def _isolate_skill_index(monkeypatch):
+    """Team-match candidate matrices must not leak rows between tests."""
+    from app.core import skill_vectors
+    monkeypatch.setattr(skill_vectors, "_index", skill_vectors.SkillIndex())
+
+
+@pytest.fixture(autouse=True)
+def _isolate_search_index(monkeypatch):
+    """Fresh BM25 index per test (rebuilt from the test DB on first search)."""
+    from app.core import search_index
+    monkeypatch.setattr(search_index, "_index", search_index.BM25Index())
+
+
+@pytest.fixture(autouse=True)
+def _isolate_ai_metrics(monkeypatch):
+    """Telemetry counters start from zero in every test."""
+    from app.core import ai_metrics
+    monkeypatch.setattr(ai_metrics, "_metrics", ai_metrics.AIMetrics())
+
+
+@pytest.fixture(autouse=True)
+def _isolate_image_jobs(tmp_path, monkeypatch):
+    """Image jobs and their stored files live in a per-test directory."""
+    from app.core import image_jobs
+    store = image_jobs.ImageStore(str(tmp_path / "ai-images"), "/static/ai-images")
+    monkeypatch.setattr(image_jobs, "_queue", image_jobs.ImageJobQueue(store))
+
+
+@pytest.fixture(autouse=True)
+def _isolate_review_jobs(monkeypatch):
+    """Batch review tasks started by one test must not be tracked by the next."""
+    from app.core import ai_review_jobs
+    monkeypatch.setattr(ai_review_jobs, "_runner", ai_review_jobs.ReviewJobRunner())
+
+
+@pytest.fixture(autouse=True)
+def _isolate_insights_cache(monkeypatch):
+    """Community dashboard aggregates are recomputed in every test."""
+    from app.core import community_stats
+    monkeypatch.setattr(community_stats, "_cache", community_stats.InsightsCache(ttl=300))
+
+
+@pytest.fixture(autouse=True)
+def _isolate_read_your_writes(monkeypatch):
+    """Replica stickiness starts empty in every test."""
+    import app.db.session as session_mod
+    monkeypatch.setattr(session_mod, "_read_your_writes", session_mod.ReadYourWrites(seconds=5))
+
+
+@pytest.fixture(autouse=True)
+def _isolate_slow_queries(tmp_path, monkeypatch):
+    """Slow-query totals start empty and the log file lives in tmp_path."""
+    from app.core import slow_queries
+    monkeypatch.setattr(slow_queries, "_log", slow_queries.SlowQueryLog(str(tmp_path / "slow_queries.log")))
+
+
+@pytest.fixture(autouse=True)
+def _isolate_hackathon_docs(monkeypatch):
+    """Hackathon detail documents are rebuilt in every test."""
+    from app.core import hackathon_docs
+    monkeypatch.setattr(hackathon_docs, "_cache", hackathon_docs.HackathonDocCache(max_entries=100))
+
+
+@pytest.fixture(autouse=True)
+def _isolate_hackathon_facets(monkeypatch):
+    """List facet counts are recomputed in every test."""
+    from app.core import hackathon_facets
+    monkeypatch.setattr(hackathon_facets, "_cache", hackathon_facets.FacetCache(ttl=60))
+
+
 # ---------------------------------------------------------------------------
 # Per-test session with transaction rollback isolation
 # ---------------------------------------------------------------------------
@@ -91,11 +190,35 @@ def client(session: Session):
         yield session
 
     app.dependency_overrides[get_session] = _override_get_session
+    app.dependency_overrides[get_primary_session] = _override_get_session
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
 
 
+@pytest.fixture()
+def query_budget(monkeypatch):
+    """
+    Assert an endpoint's SQL statement budget from its X-DB-Queries header:
+
+        resp = client.get(...)
+        query_budget(resp, 6)
+    """
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "DB_QUERY_STATS", True)
+
+    def check(response, budget: int) -> int:
+        count = int(response.headers["X-DB-Queries"])
+        where = f"{response.request.method} {response.request.url.path}"
+        assert count <= budget, (
+            f"{where} ran {count} SQL statements (budget {budget}); "
+            f"most repeated: {response.headers.get('X-DB-N-Plus-One', '-')}"
+        )
+        return count
+
+    return check
+
+
 # ---------------------------------------------------------------------------
 # Auth helper
 # ---------------------------------------------------------------------------
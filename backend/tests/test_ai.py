@@ -0,0 +1,1336 @@
+"""Tests for the async AI provider layer and the endpoints built on it."""
+
+import asyncio
+import os
+import json
+import time
+from types import SimpleNamespace
+
+from sqlmodel import select
+
+from tests.conftest import auth_headers
+from app.core.llm import LLMProvider
+from app.api.v1.endpoints import ai
+
+
+# ---------------------------------------------------------------------------
+# Fake OpenAI-compatible client
+# ---------------------------------------------------------------------------
+
+class _FakeCompletions:
+    """Records peak concurrency and replies after a fixed delay."""
+
+    def __init__(self, reply: dict, delay: float = 0.0, usage=None):
+        self.reply = reply
+        self.delay = delay
+        self.usage = usage
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        self.last_kwargs = kwargs
+        if kwargs.get("stream"):
+            return _FakeStream(json.dumps(self.reply))
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        message = SimpleNamespace(content=json.dumps(self.reply))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=self.usage)
+
+
+class _FakeStream:
+    """Async iterator of streamed chunks, a few characters per delta."""
+
+    def __init__(self, text: str, size: int = 7):
+        self.chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        self.closed = False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for piece in self.chunks:
+            await asyncio.sleep(0)
+            delta = SimpleNamespace(content=piece)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeProvider(LLMProvider):
+    """LLMProvider whose client is an in-memory fake (no network)."""
+
+    def __init__(self, reply: dict, delay: float = 0.0, max_concurrency: int = 16, usage=None):
+        super().__init__("fake", "key", "http://fake", "fake-model", max_concurrency=max_concurrency)
+        self.completions = _FakeCompletions(reply, delay, usage)
+
+    def _build_client(self):
+        return SimpleNamespace(chat=SimpleNamespace(completions=self.completions))
+
+
+# ---------------------------------------------------------------------------
+# Provider layer
+# ---------------------------------------------------------------------------
+
+def test_chat_calls_overlap_instead_of_serializing():
+    provider = FakeProvider({"ideas": []}, delay=0.2, max_concurrency=10)
+
+    async def run():
+        started = time.perf_counter()
+        await asyncio.gather(*(provider.chat_json("sys", f"user {i}") for i in range(10)))
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(run())
+    assert provider.completions.peak == 10
+    assert elapsed < 1.0  # serialized would take ~2s
+
+
+def test_semaphore_bounds_in_flight_calls():
+    provider = FakeProvider({"ideas": []}, delay=0.05, max_concurrency=3)
+
+    async def run():
+        await asyncio.gather(*(provider.chat_json("sys", "user") for _ in range(9)))
+
+    asyncio.run(run())
+    assert provider.completions.calls == 9
+    assert provider.completions.peak == 3
+
+
+def test_chat_json_strips_markdown_fence():
+    provider = FakeProvider({})
+    provider.completions.reply = None
+
+    async def create(**kwargs):
+        message = SimpleNamespace(content='```json\n{"title": "X"}\n```')
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    provider.completions.create = create
+    assert asyncio.run(provider.chat_json("sys", "user")) == {"title": "X"}
+
+
+# ---------------------------------------------------------------------------
+# Endpoints
+# ---------------------------------------------------------------------------
+
+def test_brainstorm_uses_chat_provider(client, normal_user, monkeypatch):
+    idea = {"title": "T", "description": "D", "tech_stack": ["Py"], "complexity": "Low"}
+    provider = FakeProvider({"ideas": [idea]})
+    monkeypatch.setattr(ai, "get_chat_provider", lambda: provider)
+
+    resp = client.post(
+        "/api/v1/ai/brainstorm-ideas",
+        json={"theme": "AI", "skills": "Python", "interests": "Health"},
+        headers=auth_headers(normal_user),
+    )
+    assert resp.status_code == 200
+    assert resp.json() == {"ideas": [idea]}
+    assert provider.completions.calls == 1
+
+
+def test_brainstorm_falls_back_when_provider_fails(client, normal_user, monkeypatch):
+    provider = FakeProvider({})
+
+    async def boom(**kwargs):
+        raise RuntimeError("upstream down")
+
+    provider.completions.create = boom
+    monkeypatch.setattr(ai, "get_chat_provider", lambda: provider)
+
+    resp = client.post(
+        "/api/v1/ai/brainstorm-ideas",
+        json={"theme": "AI", "skills": "Python", "interests": "Health"},
+        headers=auth_headers(normal_user),
+    )
+    assert resp.status_code == 200
+    assert resp.json() == {"ideas": []}
+
+
+# ---------------------------------------------------------------------------
+# Completion cache
+# ---------------------------------------------------------------------------
+
+def test_cache_key_is_content_addressed():
+    from app.core.ai_cache import CompletionCache
+
+    k1 = CompletionCache.make_key("m", "sys", "user")
+    assert k1 == CompletionCache.make_key("m", "sys", "user")
+    assert k1 != CompletionCache.make_key("m2", "sys", "user")
+    assert k1 != CompletionCache.make_key("m", "sys", "user2")
+
+
+def test_cache_memory_then_disk_tier(tmp_path):
+    from app.core.ai_cache import CompletionCache
+
+    path = str(tmp_path / "c.db")
+    cache = CompletionCache(path)
+    cache.set("k", {"ideas": [1]}, ttl=60, namespace="brainstorm")
+    assert cache.get("k", namespace="brainstorm") == {"ideas": [1]}
+    cache.close()
+
+    # A fresh process only has the disk tier
+    reopened = CompletionCache(path)
+    assert reopened.get("k", namespace="brainstorm") == {"ideas": [1]}
+    assert reopened.get("k", namespace="brainstorm") == {"ideas": [1]}
+    counters = reopened.stats()["namespaces"]["brainstorm"]
+    assert counters["disk_hits"] == 1
+    assert counters["memory_hits"] == 1
+    reopened.close()
+
+
+def test_cache_expired_entry_is_a_miss(tmp_path):
+    from app.core.ai_cache import CompletionCache
+
+    cache = CompletionCache(str(tmp_path / "c.db"))
+    cache.set("k", {"a": 1}, ttl=-1)
+    assert cache.get("k") is None
+    assert cache.stats()["namespaces"]["default"]["misses"] == 1
+    cache.close()
+
+
+def test_cache_evicts_least_recently_accessed(tmp_path):
+    from app.core.ai_cache import CompletionCache
+
+    cache = CompletionCache(str(tmp_path / "c.db"), memory_entries=1, disk_entries=2)
+    cache.set("a", 1, ttl=60)
+    time.sleep(0.01)
+    cache.set("b", 2, ttl=60)
+    time.sleep(0.01)
+    assert cache.get("a") == 1  # refresh a's access time
+    time.sleep(0.01)
+    cache.set("c", 3, ttl=60)
+
+    stats = cache.stats()
+    assert stats["disk_entries"] == 2
+    assert stats["memory_entries"] == 1
+    assert stats["evictions"] == 1
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    cache.close()
+
+
+def test_repeated_prompt_served_from_cache(client, normal_user, monkeypatch):
+    provider = FakeProvider({"slides": [{"title": "Hook"}]})
+    monkeypatch.setattr(ai, "get_chat_provider", lambda: provider)
+
+    payload = {"project_name": "Aura", "project_description": "Hackathon platform"}
+    for _ in range(3):
+        resp = client.post(
+            "/api/v1/ai/generate-pitch-deck", json=payload, headers=auth_headers(normal_user)
+        )
+        assert resp.json() == {"slides": [{"title": "Hook"}]}
+    assert provider.completions.calls == 1
+
+
+def test_failed_completion_is_not_cached(client, normal_user, monkeypatch):
+    provider = FakeProvider({"ideas": [{"title": "Later"}]})
+    real_create = provider.completions.create
+
+    async def boom(**kwargs):
+        raise RuntimeError("upstream down")
+
+    provider.completions.create = boom
+    monkeypatch.setattr(ai, "get_chat_provider", lambda: provider)
+    payload = {"theme": "AI", "skills": "Python", "interests": "Health"}
+    headers = auth_headers(normal_user)
+
+    assert client.post("/api/v1/ai/brainstorm-ideas", json=payload, headers=headers).json() == {"ideas": []}
+    provider.completions.create = real_create
+    assert client.post("/api/v1/ai/brainstorm-ideas", json=payload, headers=headers).json() == {"ideas": [{"title": "Later"}]}
+
+
+
+def test_off_schema_reply_is_not_cached(client, normal_user, monkeypatch):
+    provider = FakeProvider({"slides": "not a list"})
+    monkeypatch.setattr(ai, "get_chat_provider", lambda: provider)
+    payload = {"project_name": "Aura", "project_description": "Hackathon platform"}
+    headers = auth_headers(normal_user)
+
+    assert client.post("/api/v1/ai/generate-pitch-deck", json=payload, headers=headers).json() == {"slides": []}
+    provider.completions.reply = {"slides": [{"title": "Hook"}]}
+    resp = client.post("/api/v1/ai/generate-pitch-deck", json=payload, headers=headers)
+    assert resp.json() == {"slides": [{"title": "Hook"}]}
+    assert provider.completions.calls == 2
+
+# ---------------------------------------------------------------------------
+# Single-flight coalescing
+# ---------------------------------------------------------------------------
+
+def test_single_flight_shares_one_upstream_call():
+    from app.core.single_flight import SingleFlight
+
+    flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"matches": [1]}
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", fetch, namespace="search") for _ in range(10)))
+
+    results = asyncio.run(run())
+    assert calls == 1
+    assert results == [{"matches": [1]}] * 10
+    results[0]["matches"].append(2)  # callers get independent copies
+    assert results[1] == {"matches": [1]}
+    stats = flight.stats()
+    assert stats["in_flight"] == 0
+    assert stats["namespaces"]["search"]["upstream_calls"] == 1
+    assert stats["namespaces"]["search"]["coalesced"] == 9
+
+
+def test_single_flight_propagates_errors_and_forgets_key():
+    from app.core.single_flight import SingleFlight
+
+    flight = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def ok():
+        return "fine"
+
+    async def run():
+        results = await asyncio.gather(
+            *(flight.do("k", boom) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+        return await flight.do("k", ok)
+
+    assert asyncio.run(run()) == "fine"
+    assert flight.stats()["namespaces"]["default"]["upstream_calls"] == 2
+
+
+def test_uncached_endpoint_calls_are_coalesced(monkeypatch):
+    from app.core.single_flight import get_single_flight
+
+    provider = FakeProvider({"matches": [], "summary": "ok"}, delay=0.05)
+    monkeypatch.setattr(ai, "get_chat_provider", lambda: provider)
+
+    async def run():
+        same = [ai._chat_json("search_hackathons", "sys", "AI in Shanghai") for _ in range(5)]
+        other = ai._chat_json("search_hackathons", "sys", "Web3 online")
+        return await asyncio.gather(*same, other)
+
+    asyncio.run(run())
+    assert provider.completions.calls == 2
+    counters = get_single_flight().stats()["namespaces"]["search_hackathons"]
+    assert counters == {"upstream_calls": 2, "coalesced": 4, "saved_ratio": 0.6667}
+
+
+def test_ai_metrics_requires_superuser(client, normal_user, superuser):
+    assert client.get("/api/v1/ai/metrics", headers=auth_headers(normal_user)).status_code == 400
+    resp = client.get("/api/v1/ai/metrics", headers=auth_headers(superuser))
+    assert resp.status_code == 200
+    assert set(resp.json()) == {"cache", "single_flight", "calls", "fallbacks", "cache_lookups"}
+    assert client.get("/api/v1/ai/metrics/summary", headers=auth_headers(normal_user)).status_code == 400
+
+
+
+def test_provider_calls_are_recorded_per_endpoint(monkeypatch):
+    from app.core.ai_metrics import get_ai_metrics
+    monkeypatch.setattr(ai.settings, "AI_TOKEN_PRICES", {"fake-model": [1.0, 2.0]})
+    usage = SimpleNamespace(prompt_tokens=100, completion_tokens=40)
+    provider = FakeProvider({"ideas": []}, usage=usage)
+
+    async def run():
+        await provider.chat_json("sys", "a", endpoint="brainstorm")
+        await provider.chat_json("sys", "b", endpoint="brainstorm")
+        provider.completions.create = boom
+        try:
+            await provider.chat_json("sys", "c", endpoint="resume")
+        except RuntimeError:
+            pass
+
+    async def boom(**kwargs):
+        raise RuntimeError("upstream down")
+
+    asyncio.run(run())
+    calls = {c["endpoint"]: c for c in get_ai_metrics().snapshot()["calls"]}
+    assert calls["brainstorm"]["calls"] == 2
+    assert calls["brainstorm"]["latency_buckets"]["+Inf"] == 2
+    assert calls["brainstorm"]["prompt_tokens"] == 200
+    assert calls["brainstorm"]["estimated_cost"] == 0.00036
+    assert calls["resume"]["errors"] == 1
+    assert calls["resume"]["error_types"] == {"RuntimeError": 1}
+
+    summary = get_ai_metrics().summary(60)
+    assert summary["providers"]["fake"]["calls"] == 3
+    assert summary["endpoints"]["resume"]["error_ratio"] == 1.0
+    assert summary["endpoints"]["brainstorm"]["latency_p50"] is not None
+
+
+def test_abandoned_stream_is_recorded_as_an_error():
+    from app.core.ai_metrics import get_ai_metrics
+    provider = FakeProvider({"title": "x" * 100})
+
+    class StalledStream(_FakeStream):
+        async def _iterate(self):
+            await asyncio.sleep(10)
+            yield
+
+    async def stalled(**kwargs):
+        return StalledStream("")
+
+    async def run():
+        # The consumer stops reading (the generator is closed mid-stream)
+        chunks = provider.stream_chat("sys", "a", endpoint="generate")
+        await chunks.__anext__()
+        await chunks.aclose()
+
+        # The request is cancelled while waiting on the upstream
+        provider.completions.create = stalled
+        task = asyncio.create_task(provider.stream_chat("sys", "b", endpoint="generate").__anext__())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(run())
+    calls = {c["endpoint"]: c for c in get_ai_metrics().snapshot()["calls"]}
+    assert calls["generate"]["errors"] == 2
+    assert calls["generate"]["error_types"] == {"GeneratorExit": 1, "CancelledError": 1}
+
+def test_metrics_summary_counts_cache_hits_and_fallbacks(client, normal_user, superuser, monkeypatch):
+    provider = FakeProvider({"ideas": []})
+    monkeypatch.setattr(ai, "get_chat_provider", lambda: provider)
+    body = {"theme": "AI", "skills": "Python", "interests": "Health"}
+    for _ in range(3):
+        client.post("/api/v1/ai/brainstorm-ideas", json=body, headers=auth_headers(normal_user))
+
+    async def boom(**kwargs):
+        raise RuntimeError("upstream down")
+
+    provider.completions.create = boom
+    client.post("/api/v1/ai/generate-pitch-deck", json={"project_name": "X", "project_description": "Y"},
+                headers=auth_headers(normal_user))
+
+    summary = client.get("/api/v1/ai/metrics/summary?window=60", headers=auth_headers(superuser)).json()
+    brainstorm = summary["endpoints"]["brainstorm"]
+    assert (brainstorm["calls"], brainstorm["cache_lookups"], brainstorm["cache_hits"]) == (1, 3, 2)
+    assert brainstorm["cache_hit_ratio"] == 0.6667
+    assert summary["endpoints"]["pitch_deck"]["fallbacks"] == 1
+    assert summary["endpoints"]["pitch_deck"]["errors"] == 1
+
+# ---------------------------------------------------------------------------
+# Team-match pre-ranking
+# ---------------------------------------------------------------------------
+
+def test_skill_vector_pack_roundtrip():
+    from app.core import skill_vectors as sv
+
+    vector = sv.build_vector("Python, React Native", "AI, 教育", "INTJ")
+    blob = sv.pack(vector)
+    assert len(blob) == sv.VECTOR_DIM * 4
+    assert (sv.unpack(blob) == vector).all()
+    assert sv.unpack(b"legacy text") is None
+
+
+def test_candidate_matrix_prefers_requested_and_complementary_skills():
+    from app.core import skill_vectors as sv
+
+    matrix = sv.CandidateMatrix(capacity=1)  # forces growth
+    matrix.upsert(1, sv.build_vector("Python, Django, Backend", "AI", "INTJ"))
+    matrix.upsert(2, sv.build_vector("React, Figma, 前端设计", "AI", "ENFP"))
+    matrix.upsert(3, sv.build_vector(None, None, None))
+    matrix.upsert(4, sv.build_vector("Python, Backend", None, "INTJ"))  # the requester
+
+    requester = sv.build_vector("Python, Backend", "AI", "INTJ")
+    scores = matrix.score(requester, sv.requirements_vector("找一个会 React 的前端设计"), exclude_user_id=4)
+    ranking = [matrix.user_ids[i] for i in (-scores).argsort()]
+    assert ranking[0] == 2
+    assert ranking[-1] == 4
+
+    matrix.remove(2)
+    assert matrix.user_ids == [1, 4, 3]
+    assert matrix.rows == {1: 0, 4: 1, 3: 2}
+
+
+def _enroll(session, hackathon, **profile):
+    from app.models.enrollment import Enrollment
+    from app.models.user import User
+
+    user = User(is_active=True, **profile)
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+    session.add(Enrollment(user_id=user.id, hackathon_id=hackathon.id))
+    session.commit()
+    return user
+
+
+def test_team_match_sends_only_top_k(client, session, hackathon, normal_user, monkeypatch):
+    from app.core.config import settings
+    from app.core.skill_vectors import VECTOR_DIM
+
+    monkeypatch.setattr(settings, "TEAM_MATCH_TOP_K", 5)
+    for i in range(12):
+        _enroll(session, hackathon, email=f"dev{i}@test.com", full_name=f"Dev {i}", skills="Python, Backend")
+    designer = _enroll(session, hackathon, email="ux@test.com", full_name="UX", skills="Figma, UI Design")
+
+    provider = FakeProvider({"matches": [{"user_id": designer.id, "match_score": 90, "match_reason": "UI"}]})
+    monkeypatch.setattr(ai, "get_chat_provider", lambda: provider)
+
+    resp = client.post(
+        "/api/v1/ai/team-match",
+        json={"hackathon_id": hackathon.id, "requirements": "need a Figma UI designer"},
+        headers=auth_headers(normal_user),
+    )
+    assert resp.json()["matches"][0]["user_id"] == designer.id
+
+    prompt = provider.completions.last_kwargs["messages"][1]["content"]
+    candidates = json.loads(prompt.split("Candidate Users:")[1])
+    assert len(candidates) == 5
+    assert candidates[0]["id"] == designer.id
+
+    # Missing vectors were backfilled while building the matrix
+    from app.models.user import User
+    assert len(session.get(User, designer.id).skills_vector) == VECTOR_DIM * 4
+
+
+def test_skill_index_follows_profile_and_enrollment_changes(client, session, hackathon, normal_user):
+    from app.core.skill_vectors import get_skill_index
+
+    other = _enroll(session, hackathon, email="o@test.com", skills="Go")
+    index = get_skill_index()
+    matrix = index.get(session, hackathon.id)
+    assert matrix.user_ids == [other.id]
+
+    headers = auth_headers(normal_user)
+    client.post("/api/v1/enrollments/", json={"user_id": normal_user.id, "hackathon_id": hackathon.id}, headers=headers)
+    assert normal_user.id in matrix.rows
+
+    before = matrix.matrix[matrix.rows[normal_user.id]].copy()
+    client.put("/api/v1/users/me", json={"skills": "Rust, Embedded"}, headers=headers)
+    assert (matrix.matrix[matrix.rows[normal_user.id]] != before).any()
+
+    client.delete(f"/api/v1/enrollments/{hackathon.id}", headers=headers)
+    assert matrix.user_ids == [other.id]
+
+
+# ---------------------------------------------------------------------------
+# Hackathon search prefilter (BM25)
+# ---------------------------------------------------------------------------
+
+def test_tokenize_splits_cjk_into_bigrams():
+    from app.core.search_index import tokenize
+
+    assert tokenize("AI 黑客松 in 上海") == ["ai", "黑客", "客松", "in", "上海"]
+    assert tokenize("京") == ["京"]
+
+
+def test_bm25_ranks_title_hits_first_and_updates_in_place(session, organizer_user):
+    from app.core.search_index import BM25Index
+    from app.models.hackathon import Hackathon, HackathonStatus
+
+    def make(title, description="", status=HackathonStatus.PUBLISHED, **kw):
+        h = Hackathon(title=title, description=description, status=status, created_by=organizer_user.id, **kw)
+        session.add(h)
+        session.commit()
+        session.refresh(h)
+        return h
+
+    ai_title = make("AI 医疗黑客松", "用大模型改善医疗")
+    web3 = make("Web3 Builders", "DeFi and a little AI", city="上海")
+    draft = make("AI 草稿", status=HackathonStatus.DRAFT)
+
+    index = BM25Index()
+    index.rebuild(session)
+    assert len(index) == 2  # drafts are not searchable
+
+    ids = [h_id for h_id, _, _ in index.search("AI 医疗")]
+    assert ids == [ai_title.id, web3.id]
+    assert index.search("上海")[0][0] == web3.id
+
+    draft.status = HackathonStatus.PUBLISHED
+    index.upsert(draft)
+    assert draft.id in [h_id for h_id, _, _ in index.search("草稿")]
+    index.remove(web3.id)
+    assert index.search("上海") == []
+
+
+def test_search_local_mode_skips_llm(client, hackathon, monkeypatch):
+    provider = FakeProvider({"matches": [], "summary": ""})
+    monkeypatch.setattr(ai, "get_chat_provider", lambda: provider)
+
+    resp = client.post("/api/v1/ai/search-hackathons", json={"query": "test hackathon", "mode": "local"})
+    body = resp.json()
+    assert [m["id"] for m in body["matches"]] == [hackathon.id]
+    assert provider.completions.calls == 0
+
+    # A mistyped mode is rejected rather than taking the LLM path
+    for mode in ("Local", "bm25"):
+        resp = client.post("/api/v1/ai/search-hackathons", json={"query": "test hackathon", "mode": mode})
+        assert resp.status_code == 422
+    assert provider.completions.calls == 0
+
+
+def test_search_sends_only_top_n_to_llm(client, session, organizer_user, monkeypatch):
+    from app.core.config import settings
+    from app.models.hackathon import Hackathon, HackathonStatus
+
+    monkeypatch.setattr(settings, "AI_SEARCH_TOP_N", 3)
+    for i in range(8):
+        session.add(Hackathon(title=f"Robotics Cup {i}", status=HackathonStatus.PUBLISHED, created_by=organizer_user.id))
+    session.add(Hackathon(title="Climate Data Jam", status=HackathonStatus.ONGOING, created_by=organizer_user.id))
+    session.commit()
+
+    provider = FakeProvider({"matches": [], "summary": "ok"})
+    monkeypatch.setattr(ai, "get_chat_provider", lambda: provider)
+    client.post("/api/v1/ai/search-hackathons", json={"query": "climate"})
+
+    prompt = provider.completions.last_kwargs["messages"][1]["content"]
+    sent = json.loads(prompt.split("Active Hackathons:")[1])
+    assert [h["title"] for h in sent] == ["Climate Data Jam"]
+
+
+def test_search_index_follows_hackathon_endpoints(client, hackathon, organizer_user):
+    from app.core.search_index import get_hackathon_search_index
+
+    headers = auth_headers(organizer_user)
+    local = {"query": "quantum", "mode": "local"}
+    assert client.post("/api/v1/ai/search-hackathons", json=local).json()["matches"] == []
+    assert len(get_hackathon_search_index()) == 1
+
+    client.patch(f"/api/v1/hackathons/{hackathon.id}", json={"title": "Quantum Night"}, headers=headers)
+    assert [m["id"] for m in client.post("/api/v1/ai/search-hackathons", json=local).json()["matches"]] == [hackathon.id]
+
+    client.delete(f"/api/v1/hackathons/{hackathon.id}", headers=headers)
+    assert client.post("/api/v1/ai/search-hackathons", json=local).json()["matches"] == []
+
+
+# ---------------------------------------------------------------------------
+# SSE streaming
+# ---------------------------------------------------------------------------
+
+def _events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if "event" in lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_json_item_stream_emits_objects_as_they_close():
+    from app.core.json_stream import JSONItemStream
+
+    reply = '```json\n{"title": "x{", "slides": [{"t": "a \\"}\\" b", "n": {"k": [1]}}, {"t": "c"}], "tags": [{"z": 1}]}\n```'
+    parser = JSONItemStream()
+    seen = []
+    for i, ch in enumerate(reply):
+        for event in parser.feed(ch):
+            seen.append((i, event))
+
+    assert [e for _, e in seen] == [
+        ("slides", 0, {"t": 'a "}" b', "n": {"k": [1]}}),
+        ("slides", 1, {"t": "c"}),
+        ("tags", 0, {"z": 1}),
+    ]
+    # the first slide is reported the moment its brace closes
+    assert seen[0][0] == reply.index("}}") + 1
+    assert parser.text == reply
+
+
+def test_pitch_deck_stream_sends_items_before_done(client, normal_user, monkeypatch):
+    slides = [{"title": f"Slide {i}", "content": "...", "speaker_notes": ""} for i in range(3)]
+    provider = FakeProvider({"slides": slides})
+    monkeypatch.setattr(ai, "get_chat_provider", lambda: provider)
+
+    resp = client.post(
+        "/api/v1/ai/generate-pitch-deck/stream",
+        json={"project_name": "Aura", "project_description": "Platform"},
+        headers=auth_headers(normal_user),
+    )
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = _events(resp.text)
+    names = [name for name, _ in events]
+    assert names[-1] == "done"
+    assert events[-1][1] == {"slides": slides}
+    assert [data["item"] for name, data in events if name == "item"] == slides
+    # slide 0 arrives while tokens are still streaming
+    assert names.index("item") < len(names) - 1 - names[::-1].index("token")
+
+    # the completed reply is cached; a repeat replays items without the model
+    resp = client.post(
+        "/api/v1/ai/generate-pitch-deck/stream",
+        json={"project_name": "Aura", "project_description": "Platform"},
+        headers=auth_headers(normal_user),
+    )
+    assert [name for name, _ in _events(resp.text)] == ["item"] * 3 + ["done"]
+    assert provider.completions.calls == 1
+
+
+def test_generate_stream_wraps_content_and_falls_back(client, normal_user, monkeypatch):
+    provider = FakeProvider({"title": "AI Hack", "scoring_dimensions": [{"name": "Tech", "weight": 100}]})
+    monkeypatch.setattr(ai, "get_chat_provider", lambda: provider)
+    headers = auth_headers(normal_user)
+
+    events = _events(client.post("/api/v1/ai/generate/stream", json={"prompt": "AI", "type": "hackathon"}, headers=headers).text)
+    assert events[-1] == ("done", {"content": provider.completions.reply})
+    assert ("item", {"key": "scoring_dimensions", "index": 0, "item": {"name": "Tech", "weight": 100}}) in events
+
+    async def boom(**kwargs):
+        raise RuntimeError("upstream down")
+
+    provider.completions.create = boom
+    events = _events(client.post("/api/v1/ai/generate/stream", json={"prompt": "Web3", "type": "project"}, headers=headers).text)
+    assert [name for name, _ in events] == ["error", "done"]
+    assert events[-1][1]["content"]["business_plan"] == "N/A"
+
+
+# ---------------------------------------------------------------------------
+# Batch review jobs
+# ---------------------------------------------------------------------------
+
+def _submissions(session, hackathon, count, status="submitted"):
+    from app.models.team_project import Submission
+    subs = [
+        Submission(hackathon_id=hackathon.id, title=f"Project {i}", description=f"Builds thing {i}", status=status)
+        for i in range(count)
+    ]
+    session.add_all(subs)
+    session.commit()
+    return subs
+
+
+def _run_job(session, hackathon, user, review):
+    """Create a job and run it to completion on a fresh loop."""
+    from app.core.ai_review_jobs import get_review_job_runner
+    from app.models.ai_review import AIReviewJob
+
+    job = AIReviewJob(hackathon_id=hackathon.id, created_by=user.id)
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+
+    async def run():
+        runner = get_review_job_runner()
+        assert await runner.start(job.id, review)
+        await runner._tasks[job.id]
+
+    asyncio.run(run())
+    session.refresh(job)
+    return job
+
+
+def test_review_batch_bounds_concurrency_and_skips_unchanged(
+    session, hackathon_with_criteria, organizer_user, monkeypatch
+):
+    from app.models.ai_review import AIReviewJobStatus, SubmissionAIReview
+    hackathon, criteria = hackathon_with_criteria
+    subs = _submissions(session, hackathon, 10)
+    _submissions(session, hackathon, 2, status="draft")
+    provider = FakeProvider({"scores": {"Innovation": 8, "Execution": 7}, "comment": "Solid"}, delay=0.02)
+    monkeypatch.setattr(ai, "get_chat_provider", lambda: provider)
+    monkeypatch.setattr(ai.settings, "AI_REVIEW_BATCH_CONCURRENCY", 3)
+
+    job = _run_job(session, hackathon, organizer_user, ai._review_submission)
+    assert job.status == AIReviewJobStatus.COMPLETED
+    assert (job.total, job.reviewed, job.skipped, job.failed) == (10, 10, 0, 0)
+    assert provider.completions.calls == 10
+    assert provider.completions.peak == 3
+    prompt = provider.completions.last_kwargs["messages"][1]["content"]
+    assert "Innovation" in prompt and "Execution" in prompt
+
+    subs[0].description = "Rewritten pitch"
+    session.add(subs[0])
+    session.commit()
+    job = _run_job(session, hackathon, organizer_user, ai._review_submission)
+    assert (job.total, job.reviewed, job.skipped) == (10, 1, 9)
+    assert provider.completions.calls == 11
+    stored = session.exec(select(SubmissionAIReview)).all()
+    assert len(stored) == 10
+    assert json.loads(stored[0].scores) == {"Innovation": 8, "Execution": 7}
+
+
+def test_review_batch_counts_failures(session, hackathon, organizer_user):
+    from app.models.ai_review import AIReviewJobStatus
+    _submissions(session, hackathon, 4)
+
+    async def review(title, text, dimensions):
+        if title == "Project 2":
+            raise ValueError("bad reply")
+        return {"scores": {}, "comment": "ok"}
+
+    job = _run_job(session, hackathon, organizer_user, review)
+    assert job.status == AIReviewJobStatus.COMPLETED
+    assert (job.reviewed, job.failed) == (3, 1)
+
+
+def test_review_batch_db_writes_do_not_block_the_loop(session, hackathon, organizer_user, monkeypatch):
+    from app.core.ai_review_jobs import ReviewJobRunner
+    _submissions(session, hackathon, 2)
+    real_store = ReviewJobRunner._store
+
+    def slow_store(self, *args):
+        time.sleep(0.2)  # a write waiting on the SQLite lock
+        real_store(self, *args)
+
+    monkeypatch.setattr(ReviewJobRunner, "_store", slow_store)
+    ticks = []
+
+    async def review(title, text, dimensions):
+        return {"scores": {}, "comment": "ok"}
+
+    async def run():
+        from app.core.ai_review_jobs import get_review_job_runner
+        from app.models.ai_review import AIReviewJob
+        job = AIReviewJob(hackathon_id=hackathon.id, created_by=organizer_user.id)
+        session.add(job)
+        session.commit()
+        runner = get_review_job_runner()
+        assert await runner.start(job.id, review)
+        task = runner._tasks[job.id]
+        while not task.done():
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.15
+
+
+def test_review_batch_resumes_stale_running_job(session, hackathon, organizer_user):
+    from datetime import datetime, timedelta
+    from app.core.ai_review_jobs import get_review_job_runner
+    from app.models.ai_review import AIReviewJob, AIReviewJobStatus
+    _submissions(session, hackathon, 3)
+    now = datetime.utcnow()
+    live = AIReviewJob(
+        hackathon_id=hackathon.id, created_by=organizer_user.id,
+        status=AIReviewJobStatus.RUNNING, heartbeat_at=now,
+    )
+    orphan = AIReviewJob(
+        hackathon_id=hackathon.id, created_by=organizer_user.id,
+        status=AIReviewJobStatus.RUNNING, heartbeat_at=now - timedelta(hours=1),
+    )
+    session.add_all([live, orphan])
+    session.commit()
+
+    async def review(title, text, dimensions):
+        return {"scores": {}, "comment": "ok"}
+
+    async def run():
+        runner = get_review_job_runner()
+        started = await runner.resume(review)
+        await asyncio.gather(*(runner._tasks[job_id] for job_id in started))
+        return started
+
+    assert asyncio.run(run()) == [orphan.id]
+    session.refresh(orphan)
+    session.refresh(live)
+    assert orphan.status == AIReviewJobStatus.COMPLETED and orphan.reviewed == 3
+    assert live.status == AIReviewJobStatus.RUNNING
+
+
+
+def test_review_job_heartbeat_and_sweep_take_over_stale_jobs(session, hackathon, organizer_user, monkeypatch):
+    from datetime import datetime, timedelta
+    from app.core.ai_review_jobs import get_review_job_runner
+    from app.models.ai_review import AIReviewJob, AIReviewJobStatus
+    monkeypatch.setattr(ai.settings, "AI_REVIEW_JOB_STALE_SECONDS", 0.3)
+    _submissions(session, hackathon, 1)
+    job = AIReviewJob(hackathon_id=hackathon.id, created_by=organizer_user.id, status=AIReviewJobStatus.QUEUED)
+    session.add(job)
+    session.commit()
+    heartbeats = []
+
+    async def slow_review(title, text, dimensions):
+        # One review spanning several stale windows
+        for _ in range(6):
+            await asyncio.sleep(0.1)
+            heartbeats.append(await asyncio.to_thread(_heartbeat_at, job.id))
+        return {"scores": {}, "comment": "ok"}
+
+    def _job(job_id):
+        from sqlmodel import Session
+        from app.db import session as db_session
+        with Session(db_session.engine) as s:
+            return s.get(AIReviewJob, job_id)
+
+    def _heartbeat_at(job_id):
+        return _job(job_id).heartbeat_at
+
+    def _status(job_id):
+        return _job(job_id).status
+
+    async def run():
+        runner = get_review_job_runner()
+        assert await runner.start(job.id, slow_review)
+        # Another runner never sees the live job as stale
+        other = type(runner)()
+        await asyncio.sleep(0.45)
+        assert await other.start(job.id, slow_review) is False
+        await runner._tasks[job.id]
+
+        # A job orphaned after startup is taken over by the sweeper once stale
+        orphan = AIReviewJob(
+            hackathon_id=hackathon.id, created_by=organizer_user.id,
+            status=AIReviewJobStatus.RUNNING, heartbeat_at=datetime.utcnow() - timedelta(seconds=0.2),
+        )
+        await asyncio.to_thread(_add, orphan)
+        runner.start_sweeper(slow_review)
+        for _ in range(50):
+            await asyncio.sleep(0.05)
+            if await asyncio.to_thread(_status, orphan.id) == AIReviewJobStatus.COMPLETED:
+                break
+        await runner.aclose()
+        return orphan.id
+
+    def _add(row):
+        session.add(row)
+        session.commit()
+        session.refresh(row)
+
+    orphan_id = asyncio.run(run())
+    assert len(set(heartbeats)) > 2
+    for job_id in (job.id, orphan_id):
+        done = session.get(AIReviewJob, job_id, populate_existing=True)
+        assert done.status == AIReviewJobStatus.COMPLETED
+
+def test_review_batch_endpoints(client, session, hackathon, organizer_user, normal_user, monkeypatch):
+    _submissions(session, hackathon, 2)
+    provider = FakeProvider({"scores": {"Tech": 9}, "comment": "Great"})
+    monkeypatch.setattr(ai, "get_chat_provider", lambda: provider)
+
+    resp = client.post("/api/v1/ai/review-batch", json={"hackathon_id": hackathon.id}, headers=auth_headers(normal_user))
+    assert resp.status_code == 403
+
+    headers = auth_headers(organizer_user)
+    resp = client.post("/api/v1/ai/review-batch", json={"hackathon_id": hackathon.id}, headers=headers)
+    assert resp.status_code == 200
+    job_id = resp.json()["id"]
+
+    deadline = time.time() + 5
+    while True:
+        job = client.get(f"/api/v1/ai/review-batch/{job_id}", headers=headers).json()
+        if job["status"] == "completed" or time.time() > deadline:
+            break
+        time.sleep(0.01)
+    assert job["status"] == "completed"
+    assert job["progress"] == 1.0
+
+    reviews = client.get(f"/api/v1/ai/reviews?hackathon_id={hackathon.id}", headers=headers).json()
+    assert [r["scores"] for r in reviews] == [{"Tech": 9}, {"Tech": 9}]
+    assert reviews[0]["model"] == "fake-model"
+
+
+# ---------------------------------------------------------------------------
+# Offline fake provider
+# ---------------------------------------------------------------------------
+
+def _use_fake_provider(monkeypatch, **overrides):
+    from app.core import llm
+    monkeypatch.setattr(llm, "_providers", {})
+    monkeypatch.setattr(ai.settings, "AI_PROVIDER", "fake")
+    monkeypatch.setattr(ai.settings, "AI_FAKE_LATENCY_MS", 0.0)
+    for name, value in overrides.items():
+        monkeypatch.setattr(ai.settings, name, value)
+
+
+def test_fake_replies_cover_every_prompt_key():
+    from app.core import fake_llm
+    assert set(ai.PROMPTS) <= set(fake_llm.GENERATORS)
+    for key in ai.PROMPTS:
+        assert fake_llm.identify_prompt(ai.get_system_prompt(key)) == key
+        reply = fake_llm.fake_reply(ai.get_system_prompt(key), "Topic: AI")
+        assert reply == fake_llm.fake_reply(ai.get_system_prompt(key), "Topic: AI")
+        json.dumps(reply)
+
+    review = fake_llm.fake_reply(
+        ai.get_system_prompt("review_system"),
+        'Scoring Dimensions:\n[{"name": "Innovation"}, {"name": "Execution"}]',
+    )
+    assert ai.AIReviewResponse.model_validate(review).scores.keys() == {"Innovation", "Execution"}
+
+
+def test_fake_provider_serves_endpoints_offline(client, normal_user, monkeypatch):
+    _use_fake_provider(monkeypatch)
+    headers = auth_headers(normal_user)
+
+    resp = client.post("/api/v1/ai/generate-project-idea", json={"keywords": "climate"}, headers=headers)
+    assert "Fallback" not in resp.json()["title"]
+    resp = client.post("/api/v1/ai/generate-recruitment", json={"project_name": "A", "project_description": "B"})
+    assert len(resp.json()) >= 2
+    events = _events(client.post(
+        "/api/v1/ai/generate-pitch-deck/stream",
+        json={"project_name": "Aura", "project_description": "Platform"}, headers=headers,
+    ).text)
+    assert [name for name, _ in events].count("item") >= 7
+    assert len(events[-1][1]["slides"]) >= 7
+    resp = client.post("/api/v1/ai/generate-image", json={"prompt": "a cat"}, headers=headers)
+    assert resp.json()["url"].startswith("/static/ai-images/")
+
+
+def test_fake_provider_error_injection_hits_fallbacks(client, normal_user, monkeypatch):
+    from app.core.ai_metrics import get_ai_metrics
+    _use_fake_provider(monkeypatch, AI_FAKE_ERROR_RATE=1.0)
+
+    resp = client.post(
+        "/api/v1/ai/brainstorm-ideas",
+        json={"theme": "AI", "skills": "Python", "interests": "Health"},
+        headers=auth_headers(normal_user),
+    )
+    assert resp.json() == {"ideas": []}
+    calls = get_ai_metrics().snapshot()["calls"]
+    assert calls[0]["provider"] == "fake" and calls[0]["error_types"] == {"InternalServerError": 1}
+
+
+def test_fake_latency_distributions_are_seeded():
+    from app.core.fake_llm import LatencyModel
+    for dist in ("fixed", "uniform", "lognormal", "exponential"):
+        a = [LatencyModel(dist, 100, 0.5, seed=7).sample() for _ in range(3)]
+        b = [LatencyModel(dist, 100, 0.5, seed=7).sample() for _ in range(3)]
+        assert a == b and all(x >= 0 for x in a)
+    model = LatencyModel("lognormal", 100, 0.5, seed=1)
+    samples = sorted(model.sample() for _ in range(2001))
+    assert 0.09 < samples[1000] < 0.11
+
+
+def test_fake_stand_in_server_speaks_openai_wire_format(monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.core.fake_llm import build_stand_in_app
+    monkeypatch.setattr(ai.settings, "AI_FAKE_LATENCY_MS", 0.0)
+    stand_in = TestClient(build_stand_in_app())
+    messages = [
+        {"role": "system", "content": ai.get_system_prompt("resume_system")},
+        {"role": "user", "content": "Role: Backend"},
+    ]
+
+    body = stand_in.post("/chat/completions", json={"model": "m", "messages": messages}).json()
+    reply = json.loads(body["choices"][0]["message"]["content"])
+    assert set(reply) == {"bio", "skills"}
+    assert body["usage"]["completion_tokens"] > 0
+
+    streamed = stand_in.post("/chat/completions", json={"model": "m", "messages": messages, "stream": True}).text
+    chunks = [json.loads(line[6:]) for line in streamed.splitlines() if line.startswith("data: {")]
+    text = "".join(c["choices"][0]["delta"].get("content") or "" for c in chunks)
+    assert json.loads(text) == reply
+    assert streamed.rstrip().endswith("data: [DONE]")
+
+
+# ---------------------------------------------------------------------------
+# Image job queue
+# ---------------------------------------------------------------------------
+
+def test_image_jobs_download_and_dedupe_by_prompt(client, normal_user, monkeypatch):
+    from app.core.image_jobs import get_image_job_queue
+    _use_fake_provider(monkeypatch)
+    calls = []
+    render = ai._render_image
+
+    async def counting_render(prompt, size):
+        calls.append(prompt)
+        return await render(prompt, size)
+
+    monkeypatch.setattr(ai, "_render_image", counting_render)
+    headers = auth_headers(normal_user)
+
+    job = client.post("/api/v1/ai/image-jobs", json={"prompt": "a red fox"}, headers=headers).json()
+    assert job["status"] in ("queued", "running", "completed")
+    events = _events(client.get(f"/api/v1/ai/image-jobs/{job['id']}/events", headers=headers).text)
+    done = events[-1]
+    assert done[0] == "done" and done[1]["status"] == "completed"
+    assert done[1]["url"] == f"/static/ai-images/{job['id']}.png"
+    assert done[1]["source"] == "siliconflow"
+    assert os.path.exists(os.path.join(get_image_job_queue().store.directory, f"{job['id']}.png"))
+
+    # Same prompt: finished job straight from disk, even after the in-memory table is gone
+    get_image_job_queue()._jobs.clear()
+    again = client.post("/api/v1/ai/image-jobs", json={"prompt": "a red fox"}, headers=headers).json()
+    assert again["id"] == job["id"] and again["status"] == "completed"
+    resp = client.post("/api/v1/ai/generate-image", json={"prompt": "a red fox"}, headers=headers)
+    assert resp.json()["url"] == done[1]["url"]
+    assert len(calls) == 1
+
+    assert client.get("/api/v1/ai/image-jobs/unknown", headers=headers).status_code == 404
+
+
+def test_failed_image_job_falls_back_and_can_retry(client, normal_user, monkeypatch):
+    attempts = []
+
+    async def broken_render(prompt, size):
+        attempts.append(prompt)
+        return "data:text/plain,not-an-image", prompt, "siliconflow"
+
+    monkeypatch.setattr(ai, "_render_image", broken_render)
+    headers = auth_headers(normal_user)
+    resp = client.post("/api/v1/ai/generate-image", json={"prompt": "blue whale"}, headers=headers)
+    assert resp.json()["url"].startswith("https://picsum.photos/")
+
+    job_id = client.post("/api/v1/ai/image-jobs", json={"prompt": "blue whale"}, headers=headers).json()["id"]
+    job = client.get(f"/api/v1/ai/image-jobs/{job_id}/events", headers=headers).text
+    assert '"status": "failed"' in job and "Unsupported image content type" in job
+    assert len(attempts) == 2
+
+
+def test_image_jobs_are_private_and_use_their_own_callback(client, normal_user, organizer_user, monkeypatch):
+    from app.core.image_jobs import get_image_job_queue
+    _use_fake_provider(monkeypatch)
+    render = ai._render_image
+    calls = []
+
+    async def tagged_render(prompt, size):
+        calls.append("second")
+        return await render(prompt, size)
+
+    owner, other = auth_headers(normal_user), auth_headers(organizer_user)
+    job = client.post("/api/v1/ai/image-jobs", json={"prompt": "a green owl"}, headers=owner).json()
+    client.get(f"/api/v1/ai/image-jobs/{job['id']}/events", headers=owner)
+
+    # Someone who never submitted the prompt cannot poll the job
+    assert client.get(f"/api/v1/ai/image-jobs/{job['id']}", headers=other).status_code == 404
+    assert client.get(f"/api/v1/ai/image-jobs/{job['id']}/events", headers=other).status_code == 404
+
+    # Submitting it makes them an owner of the finished job (no new upstream call),
+    # and that survives the in-memory table being dropped
+    monkeypatch.setattr(ai, "_render_image", tagged_render)
+    again = client.post("/api/v1/ai/image-jobs", json={"prompt": "a green owl"}, headers=other).json()
+    assert again["id"] == job["id"] and again["status"] == "completed" and calls == []
+    get_image_job_queue()._jobs.clear()
+    assert client.get(f"/api/v1/ai/image-jobs/{job['id']}", headers=other).status_code == 200
+    assert client.get(f"/api/v1/ai/image-jobs/{job['id']}", headers=owner).status_code == 200
+
+    # A new prompt runs with the callback of its own submission, not the first one's
+    fresh = client.post("/api/v1/ai/image-jobs", json={"prompt": "a blue owl"}, headers=owner).json()
+    done = _events(client.get(f"/api/v1/ai/image-jobs/{fresh['id']}/events", headers=owner).text)[-1]
+    assert done[1]["status"] == "completed" and calls == ["second"]
+
+def test_image_download_rejects_svg_and_stops_at_the_size_cap(monkeypatch):
+    import httpx
+    from app.core import image_jobs
+    monkeypatch.setattr(ai.settings, "AI_IMAGE_MAX_BYTES", 1000)
+    pulled = []
+
+    async def body():
+        for _ in range(100):
+            pulled.append(1)
+            yield b"x" * 100
+
+    def handler(request):
+        if request.url.path == "/declared.png":
+            return httpx.Response(200, headers={"content-type": "image/png", "content-length": "5000"}, content=body())
+        return httpx.Response(200, headers={"content-type": "image/png"}, content=body())
+
+    client_class = httpx.AsyncClient
+    monkeypatch.setattr(
+        image_jobs.httpx, "AsyncClient",
+        lambda **kwargs: client_class(transport=httpx.MockTransport(handler), **kwargs),
+    )
+
+    async def fetch(url):
+        try:
+            await image_jobs.fetch_image(url)
+        except ValueError as e:
+            return str(e)
+
+    svg = "data:image/svg+xml;base64,PHN2Zy8+"
+    assert asyncio.run(fetch(svg)).startswith("Unsupported image content type")
+    assert asyncio.run(fetch("http://cdn.test/declared.png")).startswith("Image too large: 5000")
+    assert not pulled
+    assert asyncio.run(fetch("http://cdn.test/chunked.png")).startswith("Image too large: 1100")
+    assert len(pulled) == 11
+
+
+def test_image_job_queue_full_returns_503(client, normal_user, tmp_path, monkeypatch):
+    from app.core import image_jobs
+    monkeypatch.setattr(ai.settings, "AI_IMAGE_QUEUE_SIZE", 1)
+    store = image_jobs.ImageStore(str(tmp_path / "images"), "/static/ai-images")
+
+    async def run():
+        queue = image_jobs.ImageJobQueue(store, workers=1)
+        release = asyncio.Event()
+
+        async def slow_render(prompt, size):
+            await release.wait()
+            return "data:text/plain,x", prompt, "siliconflow"
+
+        await queue.submit(1, "m", "one", "1024x1024", slow_render)
+        await asyncio.sleep(0.01)
+        await queue.submit(1, "m", "two", "1024x1024", slow_render)
+        try:
+            await queue.submit(1, "m", "three", "1024x1024", slow_render)
+            full = False
+        except image_jobs.ImageQueueFull:
+            full = True
+        release.set()
+        await queue.aclose()
+        return full, await queue.get(image_jobs.image_key("m", "three", "1024x1024"), 1)
+
+    # "one" is taken by the only worker, "two" waits, "three" is turned away and not remembered
+    assert asyncio.run(run()) == (True, None)
+
+    async def full(*args):
+        raise image_jobs.ImageQueueFull("1 image jobs already queued")
+
+    monkeypatch.setattr(image_jobs.get_image_job_queue(), "submit", full)
+    resp = client.post("/api/v1/ai/image-jobs", json={"prompt": "a cat"}, headers=auth_headers(normal_user))
+    assert resp.status_code == 503 and resp.headers["retry-after"] == "10"
+
+# ---------------------------------------------------------------------------
+# Prompt packing
+# ---------------------------------------------------------------------------
+
+def test_pack_records_abbreviates_before_dropping_records():
+    from app.core.prompt_packer import estimate_tokens, pack_records, value_tokens
+    records = [{"id": i, "skills": "Python", "bio": "word " * 200, "note": None} for i in range(20)]
+
+    full = pack_records(records, 100_000, abbreviate={"bio": (100, 20)}, drop=("bio",))
+    assert full.level == 0 and len(full.records) == 20 and "note" not in full.records[0]
+
+    short = pack_records(records, 1_000, abbreviate={"bio": (100, 20)}, drop=("bio",))
+    assert len(short.records) == 20 and short.level >= 1
+    assert short.records[0]["bio"].endswith("…") and short.tokens <= 1_000
+    assert value_tokens(short.records) <= 1_000
+
+    tight = pack_records(records, 60, abbreviate={"bio": (100, 20)}, drop=("bio",))
+    assert [r["id"] for r in tight.records] == list(range(len(tight.records)))
+    assert 0 < len(tight.records) < 20 and "bio" not in tight.records[0]
+
+    spread = pack_records(records, 60, drop=("bio",), ranked=False)
+    ids = [r["id"] for r in spread.records]
+    assert ids[0] == 0 and ids[-1] == 19 and spread.omitted == 20 - len(ids)
+
+    assert estimate_tokens("黑客松") == 3 and estimate_tokens("abcdefgh") == 2
+
+
+def test_community_insights_prompt_fits_budget(client, session, hackathon, normal_user, monkeypatch):
+    from app.core.prompt_packer import estimate_tokens
+    from app.models.enrollment import Enrollment
+    from app.models.user import User
+    for i in range(80):
+        user = User(email=f"p{i}@x.com", full_name=f"P{i}", skills="Python, React", personality="INTJ", bio="很长的简介" * 100)
+        session.add(user)
+        session.commit()
+        session.add(Enrollment(user_id=user.id, hackathon_id=hackathon.id, status="approved"))
+    session.commit()
+    provider = FakeProvider({"summary": "ok", "interest_clusters": [], "recommendations": []})
+    monkeypatch.setattr(ai, "get_chat_provider", lambda: provider)
+    monkeypatch.setattr(ai.settings, "AI_PROMPT_TOKEN_BUDGETS", {"fake-model": 3000})
+
+    resp = client.post("/api/v1/ai/community-insights", json={"hackathon_id": hackathon.id}, headers=auth_headers(normal_user))
+    assert resp.json()["summary"] == "ok"
+    prompt = provider.completions.last_kwargs["messages"][1]["content"]
+    from app.core.fake_llm import _json_after
+    sample = _json_after(prompt, "Participants Data:")
+    assert estimate_tokens(prompt) <= 3000 + 100
+    assert len(sample) > 30  # more than the old fixed [:30], bios abbreviated instead
+    assert all(len(p.get("bio", "")) <= 61 for p in sample)
+
+
+# ---------------------------------------------------------------------------
+# Participant histograms
+# ---------------------------------------------------------------------------
+
+def test_participant_histogram_follows_enrollments_and_profiles(client, session, hackathon, normal_user, monkeypatch):
+    from app.core import participant_stats
+    from app.models.enrollment import Enrollment
+    from app.models.user import User
+    for i in range(10):
+        user = User(email=f"h{i}@x.com", full_name=f"H{i}", skills='["Python", "Go"]', personality="intj")
+        session.add(user)
+        session.commit()
+        session.add(Enrollment(user_id=user.id, hackathon_id=hackathon.id, status="approved"))
+    session.commit()
+    provider = FakeProvider({"summary": "ok", "interest_clusters": [{"name": "web"}], "recommendations": []})
+    monkeypatch.setattr(ai, "get_chat_provider", lambda: provider)
+    monkeypatch.setattr(ai.settings, "AI_INSIGHTS_MATERIAL_CHANGE", 0.5)
+    headers = auth_headers(normal_user)
+
+    def insights():
+        resp = client.post("/api/v1/ai/community-insights", json={"hackathon_id": hackathon.id}, headers=headers)
+        assert resp.status_code == 200
+        return resp.json()
+
+    # First read builds the histogram from existing enrollments
+    first = insights()
+    assert first["skill_distribution"] == {"Go": 10, "Python": 10}
+    assert first["mbti_distribution"] == {"INTJ": 10} and first["interest_clusters"] == [{"name": "web"}]
+
+    client.put("/api/v1/users/me", json={"skills": "Rust, Python", "personality": "ENFP"}, headers=headers)
+    body = {"user_id": normal_user.id, "hackathon_id": hackathon.id}
+    assert client.post("/api/v1/enrollments/", json=body, headers=headers).status_code == 200
+    client.put("/api/v1/users/me", json={"skills": "Rust"}, headers=headers)
+    second = insights()
+    assert second["skill_distribution"] == {"Go": 10, "Python": 10, "Rust": 1}
+    assert second["mbti_distribution"] == {"INTJ": 10, "ENFP": 1}
+    assert provider.completions.calls == 1  # one more participant is not a material change
+
+    assert client.delete(f"/api/v1/enrollments/{hackathon.id}", headers=headers).status_code == 204
+    assert insights()["skill_distribution"] == {"Go": 10, "Python": 10}
+    assert participant_stats.read(session, hackathon.id)["participants"] == 10
+
+    # Incremental counts agree with a full recount
+    incremental = participant_stats.read(session, hackathon.id)
+    participant_stats.rebuild(session, hackathon.id)
+    assert participant_stats.read(session, hackathon.id) == incremental
+
+
+
+def test_participant_histogram_repairs_join_missed_by_first_build(session, hackathon):
+    from app.core import participant_stats
+    from app.models.enrollment import Enrollment
+    from app.models.user import User
+    users = [User(email=f"m{i}@x.com", full_name=f"M{i}", skills="Go", personality="intj") for i in range(3)]
+    session.add_all(users)
+    session.commit()
+    session.add(Enrollment(user_id=users[0].id, hackathon_id=hackathon.id, status="approved"))
+    session.commit()
+    assert participant_stats.read(session, hackathon.id)["participants"] == 1
+
+    # A join that committed during the first build's scan: record_join saw
+    # no stats row and the scan missed the enrollment
+    session.add(Enrollment(user_id=users[1].id, hackathon_id=hackathon.id, status="approved"))
+    session.commit()
+    stats = participant_stats.read(session, hackathon.id)
+    assert stats["participants"] == 2 and stats["skill_distribution"] == {"Go": 2}
+
+    # Joins through the hooks keep the counts in step without a rebuild
+    session.add(Enrollment(user_id=users[2].id, hackathon_id=hackathon.id, status="approved"))
+    participant_stats.record_join(session, hackathon.id, users[2])
+    session.commit()
+    assert participant_stats.read(session, hackathon.id)["skill_distribution"] == {"Go": 3}
+
+def test_community_insights_summary_regenerated_on_material_change(client, session, hackathon, normal_user, monkeypatch):
+    from app.models.user import User
+    provider = FakeProvider({"summary": "ok", "interest_clusters": [], "recommendations": []})
+    monkeypatch.setattr(ai, "get_chat_provider", lambda: provider)
+    monkeypatch.setattr(ai.settings, "AI_INSIGHTS_MATERIAL_CHANGE", 0.2)
+
+    def enroll(i):
+        user = User(email=f"m{i}@x.com", full_name=f"M{i}", skills="Python", personality="ISTP")
+        session.add(user)
+        session.commit()
+        body = {"user_id": user.id, "hackathon_id": hackathon.id}
+        assert client.post("/api/v1/enrollments/", json=body, headers=auth_headers(user)).status_code == 200
+        return user
+
+    def insights():
+        return client.post("/api/v1/ai/community-insights", json={"hackathon_id": hackathon.id}, headers=auth_headers(normal_user)).json()
+
+    users = [enroll(i) for i in range(10)]
+    insights()
+    enroll(10)  # +10% participants, same mix
+    assert insights()["skill_distribution"] == {"Python": 11}
+    assert provider.completions.calls == 1
+
+    for user in users[:3]:  # same head count, but the skill mix shifts
+        client.put("/api/v1/users/me", json={"skills": "Design"}, headers=auth_headers(user))
+    assert insights()["skill_distribution"] == {"Python": 8, "Design": 3}
+    assert provider.completions.calls == 2
+
+    for i in range(11, 14):  # +27% participants
+        enroll(i)
+    insights()
+    assert provider.completions.calls == 3
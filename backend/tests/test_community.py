@@ -0,0 +1,58 @@
+"""Tests for the community dashboard aggregates."""
+
+from datetime import datetime, timedelta
+
+from app.models.community import CommunityPost
+from app.models.enrollment import Enrollment
+from app.models.user import User
+
+
+def test_insights_aggregate_posts_skills_and_topics(client, session, hackathon, normal_user):
+    for i, skills in enumerate(["Python, React", "Python", "Design"]):
+        user = User(email=f"c{i}@x.com", full_name=f"C{i}", skills=skills, personality="ENTP")
+        session.add(user)
+        session.commit()
+        session.add(Enrollment(user_id=user.id, hackathon_id=hackathon.id, status="approved"))
+    now = datetime.utcnow()
+    posts = [
+        ("Looking for a GPU sponsor", "Need GPU credits for the model", now),
+        ("GPU quota", "Anyone has spare GPU hours?", now - timedelta(days=2)),
+        ("寻找队友 前端", "我们需要一个前端开发", now - timedelta(days=2)),
+        ("Old thread", "GPU", now - timedelta(days=30)),
+    ]
+    for title, content, created_at in posts:
+        session.add(CommunityPost(
+            title=title, content=content, hackathon_id=hackathon.id,
+            author_id=normal_user.id, created_at=created_at,
+        ))
+    session.commit()
+
+    resp = client.get("/api/v1/community/insights", params={"hackathon_id": hackathon.id})
+    assert resp.status_code == 200
+    body = resp.json()
+
+    trend = body["activity_trend"]
+    assert len(trend) == 7 and trend[-1] == {"date": now.strftime("%m-%d"), "count": 1}
+    assert trend[-3]["count"] == 2 and sum(day["count"] for day in trend) == 3
+
+    assert body["skill_distribution"][0] == {"name": "Python", "count": 2}
+    assert {s["name"] for s in body["skill_distribution"]} == {"Python", "React", "Design"}
+
+    topics = {t["text"]: t["value"] for t in body["hot_topics"]}
+    assert body["hot_topics"][0]["text"] == "gpu" and topics["gpu"] == 2 + 2 + 1
+    assert "前端" in topics and "the" not in topics and "我们" not in topics
+    assert any("3 participants" in line for line in body["participant_portraits"])
+
+
+def test_insights_cached_until_refresh(client, session, hackathon, normal_user, monkeypatch):
+    from app.core import community_stats
+    url = "/api/v1/community/insights"
+    assert client.get(url, params={"hackathon_id": hackathon.id}).json()["hot_topics"] == []
+
+    session.add(CommunityPost(title="Dataset", content="Where is the dataset?", hackathon_id=hackathon.id, author_id=normal_user.id))
+    session.commit()
+    assert client.get(url, params={"hackathon_id": hackathon.id}).json()["hot_topics"] == []
+
+    monkeypatch.setattr(community_stats.get_insights_cache(), "ttl", 0)
+    community_stats.get_insights_cache().invalidate(hackathon.id)
+    assert client.get(url, params={"hackathon_id": hackathon.id}).json()["hot_topics"][0]["text"] == "dataset"
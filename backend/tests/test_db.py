@@ -0,0 +1,90 @@
+"""Tests for the database engine profiles and the async read engine."""
+
+from sqlalchemy import text
+
+from app.db.session import create_async_db_engine, create_db_engine, resolve_profile
+
+
+def test_profile_resolved_from_url():
+    assert resolve_profile("postgresql://u:p@db/app", "auto") == "postgres"
+    assert resolve_profile("sqlite:///./app.db", "auto") == "sqlite"
+    assert resolve_profile("mysql://u:p@db/app", "auto") == "default"
+    assert resolve_profile("sqlite:///./app.db", "default") == "default"
+
+
+def test_sqlite_profile_applies_pragmas(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'nested' / 'app.db'}", "sqlite")
+    with engine.connect() as conn:
+        pragmas = {name: conn.execute(text(f"PRAGMA {name}")).scalar()
+                   for name in ("journal_mode", "synchronous", "busy_timeout", "foreign_keys", "cache_size")}
+    assert pragmas == {
+        "journal_mode": "wal", "synchronous": 1, "busy_timeout": 15000, "foreign_keys": 1, "cache_size": -65536,
+    }
+    assert engine.echo is False and engine.pool.size() == 10
+    engine.dispose()
+
+
+def test_async_unread_count_sees_sync_writes(client, session, normal_user):
+    """The async engine reads the same database the sync sessions write."""
+    from app.models.notification import Notification
+    from tests.conftest import auth_headers
+
+    session.add_all(
+        Notification(user_id=normal_user.id, title=f"n{i}", content="", is_read=i == 0) for i in range(3)
+    )
+    session.commit()
+
+    resp = client.get("/api/v1/notifications/unread-count", headers=auth_headers(normal_user))
+    assert resp.status_code == 200
+    assert resp.json() == {"unread_count": 2}
+    assert client.get("/api/v1/notifications/unread-count").status_code == 401
+
+
+def test_reads_routed_to_replica_until_own_write(tmp_path, monkeypatch):
+    """Two SQLite files as primary and replica: GETs read the replica, a writer reads its own writes."""
+    from fastapi.testclient import TestClient
+    from sqlmodel import Session, SQLModel, select
+    import app.db.session as session_mod
+    from app.core.config import settings
+    from app.main import app
+    from app.models.notification import Notification
+    from app.models.user import User
+    from tests.conftest import auth_headers
+
+    urls = {name: f"sqlite:///{tmp_path / f'{name}.db'}" for name in ("primary", "replica")}
+    engines = {name: create_db_engine(url, "sqlite") for name, url in urls.items()}
+    for name, db in engines.items():
+        SQLModel.metadata.create_all(db)
+        with Session(db) as s:
+            s.add(User(id=1, email="writer@test.com", full_name="Writer", is_active=True))
+            if name == "replica":
+                s.add_all(Notification(user_id=1, title=f"stale {i}", content="") for i in range(2))
+            s.commit()
+
+    monkeypatch.setattr(settings, "DATABASE_READ_URL", urls["replica"])
+    monkeypatch.setattr(session_mod, "engine", engines["primary"])
+    monkeypatch.setattr(session_mod, "read_engine", engines["replica"])
+    monkeypatch.setattr(session_mod, "async_engine", create_async_db_engine(urls["primary"], "sqlite"))
+    monkeypatch.setattr(session_mod, "async_read_engine", create_async_db_engine(urls["replica"], "sqlite"))
+    client = TestClient(app)
+    headers = auth_headers(User(id=1))
+
+    def unread():
+        return client.get("/api/v1/notifications/unread-count", headers=headers).json()["unread_count"]
+
+    assert unread() == 2  # replica
+
+    resp = client.post("/api/v1/notifications", json={"title": "fresh", "content": ""}, headers=headers)
+    assert resp.status_code == 200
+    with Session(engines["replica"]) as s:
+        assert len(s.exec(select(Notification)).all()) == 2  # the write went to the primary only
+
+    # Sticky: both the async and the sync GET now read the primary
+    assert unread() == 1
+    titles = [n["title"] for n in client.get("/api/v1/notifications", headers=headers).json()]
+    assert titles == ["fresh"]
+
+    session_mod.get_read_your_writes().clear()
+    assert unread() == 2
+    for db in engines.values():
+        db.dispose()
@@ -1,5 +1,6 @@
 """Integration tests for hackathon CRUD, soft-delete, and permissions."""
 
+import base64
 import json
 from datetime import datetime, timedelta
 
@@ -88,6 +89,61 @@ def test_get_hackathon_by_id(client, hackathon):
     assert "partners" in body
 
 
+def test_hackathon_detail_cached_until_tree_changes(client, hackathon, organizer_user, query_budget):
+    """Repeat reads are one row lookup; section, prize, partner and row edits invalidate."""
+    url = f"/api/v1/hackathons/{hackathon.id}"
+    headers = auth_headers(organizer_user)
+    assert query_budget(client.get(url), 7) == 7
+    assert query_budget(client.get(url), 1) == 1
+
+    sec = client.post(f"{url}/sections", json={"section_type": "prizes", "title": "Prizes"}, headers=headers)
+    assert sec.status_code == 200
+    section_id = sec.json()["id"]
+    assert [s["title"] for s in client.get(url).json()["sections"]] == ["Prizes"]
+
+    prize = client.post(f"{url}/sections/{section_id}/prizes", json={"name": "Gold"}, headers=headers)
+    assert prize.status_code == 200
+    assert client.get(url).json()["sections"][0]["prizes"][0]["name"] == "Gold"
+
+    partner = client.post(f"{url}/partners", json={"name": "Acme", "category": "sponsor"}, headers=headers)
+    assert partner.status_code == 200
+    assert [p["name"] for p in client.get(url).json()["partners"]] == ["Acme"]
+
+    client.patch(url, json={"title": "Renamed"}, headers=headers)
+    resp = client.get(url)
+    assert resp.json()["title"] == "Renamed"
+    assert query_budget(client.get(url), 1) == 1
+
+
+def test_conditional_get_detail_and_list(client, hackathon, organizer_user, query_budget):
+    url = f"/api/v1/hackathons/{hackathon.id}"
+    first = client.get(url)
+    tag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "public, no-cache"
+
+    resp = client.get(url, headers={"If-None-Match": tag})
+    assert resp.status_code == 304 and resp.content == b""
+    assert resp.headers["ETag"] == tag
+    assert query_budget(resp, 1) == 1
+    assert client.get(url, headers={"If-None-Match": f'"other", W/{tag}'}).status_code == 304
+
+    listing = client.get("/api/v1/hackathons", params={"limit": 10})
+    list_tag = listing.headers["ETag"]
+    assert client.get("/api/v1/hackathons", params={"limit": 10},
+                      headers={"If-None-Match": list_tag}).status_code == 304
+    # A different filter is a different representation
+    other = client.get("/api/v1/hackathons", params={"limit": 5}, headers={"If-None-Match": list_tag})
+    assert other.status_code == 200 and other.headers["ETag"] != list_tag
+
+    # A child-tree change invalidates both
+    client.post(f"{url}/partners", json={"name": "Acme", "category": "sponsor"},
+                headers=auth_headers(organizer_user))
+    resp = client.get(url, headers={"If-None-Match": tag})
+    assert resp.status_code == 200 and resp.headers["ETag"] != tag
+    assert client.get("/api/v1/hackathons", params={"limit": 10},
+                      headers={"If-None-Match": list_tag}).status_code == 200
+
+
 def test_update_hackathon_by_owner(client, hackathon, organizer_user):
     resp = client.patch(
         f"/api/v1/hackathons/{hackathon.id}",
@@ -158,3 +214,181 @@ def test_filter_hackathons_by_status(client, session, organizer_user):
     titles = [h["title"] for h in resp.json()]
     assert "Hack-ongoing" in titles
     assert "Hack-ended" not in titles
+
+
+def test_keyset_pagination_hackathon_list(client, session, organizer_user):
+    from app.models.hackathon import Hackathon, HackathonStatus
+
+    now = datetime.utcnow()
+
+    def add(title, created_at):
+        session.add(Hackathon(
+            title=title, start_date=now, end_date=now + timedelta(days=5), status=HackathonStatus.ONGOING,
+            created_by=organizer_user.id, created_at=created_at, updated_at=created_at,
+        ))
+        session.commit()
+
+    # Equal created_at values are ordered by id
+    for i in range(5):
+        add(f"Page-{i}", now - timedelta(hours=i // 2))
+    expected = [h["title"] for h in client.get("/api/v1/hackathons", params={"status": "ongoing"}).json()]
+    assert expected[:2] == ["Page-1", "Page-0"]
+
+    seen, cursor = [], None
+    while True:
+        params = {"status": "ongoing", "limit": 2, **({"cursor": cursor} if cursor else {})}
+        resp = client.get("/api/v1/hackathons", params=params)
+        assert resp.status_code == 200
+        seen += [h["title"] for h in resp.json()]
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        if len(seen) == 2:
+            add("Inserted mid-scroll", now + timedelta(hours=1))  # would shift an offset page
+    assert seen == expected
+
+    # Offset paging is unchanged (the new row is now first)
+    resp = client.get("/api/v1/hackathons", params={"status": "ongoing", "limit": 2, "offset": 2})
+    assert [h["title"] for h in resp.json()] == expected[1:3]
+
+    assert client.get("/api/v1/hackathons", params={"cursor": "not-a-cursor"}).status_code == 400
+    # A cursor issued by another list (the team list's ["id", 1])
+    assert client.get("/api/v1/hackathons", params={"cursor": "WyJpZCIsIDFd"}).status_code == 400
+    # Well-formed cursors with values of the wrong type
+    for payload in (["created", 123, 1], ["created", "2026-01-01T00:00:00", [1]],
+                    ["created", "yesterday", 1], ["created", "2026-01-01T00:00:00", True]):
+        cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+        assert client.get("/api/v1/hackathons", params={"cursor": cursor}).status_code == 400, payload
+
+
+def test_search_uses_fulltext_index(client, session, organizer_user):
+    from app.models.hackathon import Hackathon, HackathonStatus
+
+    headers = auth_headers(organizer_user)
+    created = {}
+    for title, description, tags, fmt in [
+        ("AI 医疗黑客松", "用大模型改善医疗服务", ["AI", "医疗"], "online"),
+        ("Climate Jam", "Build climate tools with AI agents", ["climate"], "offline"),
+        ("Web3 Weekend", "Smart contracts and wallets", ["web3", "医疗"], "online"),
+    ]:
+        resp = client.post("/api/v1/hackathons",
+                           json=_hackathon_payload(title=title, description=description, tags=tags, format=fmt),
+                           headers=headers)
+        assert resp.status_code == 200, resp.text
+        created[title] = resp.json()["id"]
+
+    def titles(**params):
+        resp = client.get("/api/v1/hackathons", params=params)
+        assert resp.status_code == 200, resp.text
+        return [h["title"] for h in resp.json()]
+
+    # Description and tags are searched; a title hit ranks first
+    assert titles(search="AI") == ["AI 医疗黑客松", "Climate Jam"]
+    assert titles(search="医疗") == ["AI 医疗黑客松", "Web3 Weekend"]
+    assert titles(search="黑客松") == ["AI 医疗黑客松"]
+    assert titles(search="clim") == ["Climate Jam"]  # prefix match
+    assert titles(search="AI", format="offline") == ["Climate Jam"]
+    assert titles(search="AI wallets") == []  # every term must match
+
+    # Updates and deletes keep the index in sync
+    climate = created["Climate Jam"]
+    client.patch(f"/api/v1/hackathons/{climate}", json={"description": "Ocean data"}, headers=headers)
+    assert titles(search="AI") == ["AI 医疗黑客松"]
+    assert titles(search="ocean") == ["Climate Jam"]
+    client.delete(f"/api/v1/hackathons/{climate}", headers=headers)
+    assert titles(search="ocean") == []
+    assert session.get(Hackathon, climate).status == HackathonStatus.DELETED
+
+    # No indexable terms: falls back to the title substring filter
+    assert titles(search="!!") == []
+    assert client.get("/api/v1/hackathons", params={"search": "AI", "cursor": "x"}).status_code == 400
+
+
+def test_facets_count_each_dimension_under_the_other_filters(client, session, organizer_user, query_budget):
+    from app.models.hackathon import Hackathon, HackathonFormat, HackathonStatus
+
+    now = datetime.utcnow()
+    for status, fmt, province, city in [
+        (HackathonStatus.ONGOING, HackathonFormat.ONLINE, None, None),
+        (HackathonStatus.ONGOING, HackathonFormat.OFFLINE, "上海", "上海"),
+        (HackathonStatus.PUBLISHED, HackathonFormat.OFFLINE, "上海", "上海"),
+        (HackathonStatus.PUBLISHED, HackathonFormat.OFFLINE, "广东", "深圳"),
+        (HackathonStatus.DELETED, HackathonFormat.OFFLINE, "广东", "深圳"),
+    ]:
+        session.add(Hackathon(
+            title="Facet", start_date=now, end_date=now + timedelta(days=5), status=status, format=fmt,
+            province=province, city=city, created_by=organizer_user.id, created_at=now, updated_at=now,
+        ))
+    session.commit()
+
+    def counts(body, name):
+        return {item["value"]: item["count"] for item in body["facets"][name]}
+
+    resp = client.get("/api/v1/hackathons/facets")
+    assert query_budget(resp, 5) == 5  # one GROUP BY per dimension
+    body = resp.json()
+    assert body["total"] == 4
+    assert counts(body, "status") == {"ongoing": 2, "published": 2}
+    assert counts(body, "format") == {"offline": 3, "online": 1}
+    assert counts(body, "province") == {"上海": 2, "广东": 1}
+    assert body["facets"]["district"] == []
+
+    # Each dimension honours the other filters, not its own
+    body = client.get("/api/v1/hackathons/facets", params={"format": "offline", "status": "published"}).json()
+    assert body["total"] == 2
+    assert counts(body, "status") == {"ongoing": 1, "published": 2}
+    assert counts(body, "format") == {"offline": 2}
+    assert counts(body, "city") == {"上海": 1, "深圳": 1}
+    listed = client.get("/api/v1/hackathons", params={"format": "offline", "status": "published"}).json()
+    assert len(listed) == body["total"]
+
+    # Cached until a hackathon write
+    assert query_budget(client.get("/api/v1/hackathons/facets"), 0) == 0
+    client.post("/api/v1/hackathons", json=_hackathon_payload(status="ongoing"),
+                headers=auth_headers(organizer_user))
+    body = client.get("/api/v1/hackathons/facets").json()
+    assert body["total"] == 5 and counts(body, "status")["ongoing"] == 3
+
+
+def test_prize_summary_kept_on_row_and_sortable(client, session, organizer_user):
+    from app.models.hackathon import Hackathon
+
+    headers = auth_headers(organizer_user)
+    ids = [client.post("/api/v1/hackathons", json=_hackathon_payload(title=t), headers=headers).json()["id"]
+           for t in ("Small", "Big", "None")]
+    small, big, _ = ids
+
+    def add_prize(hid, amount, awards="[]"):
+        sec = client.post(f"/api/v1/hackathons/{hid}/sections",
+                          json={"section_type": "prizes", "title": "Prizes"}, headers=headers).json()
+        prize = client.post(f"/api/v1/hackathons/{hid}/sections/{sec['id']}/prizes",
+                            json={"name": "P", "total_cash_amount": amount, "awards_sublist": awards},
+                            headers=headers).json()
+        return sec["id"], prize["id"]
+
+    add_prize(small, 1000)
+    big_section, big_prize = add_prize(big, 5000, json.dumps([{"type": "cash"}, {"type": "gift"}]))
+    add_prize(big, 2500)
+
+    def listing(**params):
+        return {h["title"]: h for h in client.get("/api/v1/hackathons", params=params).json()}
+
+    items = listing()
+    assert (items["Big"]["total_cash_prize"], items["Big"]["has_non_cash_prizes"]) == (7500, True)
+    assert (items["Small"]["total_cash_prize"], items["Small"]["has_non_cash_prizes"]) == (1000, False)
+    assert items["None"]["total_cash_prize"] == 0
+
+    by_prize = client.get("/api/v1/hackathons", params={"sort_by_prize": True, "limit": 2})
+    assert [h["title"] for h in by_prize.json()] == ["Big", "Small"]
+    rest = client.get("/api/v1/hackathons", params={"sort_by_prize": True, "cursor": by_prize.headers["X-Next-Cursor"]})
+    assert [h["title"] for h in rest.json()] == ["None"]
+
+    # Updating and deleting prizes (or their section) keeps the row in sync
+    client.patch(f"/api/v1/hackathons/{big}/sections/{big_section}/prizes/{big_prize}",
+                 json={"total_cash_amount": 500, "awards_sublist": "[]"}, headers=headers)
+    assert listing()["Big"]["total_cash_prize"] == 3000 and not listing()["Big"]["has_non_cash_prizes"]
+    client.delete(f"/api/v1/hackathons/{big}/sections/{big_section}/prizes/{big_prize}", headers=headers)
+    assert listing()["Big"]["total_cash_prize"] == 2500
+    small_section = client.get(f"/api/v1/hackathons/{small}/sections").json()[0]["id"]
+    client.delete(f"/api/v1/hackathons/{small}/sections/{small_section}", headers=headers)
+    assert session.get(Hackathon, small).total_cash_prize == 0
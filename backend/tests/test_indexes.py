@@ -0,0 +1,155 @@
+"""EXPLAIN QUERY PLAN checks: the hot query shapes must be served by an index."""
+
+import re
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, tuple_
+from sqlmodel import select
+
+from app.models.community import CommunityPost
+from app.models.discussion import Discussion
+from app.models.enrollment import Enrollment
+from app.models.hackathon import Hackathon
+from app.models.notification import Notification
+from app.models.score import Score
+from app.models.team_project import Submission, Team, TeamMember
+from app.models.user import VerificationCode
+
+
+def _plan(session, statement) -> list[str]:
+    conn = session.connection()
+    compiled = statement.compile(dialect=conn.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+    return [row[-1] for row in rows]
+
+
+# create_all() builds unique constraints as SQLite autoindexes; migrated
+# databases have the named uq_* index instead
+UNIQUE_INDEX = {
+    "enrollment": "uq_enrollment_hackathon_user",
+    "score": ("uq_score_judge_sub_criteria", "sqlite_autoindex_score_"),
+}
+
+HOT_QUERIES = {
+    "enrollment by hackathon and user": (
+        select(Enrollment).where(Enrollment.hackathon_id == 1, Enrollment.user_id == 2),
+        UNIQUE_INDEX["enrollment"],
+    ),
+    "scores per criterion": (
+        select(Score).where(Score.submission_id == 1, Score.criteria_id == 2),
+        "ix_score_submission_criteria",
+    ),
+    "judge's scores on a submission": (
+        select(Score).where(Score.judge_id == 1, Score.submission_id == 2),
+        UNIQUE_INDEX["score"],
+    ),
+    "teams of a user": (
+        select(Team).join(TeamMember, Team.id == TeamMember.team_id).where(TeamMember.user_id == 1),
+        "ix_teammember_user_id",
+    ),
+    "leaderboard": (
+        select(Submission).where(Submission.hackathon_id == 1).order_by(Submission.total_score.desc()),
+        "ix_submission_hackathon_score",
+    ),
+    "unread notifications": (
+        select(Notification)
+        .where(Notification.user_id == 1, Notification.is_read == False)  # noqa: E712
+        .order_by(Notification.created_at.desc()),
+        "ix_notification_user_read_created",
+    ),
+    "unread count": (
+        select(func.count(Notification.id)).where(Notification.user_id == 1, Notification.is_read == False),  # noqa: E712
+        "ix_notification_user_read_created",
+    ),
+    "community feed": (
+        select(CommunityPost).where(CommunityPost.hackathon_id == 1).order_by(CommunityPost.created_at.desc()).limit(20),
+        "ix_communitypost_hackathon_created",
+    ),
+    "activity trend": (
+        select(func.count(CommunityPost.id)).where(
+            CommunityPost.hackathon_id == 1, CommunityPost.created_at >= datetime(2026, 1, 1)
+        ),
+        "ix_communitypost_hackathon_created",
+    ),
+    "discussion list": (
+        select(Discussion).order_by(Discussion.is_pinned.desc(), Discussion.created_at.desc()).limit(20),
+        "ix_discussion_pinned_created",
+    ),
+    "hackathon list page": (
+        select(Hackathon).order_by(Hackathon.created_at.desc(), Hackathon.id.desc()).limit(20),
+        "ix_hackathon_created_id",
+    ),
+    "hackathon list after cursor": (
+        select(Hackathon)
+        .where(tuple_(Hackathon.created_at, Hackathon.id) < (datetime(2026, 1, 1), 10))
+        .order_by(Hackathon.created_at.desc(), Hackathon.id.desc()).limit(20),
+        "ix_hackathon_created_id",
+    ),
+    "hackathon list by prize pool": (
+        select(Hackathon)
+        .where(tuple_(Hackathon.total_cash_prize, Hackathon.id) < (5000.0, 10))
+        .order_by(Hackathon.total_cash_prize.desc(), Hackathon.id.desc()).limit(20),
+        "ix_hackathon_prize_id",
+    ),
+    "teams of a hackathon": (
+        select(Team).where(Team.hackathon_id == 1, Team.id > 10).order_by(Team.id).limit(20),
+        "ix_team_hackathon_id",
+    ),
+    "submissions of a hackathon": (
+        select(Submission).where(Submission.hackathon_id == 1, Submission.id > 10).order_by(Submission.id).limit(20),
+        "ix_submission_hackathon_id",
+    ),
+    "leaderboard after cursor": (
+        select(Submission)
+        .where(Submission.hackathon_id == 1, tuple_(Submission.total_score, Submission.id) < (80.0, 10))
+        .order_by(Submission.total_score.desc(), Submission.id.desc()).limit(20),
+        "ix_submission_hackathon_score",
+    ),
+    "community feed after cursor": (
+        select(CommunityPost)
+        .where(CommunityPost.hackathon_id == 1,
+               tuple_(CommunityPost.created_at, CommunityPost.id) < (datetime(2026, 1, 1), 10))
+        .order_by(CommunityPost.created_at.desc(), CommunityPost.id.desc()).limit(20),
+        "ix_communitypost_hackathon_created",
+    ),
+    "discussion list after cursor": (
+        select(Discussion)
+        .where(tuple_(Discussion.is_pinned, Discussion.created_at, Discussion.id) < (True, datetime(2026, 1, 1), 10))
+        .order_by(Discussion.is_pinned.desc(), Discussion.created_at.desc(), Discussion.id.desc()).limit(20),
+        "ix_discussion_pinned_created",
+    ),
+    "verification code": (
+        select(VerificationCode).where(
+            VerificationCode.email == "a@b.c",
+            VerificationCode.code == "123456",
+            VerificationCode.is_used == False,  # noqa: E712
+            VerificationCode.expires_at > datetime(2026, 1, 1),
+        ),
+        "ix_verificationcode_email_code",
+    ),
+}
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_index(session, name):
+    statement, indexes = HOT_QUERIES[name]
+    plan = _plan(session, statement)
+    detail = "\n".join(plan)
+    # A bare "SCAN <table>" is a full table scan; "SCAN t USING INDEX" walks
+    # an index in order (fine under a LIMIT or with an equality prefix)
+    assert not any(re.fullmatch(r"SCAN \w+", step) for step in plan), detail
+    assert "USE TEMP B-TREE" not in detail, detail
+    indexes = (indexes,) if isinstance(indexes, str) else indexes
+    assert any(index in detail for index in indexes), detail
+
+
+def test_enrollment_has_one_unique_index(session):
+    conn = session.connection()
+    # What migration n4o5p6q7r8s9 runs on a database create_all() already built
+    conn.exec_driver_sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_enrollment_hackathon_user ON enrollment (hackathon_id, user_id)"
+    )
+    unique = [row[1] for row in conn.exec_driver_sql("PRAGMA index_list(enrollment)").all() if row[2]]
+    assert unique == ["uq_enrollment_hackathon_user"]
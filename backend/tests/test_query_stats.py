@@ -0,0 +1,79 @@
+"""Tests for per-request SQL statement counting, N+1 detection and the slow-query log."""
+
+from datetime import datetime, timedelta
+
+from sqlmodel import select
+
+import json
+
+from app.core import slow_queries
+from app.core.config import settings
+from app.core.query_stats import statement_shape, track_queries
+from app.models.hackathon import Hackathon, HackathonStatus
+from app.models.user import User
+from tests.conftest import auth_headers
+
+
+def test_repeated_statement_shapes_are_flagged(session, normal_user):
+    with track_queries() as stats:
+        for _ in range(6):
+            session.exec(select(User).where(User.id == normal_user.id)).first()
+        session.exec(select(Hackathon)).all()
+
+    assert stats.count == 7 and stats.seconds > 0
+    (shape, n), = stats.repeated(threshold=5)
+    assert n == 6 and shape.startswith("SELECT") and "FROM user" in shape
+    assert statement_shape("SELECT a\n  FROM t WHERE id IN (?, ?,  ?)") == "SELECT a FROM t WHERE id IN (?)"
+
+
+def test_hackathon_list_query_budget(client, session, organizer_user, query_budget):
+    """The list endpoint batch-loads its children: the statement count does not grow with rows."""
+    now = datetime.utcnow()
+
+    def add(n):
+        session.add_all(
+            Hackathon(title=f"Budget {i}", start_date=now, end_date=now + timedelta(days=1),
+                      status=HackathonStatus.PUBLISHED, created_by=organizer_user.id,
+                      created_at=now, updated_at=now)
+            for i in range(n)
+        )
+        session.commit()
+
+    add(1)
+    # The hackathon page and its hosts; the prize summary is on the row
+    one = query_budget(client.get("/api/v1/hackathons"), 2)
+    add(10)
+    resp = client.get("/api/v1/hackathons")
+    assert len(resp.json()) == 11
+    assert query_budget(resp, 2) == one == 2
+    assert "X-DB-N-Plus-One" not in resp.headers
+    assert float(resp.headers["X-DB-Time"]) >= 0
+
+
+def test_stats_headers_off_by_default(client):
+    assert "X-DB-Queries" not in client.get("/api/v1/hackathons").headers
+
+
+def test_slow_queries_logged_with_plan_once_per_shape(client, monkeypatch, superuser, normal_user):
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 1e-6)  # everything is slow
+    for term in ("secret-term", "other-term"):
+        assert client.get("/api/v1/hackathons", params={"search": term}).status_code == 200
+
+    log = slow_queries.get_slow_query_log()
+    lines = [json.loads(line) for line in open(log.path, encoding="utf-8")]
+    search = [line for line in lines if "FROM hackathon" in line["shape"] and "MATCH" in line["shape"]]
+    assert len(search) == 2
+    assert search[0]["route"] == "GET /api/v1/hackathons"
+    assert "plan" in search[0] and "plan" not in search[1]
+    assert "hackathon" in search[0]["plan"]
+    assert "secret-term" not in open(log.path, encoding="utf-8").read()
+    assert "<str 17>" in search[0]["params"]  # the FTS expression '"secret"* "term"*'
+
+    assert client.get("/api/v1/admin/slow-queries", headers=auth_headers(normal_user)).status_code == 400
+    resp = client.get("/api/v1/admin/slow-queries", headers=auth_headers(superuser))
+    assert resp.status_code == 200
+    top = resp.json()["queries"]
+    assert [q["total_ms"] for q in top] == sorted((q["total_ms"] for q in top), reverse=True)
+    entry = next(q for q in top if q["shape"] == search[0]["shape"])
+    assert entry["count"] == 2 and entry["routes"] == {"GET /api/v1/hackathons": 2}
+    assert entry["plan"] == search[0]["plan"]
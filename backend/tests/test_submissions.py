@@ -237,5 +237,86 @@ def test_list_submissions_by_hackathon(client, session, normal_user):
     assert len(resp.json()) == 2
 
 
+
+def test_score_cursor_pages_through_unscored_submissions(client, session, normal_user):
+    """Unscored submissions sit at 0 (never NULL), so the score keyset walks past them."""
+    from app.models.team_project import Submission, SubmissionStatus
+
+    now = datetime.utcnow()
+    h = Hackathon(
+        title="Paged Hack",
+        start_date=now,
+        end_date=now + timedelta(days=5),
+        status=HackathonStatus.ONGOING,
+        registration_type=RegistrationType.INDIVIDUAL,
+        format=HackathonFormat.ONLINE,
+        created_by=normal_user.id,
+        created_at=now,
+        updated_at=now,
+    )
+    session.add(h)
+    session.commit()
+    scores = [90.0, None, 75.5, None, None, 60.0, None]
+    for i, score in enumerate(scores):
+        sub = Submission(title=f"Sub {i}", description="d", hackathon_id=h.id, status=SubmissionStatus.SUBMITTED)
+        if score is not None:
+            sub.total_score = score
+        session.add(sub)
+    session.commit()
+
+    seen, cursor = [], None
+    while True:
+        params = {"hackathon_id": h.id, "sort_by_score": True, "limit": 2, **({"cursor": cursor} if cursor else {})}
+        resp = client.get("/api/v1/submissions", params=params)
+        assert resp.status_code == 200
+        seen += [(s["total_score"], s["id"]) for s in resp.json()]
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert len(seen) == len(scores)
+    assert seen == sorted(seen, reverse=True)
+    assert [score for score, _ in seen[3:]] == [0.0] * 4
+    assert not Submission.__table__.c.total_score.nullable
+
+def test_leaderboard_ranks_scored_submissions(
+    client, session, organizer_user, hackathon_with_criteria, normal_user
+):
+    """Leaderboard (served from the async engine) sees scores committed through the sync one."""
+    hackathon, criteria = hackathon_with_criteria
+    session.add(Judge(user_id=normal_user.id, hackathon_id=hackathon.id))
+    session.commit()
+
+    submission_ids = []
+    for i in range(2):
+        team = Team(name=f"Board Team {i}", hackathon_id=hackathon.id, leader_id=organizer_user.id)
+        session.add(team)
+        session.commit()
+        session.refresh(team)
+        session.add(TeamMember(team_id=team.id, user_id=organizer_user.id))
+        session.commit()
+        sub_resp = client.post(
+            "/api/v1/submissions",
+            json=_submission_payload(title=f"Board {i}"),
+            params={"hackathon_id": hackathon.id, "team_id": team.id},
+            headers=auth_headers(organizer_user),
+        )
+        submission_ids.append(sub_resp.json()["id"])
+
+    for submission_id, value in zip(submission_ids, (60, 90)):
+        resp = client.post(
+            f"/api/v1/submissions/{submission_id}/score",
+            json={"scores": [{"criteria_id": c.id, "score_value": value} for c in criteria]},
+            headers=auth_headers(normal_user),
+        )
+        assert resp.status_code == 200
+
+    resp = client.get(f"/api/v1/hackathons/{hackathon.id}/leaderboard")
+    assert resp.status_code == 200
+    board = resp.json()
+    assert [row["submission_id"] for row in board] == submission_ids[::-1]
+    assert board[0]["total_score"] == pytest.approx(90.0, abs=0.1)
+    assert client.get("/api/v1/hackathons/999999/leaderboard").status_code == 404
+
+
 # Need pytest for approx
 import pytest
@@ -142,3 +142,21 @@ def test_get_my_teams(client, hackathon, organizer_user):
     assert resp.status_code == 200
     names = [t["name"] for t in resp.json()]
     assert "My Team" in names
+
+
+def test_enrollment_self_repair_adds_member_to_skill_index(client, session, hackathon, organizer_user, normal_user):
+    """A team member missing an enrollment is repaired into the match index too."""
+    from app.core.skill_vectors import get_skill_index
+    from app.models.team_project import Team, TeamMember
+
+    team = Team(name="Orphans", hackathon_id=hackathon.id, leader_id=organizer_user.id)
+    session.add(team)
+    session.commit()
+    session.add(TeamMember(team_id=team.id, user_id=normal_user.id))
+    session.commit()
+
+    index = get_skill_index()
+    assert normal_user.id not in index.get(session, hackathon.id).rows
+    resp = client.get("/api/v1/enrollments/me", headers=auth_headers(normal_user))
+    assert [e["hackathon_id"] for e in resp.json()] == [hackathon.id]
+    assert normal_user.id in index.get(session, hackathon.id).rows